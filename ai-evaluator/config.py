@@ -1,2 +1,51 @@
+import os
+
 MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"  # Lightweight SBERT model
 BART_MODEL_NAME = "facebook/bart-large-cnn"  # Large BART model
+
+# SBERT inference backend: "torch" (fp32 PyTorch), "onnx" (ONNX Runtime) or "onnx-int8" (dynamically quantised ONNX)
+SBERT_BACKEND = os.getenv("SBERT_BACKEND", "torch")
+SBERT_ONNX_QUANTIZATION = os.getenv("SBERT_ONNX_QUANTIZATION", "avx2")  # Target CPU: avx2, avx512, avx512_vnni or arm64
+SBERT_ONNX_EXPORT_DIR = os.getenv("SBERT_ONNX_EXPORT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "onnx"))
+
+# Long-document embedding (SBERT truncates input at its max_seq_length word pieces)
+LONG_DOC_CHUNK_TOKENS = 256  # Word pieces per chunk, including [CLS]/[SEP]
+LONG_DOC_CHUNK_OVERLAP = 32  # Word pieces shared between consecutive chunks
+LONG_DOC_MAX_CHUNKS = 64  # Upper bound on chunks encoded per document
+LONG_DOC_BATCH_SIZE = 32  # Chunks per SBERT encode batch
+
+# Sentence embedding cache (lets edited re-submissions re-encode only changed sentences)
+EMBEDDING_CACHE_MAX_MB = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "64"))  # Memory bound of the in-process LRU
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")  # Optional .npz file the cache is loaded from and saved to
+
+# Shared Redis tier of the embedding cache (disabled when REDIS_URL is unset)
+REDIS_URL = os.getenv("REDIS_URL")
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Cache of deterministic BART/FLAN-T5 generations: in-memory LRU in front of a size-bounded SQLite file
+GENERATION_CACHE_PATH = os.getenv("GENERATION_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "generations.sqlite3"))
+GENERATION_CACHE_MAX_MB = float(os.getenv("GENERATION_CACHE_MAX_MB", "256"))
+GENERATION_CACHE_MEMORY_ENTRIES = int(os.getenv("GENERATION_CACHE_MEMORY_ENTRIES", "1024"))
+
+# FLAN-T5 evaluation prompts are built to fit this many encoder tokens (the model's limit is 512);
+# longer submissions keep their most criteria-relevant sentences
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "512"))
+
+# FLAN-T5 evaluation decoding: sampling at temperature 0.2 by default, which bypasses the generation cache;
+# "false" switches to deterministic beam search, whose evaluations are cached
+EVALUATION_DO_SAMPLE = os.getenv("EVALUATION_DO_SAMPLE", "true").lower() == "true"
+
+# Map-reduce summarisation of long submissions. Work per submission is bounded by
+# SUMMARY_MAX_CHUNKS chunk generations of SUMMARY_CHUNK_SUMMARY_TOKENS plus the reduce step.
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "1000"))  # BART tokens per chunk (model limit 1024)
+SUMMARY_MAX_CHUNKS = int(os.getenv("SUMMARY_MAX_CHUNKS", "8"))  # Longer texts are sampled evenly down to this many chunks
+SUMMARY_CHUNK_SUMMARY_TOKENS = int(os.getenv("SUMMARY_CHUNK_SUMMARY_TOKENS", "96"))  # Length cap of each chunk summary
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "142"))  # Length cap of the final summary
+SUMMARY_MAP_BEAMS = int(os.getenv("SUMMARY_MAP_BEAMS", "2"))  # Beams for chunk summaries; the final summary keeps 4
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "4"))  # Chunks per padded generate call
+
+# Inference profile of the generative models (BART, FLAN-T5): "default" (fp32, 4-beam decoding) or
+# "cpu-fast" (int8 dynamic quantisation of linear layers, greedy/2-beam decoding with short length caps)
+GENERATION_PROFILE = os.getenv("GENERATION_PROFILE", "default")
+# Torch intra-op threads per worker; defaults to the CPU count shared evenly between uvicorn workers (WEB_CONCURRENCY)
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0")) or max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", "1")))
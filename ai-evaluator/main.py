@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from routes.evaluate import router as evaluate_router
 from routes.transcribe import router as transcription_router
 from routes.summary import router as summary_router
+from services.embedding_cache import embedding_cache
 
 app = FastAPI(title="AI Evaluation Service", version="1.0")
 
@@ -10,6 +11,11 @@ app.include_router(evaluate_router, tags=["Evaluation"], prefix="/api")
 app.include_router(transcription_router, tags=["Transcription"], prefix="/api")
 app.include_router(summary_router, tags=["Summary"], prefix="/api/summary")
 
+@app.on_event("shutdown")
+def save_embedding_cache():
+    # Persist cached embeddings when EMBEDDING_CACHE_PATH is set
+    embedding_cache.save()
+
 @app.get("/", summary="Home", description="Check if the API is running")
 def home():
     return {"message": "AI Evaluation API is running!"}
@@ -1,6 +1,5 @@
-from transformers import BartForConditionalGeneration, BartTokenizer
 from config import BART_MODEL_NAME
+from models.generation_profile import load_seq2seq
 
-# Load BART model & tokenizer once to avoid reloading
-tokenizer = BartTokenizer.from_pretrained(BART_MODEL_NAME)
-bart_model = BartForConditionalGeneration.from_pretrained(BART_MODEL_NAME)
+# Load BART model & tokenizer once to avoid reloading (fast tokenizer; int8 weights under the cpu-fast profile)
+tokenizer, bart_model = load_seq2seq(BART_MODEL_NAME)
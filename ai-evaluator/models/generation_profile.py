@@ -0,0 +1,62 @@
+import os
+import torch
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from config import GENERATION_PROFILE, TORCH_NUM_THREADS, EVALUATION_DO_SAMPLE
+
+# Per-profile model loading and decoding presets for the summariser and the LLM evaluator.
+# Summary presets apply unless the matching SUMMARY_* variable is set in the environment.
+GENERATION_PROFILES = {
+    "default": {
+        "quantize": False,
+        "bound_threads": False,
+        "summary": {"num_beams": 4},
+        "evaluation": {
+            "do_sample": EVALUATION_DO_SAMPLE,
+            "max_new_tokens": 150,
+            "num_beams": 4,
+            **({"temperature": 0.2} if EVALUATION_DO_SAMPLE else {})
+        }
+    },
+    "cpu-fast": {
+        "quantize": True,
+        "bound_threads": True,
+        "summary": {"num_beams": 2, "map_beams": 1, "chunk_summary_tokens": 64, "max_summary_tokens": 96},
+        "evaluation": {"do_sample": False, "max_new_tokens": 64, "num_beams": 1}
+    }
+}
+
+def generation_profile(name: str = GENERATION_PROFILE):
+    """Settings of a named inference profile."""
+    if name not in GENERATION_PROFILES:
+        raise ValueError(f"Generation profile must be one of {', '.join(GENERATION_PROFILES)}")
+    return GENERATION_PROFILES[name]
+
+def configure_torch_threads(threads: int = TORCH_NUM_THREADS):
+    """
+    Bounds torch's thread pools so uvicorn workers on one host do not oversubscribe
+    its cores. Inter-op parallelism can only be set before torch starts parallel work.
+    """
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+def load_seq2seq(model_name: str, profile: str = GENERATION_PROFILE):
+    """
+    Loads a seq2seq model and its fast (Rust) tokenizer for inference under a profile.
+    Profiles with "quantize" replace every nn.Linear with a dynamically quantised int8
+    version, which runs on CPU only.
+
+    Returns:
+        tuple: (tokenizer, model in eval mode)
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name).eval()
+    if generation_profile(profile)["quantize"]:
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return tokenizer, model
+
+# The default profile keeps torch's own threading unless TORCH_NUM_THREADS is set explicitly
+if generation_profile()["bound_threads"] or "TORCH_NUM_THREADS" in os.environ:
+    configure_torch_threads()
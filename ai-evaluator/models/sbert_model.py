@@ -1,5 +1,55 @@
+import os
 from sentence_transformers import SentenceTransformer
-from config import MODEL_NAME
+from config import MODEL_NAME, SBERT_BACKEND, SBERT_ONNX_QUANTIZATION, SBERT_ONNX_EXPORT_DIR
+
+SBERT_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+def quantized_file_name(quantization: str = SBERT_ONNX_QUANTIZATION):
+    """File name sentence-transformers uses for a dynamically quantised ONNX export (AVX2 kernels use unsigned int8)."""
+    weights_dtype = "quint8" if quantization == "avx2" else "qint8"
+    return os.path.join("onnx", f"model_{weights_dtype}_{quantization}.onnx")
+
+def export_quantized_model(quantization: str = SBERT_ONNX_QUANTIZATION):
+    """
+    Exports the SBERT model to ONNX and writes a dynamically int8-quantised copy
+    to SBERT_ONNX_EXPORT_DIR. Used when the model hub does not ship one.
+    """
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    onnx_model = SentenceTransformer(MODEL_NAME, backend="onnx")
+    onnx_model.save(SBERT_ONNX_EXPORT_DIR)
+    export_dynamic_quantized_onnx_model(onnx_model, quantization, SBERT_ONNX_EXPORT_DIR)
+    return SBERT_ONNX_EXPORT_DIR
+
+def load_sbert_model(backend: str = SBERT_BACKEND):
+    """
+    Loads the SBERT model for the configured inference backend.
+
+    "torch" runs the reference fp32 PyTorch model, "onnx" runs the exported graph on
+    ONNX Runtime and "onnx-int8" runs its dynamically quantised version.
+    """
+    if backend not in SBERT_BACKENDS:
+        raise ValueError(f"SBERT backend must be one of {', '.join(SBERT_BACKENDS)}")
+
+    if backend == "torch":
+        return SentenceTransformer(MODEL_NAME)
+
+    if backend == "onnx":
+        return SentenceTransformer(MODEL_NAME, backend="onnx")
+
+    file_name = quantized_file_name()
+    if os.path.exists(os.path.join(SBERT_ONNX_EXPORT_DIR, file_name)):
+        return SentenceTransformer(SBERT_ONNX_EXPORT_DIR, backend="onnx", model_kwargs={"file_name": file_name})
+
+    try:
+        return SentenceTransformer(MODEL_NAME, backend="onnx", model_kwargs={"file_name": file_name})
+    except Exception as e:
+        print(f"No pre-quantised ONNX model on the hub ({str(e)}), exporting one locally...")
+        export_dir = export_quantized_model()
+        return SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": file_name})
 
 # Load SBERT model once to avoid reloading in each request
-sbert_model = SentenceTransformer(MODEL_NAME)
+sbert_model = load_sbert_model()
+
+# Identifies the vectors this model produces, so cached embeddings are never mixed across models or backends
+SBERT_MODEL_VERSION = f"{MODEL_NAME}@{SBERT_BACKEND}" + (f"-{SBERT_ONNX_QUANTIZATION}" if SBERT_BACKEND == "onnx-int8" else "")
@@ -3,7 +3,12 @@ from pydantic import BaseModel
 from typing import Dict, List
 from services.evaluate_similarity import compute_similarity, generate_embedding
 from services.evaluate_parameters import evaluate_parameters
-from services.langchain_evaluation import evaluate_solution
+from services.long_document import generate_document_embedding, generate_incremental_document_embedding, document_stats
+from services.late_interaction import evaluate_parameters_late_interaction
+from services.embedding_cache import encode_sentences
+from services.langchain_evaluation import evaluate_solution, evaluate_solutions_batch, BATCH_SIZE
+from models.sbert_model import SBERT_MODEL_VERSION
+from utils.embedding_codec import serialize_embedding
 
 router = APIRouter()
 
@@ -16,6 +21,7 @@ class GeneralEvaluationRequest(BaseModel):
     problem_statement: str
     criteria: str
     submission: str
+    constrained: bool = False  # Decode against the Summary/Evaluation schema, so the result always parses
 
 langchain_desc = "Evaluate a student submission based on a set of criteria using LangChain and any LLM. The submission can be evaluated on any specified criteria, and it will be scored on a scale of 1 to 5, depending on how well it meets the given requirements."
 
@@ -25,18 +31,60 @@ def evaluate_general(request: GeneralEvaluationRequest):
         result = evaluate_solution(
             problem_statement=request.problem_statement,
             criteria=request.criteria,
-            submission=request.submission
+            submission=request.submission,
+            constrained=request.constrained
         )
         return {"evaluation": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class BatchEvaluationRequest(BaseModel):
+    problem_statement: str
+    criteria: List[str]  # Every submission is evaluated on every criterion
+    submissions: List[str]
+    batch_size: int = BATCH_SIZE
+
+# Bounds on one /evaluate/batch request, so a single call cannot hold the model for long
+MAX_BATCH_SIZE = 32
+MAX_BATCH_PROMPTS = 256
+
+batch_desc = "Evaluate many submissions on many criteria with FLAN-T5 in one call. Every (submission, criterion) prompt is generated in padded batches of similar-length prompts, which is several times faster on CPU than evaluating them one at a time. Returns the parsed 1-5 score and raw output for each criterion of each submission. At most 256 prompts (submissions x criteria) per request, generated at most 32 at a time."
+
+@router.post("/evaluate/batch", summary="Batch evaluate using FLAN-T5", description=batch_desc)
+def evaluate_batch(request: BatchEvaluationRequest):
+    if not request.criteria or not request.submissions:
+        raise HTTPException(status_code=400, detail="At least one criterion and one submission must be provided")
+    if len(request.submissions) * len(request.criteria) > MAX_BATCH_PROMPTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_PROMPTS} (submission, criterion) prompts can be evaluated per request")
+    if not 1 <= request.batch_size <= MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+
+    try:
+        evaluations = [
+            {"problem_statement": request.problem_statement, "criteria": criteria, "submission": submission}
+            for submission in request.submissions
+            for criteria in request.criteria
+        ]
+        results = evaluate_solutions_batch(evaluations, batch_size=request.batch_size)
+
+        per_submission = len(request.criteria)
+        return {
+            "evaluations": [
+                {"submission_index": index, "criteria": results[index * per_submission:(index + 1) * per_submission]}
+                for index in range(len(request.submissions))
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Define a Pydantic model for structured request handling
 class SimilarityRequest(BaseModel):
     ideal_solution: str
     student_submission: str
+    embedding_encoding: str = "list"  # "list" (JSON floats) or "base64" (packed binary)
+    embedding_dtype: str = "float32"  # Precision of base64 embeddings: "float32" or "float16"
 
-similarity_desc = "Compute cosine similarity between the ideal solution and the student submission. The system generates a similarity score out of 100, indicating how closely the student's solution matches the ideal response."
+similarity_desc = "Compute cosine similarity between the ideal solution and the student submission. The system generates a similarity score out of 100, indicating how closely the student's solution matches the ideal response. Set embedding_encoding to base64 to receive the student embedding as packed float32 or float16 bytes (with its dtype, dimension and model id) instead of a JSON float list."
 
 @router.post("/evaluate/similarity/", summary="Evalulate similarity", description=similarity_desc)
 def evaluate_submission(request: SimilarityRequest):
@@ -47,11 +95,51 @@ def evaluate_submission(request: SimilarityRequest):
         similarity_data = compute_similarity(request.ideal_solution, request.student_submission)
         return {
             "cosine_similarity": similarity_data["similarity_score"],
-            "student_embedding": similarity_data["student_embedding"]
+            "student_embedding": serialize_embedding(
+                similarity_data["student_embedding"],
+                encoding=request.embedding_encoding,
+                dtype=request.embedding_dtype,
+                model_id=SBERT_MODEL_VERSION
+            )
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class EmbeddingRequest(BaseModel):
+    texts: List[str]
+    embedding_encoding: str = "base64"  # "list" (JSON floats) or "base64" (packed binary)
+    embedding_dtype: str = "float32"  # Precision of base64 embeddings: "float32" or "float16"
+
+# Texts embedded per /embed request, so one request cannot hold the encoder for long
+MAX_EMBED_TEXTS = 256
+
+embed_desc = "Embed up to 256 texts with SBERT in one batch, through the embedding cache. Used by services without their own SBERT model (the micro service's ideal-solution store). Each embedding is returned in the requested encoding, with the id of the model that produced it."
+
+@router.post("/embed", summary="Embed texts", description=embed_desc)
+def embed_texts(request: EmbeddingRequest):
+    """
+    Embeds texts in one encoder batch and returns them with the model id.
+    """
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="At least one text must be provided")
+    if len(request.texts) > MAX_EMBED_TEXTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_EMBED_TEXTS} texts can be embedded per request")
+
+    try:
+        embeddings, hits = encode_sentences(request.texts)
+        return {
+            "model": SBERT_MODEL_VERSION,
+            "embeddings": [
+                serialize_embedding(embedding, encoding=request.embedding_encoding, dtype=request.embedding_dtype, model_id=SBERT_MODEL_VERSION)
+                for embedding in embeddings
+            ],
+            "cache_hits": int(hits.sum())
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Define request schema
 class EvaluationRequest(BaseModel):
     problem_statement: str
@@ -59,8 +147,12 @@ class EvaluationRequest(BaseModel):
     student_submission: str
     sbert_weight: float = 0.7
     tfidf_weight: float = 0.3
+    long_document: bool = False  # Embed the whole submission in overlapping chunks instead of truncating it
+    incremental: bool = False  # Embed sentence by sentence through the cache, so re-submissions only encode changed sentences
+    scorer: str = "weighted"  # "weighted" (SBERT + TF-IDF) or "late_interaction" (multi-vector max-similarity)
+    granularity: str = "sentence"  # Vector granularity for the late_interaction scorer: "sentence" or "token"
 
-parameters_desc = "Evaluate a student submission based on multiple parameters using both SBERT and TF-IDF. The system generates a score out of 100 for each parameter, and the weights for SBERT similarity and TF-IDF can be customized to adjust their influence on the final score."
+parameters_desc = "Evaluate a student submission based on multiple parameters using both SBERT and TF-IDF. The system generates a score out of 100 for each parameter, and the weights for SBERT similarity and TF-IDF can be customized to adjust their influence on the final score. Set long_document to score long PDFs or transcripts on their full text: the submission is embedded in overlapping chunks, each parameter also reports its best-matching chunk similarity, and the response includes the token count and encode cost. Set incremental to embed the submission sentence by sentence through the embedding cache, so an edited re-submission only encodes its new or changed sentences. Set scorer to late_interaction to score each parameter by summed max-similarity between its rubric vectors and the submission's sentence or token vectors."
 
 @router.post("/evaluate/parameters/", summary="Evaluate parameters", description=parameters_desc)
 def evaluate_submission(request: EvaluationRequest):
@@ -73,18 +165,44 @@ def evaluate_submission(request: EvaluationRequest):
         # Extract parameter names from the dictionary
         parameters = list(request.parameter_definitions.keys())
 
+        if request.scorer == "late_interaction":
+            parameter_scores = evaluate_parameters_late_interaction(
+                problem_statement=request.problem_statement,
+                student_submission=request.student_submission,
+                parameter_definitions=request.parameter_definitions,
+                granularity=request.granularity
+            )
+            return {
+                "status": "success",
+                "scorer": request.scorer,
+                "parameter_scores": parameter_scores
+            }
+
+        if request.scorer != "weighted":
+            raise ValueError("Scorer must be either 'weighted' or 'late_interaction'")
+
+        document = None
+        if request.incremental and request.student_submission:
+            document = generate_incremental_document_embedding(request.student_submission)
+        elif request.long_document and request.student_submission:
+            document = generate_document_embedding(request.student_submission)
+
         parameter_scores = evaluate_parameters(
             problem_statement=request.problem_statement,
             student_submission=request.student_submission,
             parameter_definitions=request.parameter_definitions,  # Pass the full dictionary
             sbert_weight=request.sbert_weight,
-            tfidf_weight=1 - request.sbert_weight
+            tfidf_weight=1 - request.sbert_weight,
+            document=document
         )
         
-        return {
+        response = {
             "status": "success",
             "parameter_scores": parameter_scores
         }
+        if document is not None:
+            response["document"] = document_stats(document)
+        return response
     except Exception as e:
         return {
             "status": "error",
@@ -0,0 +1,217 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from models.sbert_model import sbert_model, SBERT_MODEL_VERSION
+from utils.text_processing import normalise_text, text_hash
+from config import EMBEDDING_CACHE_MAX_MB, EMBEDDING_CACHE_PATH, REDIS_URL, EMBEDDING_CACHE_TTL_SECONDS
+
+class RedisEmbeddingStore:
+    """
+    Redis tier of the embedding cache, shared by every replica.
+
+    Vectors are stored as raw float16 bytes (768 bytes for a 384-dim vector) under
+    their cache key, with a TTL that is refreshed whenever a vector is read. The key
+    is "emb:<model version>:<text hash>" in every service that shares the store.
+    """
+
+    def __init__(self, redis_url: str, ttl_seconds: int, prefix: str = "emb:"):
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def get_many(self, keys: list):
+        """Fetches vectors for many keys in one pipelined round trip; missing keys come back as None."""
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.getex(self.prefix + key, ex=self.ttl_seconds)
+        return [
+            None if value is None else np.frombuffer(value, dtype=np.float16).astype(np.float32)
+            for value in pipeline.execute()
+        ]
+
+    def set_many(self, vectors: dict):
+        """Stores many vectors in one pipelined round trip."""
+        pipeline = self.client.pipeline(transaction=False)
+        for key, vector in vectors.items():
+            pipeline.set(self.prefix + key, np.asarray(vector, dtype=np.float16).tobytes(), ex=self.ttl_seconds)
+        pipeline.execute()
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by model version and normalised text hash.
+
+    The first tier is an in-process LRU whose entries are evicted least-recently-used
+    first once their total size exceeds `max_bytes`. When `persist_path` is set it is
+    loaded from that .npz file on start-up and written back by `save()`. The optional
+    second tier (`l2`, a RedisEmbeddingStore) is consulted for first-tier misses, so
+    replicas reuse each other's embeddings. Second-tier errors only cost a re-encode.
+    """
+
+    def __init__(self, model_version: str, max_bytes: int, persist_path: str = None, l2: RedisEmbeddingStore = None):
+        self.model_version = model_version
+        self.max_bytes = max_bytes
+        self.persist_path = persist_path
+        self.l2 = l2
+        self.hits = 0
+        self.misses = 0
+        self.l2_hits = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if persist_path and os.path.exists(persist_path):
+            self.load()
+
+    def key(self, sentence: str):
+        """Cache key for a sentence under the current model version."""
+        return f"{self.model_version}:{text_hash(sentence)}"
+
+    def get(self, key: str):
+        """Returns the cached vector for a key, or None."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector):
+        """
+        Stores a vector at float16 precision, the precision of the Redis tier, so a
+        vector is identical whichever tier answers. Evicts least-recently-used entries
+        beyond the memory bound and returns the stored vector.
+        """
+        vector = np.asarray(vector, dtype=np.float16).astype(np.float32)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.nbytes
+            self._entries[key] = vector
+            self._size += vector.nbytes
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.nbytes
+        return vector
+
+    def encode(self, sentences: list, encoder):
+        """
+        Embeds sentences, running `encoder` only on those found in neither tier.
+
+        Args:
+            sentences (list): Sentences to embed.
+            encoder (callable): Maps a list of sentences to an (n, dim) array.
+
+        Returns:
+            tuple: ((n, dim) float32 embeddings at float16 precision in input order, boolean array marking cache hits)
+        """
+        normalised = [normalise_text(sentence) for sentence in sentences]
+        keys = [self.key(sentence) for sentence in normalised]
+        vectors = [self.get(key) for key in keys]
+
+        # Look up each distinct first-tier miss once in the shared tier, then encode the rest
+        missing = OrderedDict((keys[i], normalised[i]) for i in range(len(keys)) if vectors[i] is None)
+        found = {}
+
+        if missing and self.l2 is not None:
+            found = self._l2_get(list(missing.keys()))
+            for key, vector in found.items():
+                self.put(key, vector)
+                del missing[key]
+
+        if missing:
+            encoded = {key: self.put(key, vector) for key, vector in zip(missing.keys(), encoder(list(missing.values())))}
+            self._l2_set(encoded)
+            found.update(encoded)
+
+        vectors = [found[keys[i]] if vector is None else vector for i, vector in enumerate(vectors)]
+        hit_mask = np.array([key not in missing for key in keys], dtype=bool)
+
+        return np.vstack(vectors).astype(np.float32), hit_mask
+
+    def _l2_get(self, keys: list):
+        """Second-tier lookup; returns {key: vector} for the keys that were found."""
+        if self.l2 is None:
+            return {}
+        try:
+            found = {key: vector for key, vector in zip(keys, self.l2.get_many(keys)) if vector is not None}
+        except Exception as e:
+            print(f"Embedding cache Redis lookup failed: {str(e)}")
+            return {}
+        with self._lock:
+            self.l2_hits += len(found)
+        return found
+
+    def _l2_set(self, vectors: dict):
+        """Second-tier write; failures are logged and ignored."""
+        if self.l2 is None or not vectors:
+            return
+        try:
+            self.l2.set_many(vectors)
+        except Exception as e:
+            print(f"Embedding cache Redis write failed: {str(e)}")
+
+    def stats(self):
+        """Entry count, memory use and hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "l2_hits": self.l2_hits,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def save(self):
+        """Writes the cache to `persist_path` atomically."""
+        if not self.persist_path:
+            return
+        with self._lock:
+            keys = list(self._entries.keys())
+            vectors = list(self._entries.values())
+        if not keys:
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+        temp_path = f"{self.persist_path}.tmp.npz"
+        np.savez(temp_path, keys=np.array(keys), vectors=np.vstack(vectors))
+        os.replace(temp_path, self.persist_path)
+
+    def load(self):
+        """Loads entries for the current model version from `persist_path`."""
+        try:
+            with np.load(self.persist_path, allow_pickle=False) as data:
+                prefix = f"{self.model_version}:"
+                for key, vector in zip(data["keys"], data["vectors"]):
+                    if key.startswith(prefix):
+                        self.put(str(key), vector)
+        except Exception as e:
+            print(f"Could not load embedding cache from {self.persist_path}: {str(e)}")
+
+# Shared by every request in this process, and through Redis by every replica
+embedding_cache = EmbeddingCache(
+    model_version=SBERT_MODEL_VERSION,
+    max_bytes=int(EMBEDDING_CACHE_MAX_MB * 1024 * 1024),
+    persist_path=EMBEDDING_CACHE_PATH,
+    l2=RedisEmbeddingStore(REDIS_URL, EMBEDDING_CACHE_TTL_SECONDS) if REDIS_URL else None
+)
+
+def encode_sentences(sentences: list):
+    """
+    Embeds sentences through the shared embedding cache.
+
+    Returns:
+        tuple: ((n, dim) float32 embeddings, boolean array marking cache hits)
+    """
+    return embedding_cache.encode(sentences, lambda texts: sbert_model.encode(texts, convert_to_numpy=True))
+
+def encode_text(text: str):
+    """Embeds a single text through the shared embedding cache."""
+    embeddings, _ = encode_sentences([text])
+    return embeddings[0]
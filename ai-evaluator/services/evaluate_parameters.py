@@ -1,11 +1,13 @@
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from models.sbert_model import sbert_model
+from services.embedding_cache import encode_text, encode_sentences
+from services.long_document import max_chunk_similarity
+from utils.document_analysis import DocumentAnalysis
 
 def generate_embedding(text: str):
-    """Generate SBERT embedding for a given text."""
-    return sbert_model.encode(text, convert_to_numpy=True)
+    """Generate SBERT embedding for a given text, served from the embedding cache when possible."""
+    return encode_text(text)
 
 def compute_tfidf_similarity(problem_statement: str, parameter: str, parameter_description: str, student_submission: str):
     """
@@ -28,7 +30,7 @@ def compute_tfidf_similarity(problem_statement: str, parameter: str, parameter_d
     return round(float(similarity * 100), 2)
 
 
-def evaluate_parameters(problem_statement: str, student_submission: str, parameter_definitions: dict, sbert_weight: float, tfidf_weight: float):
+def evaluate_parameters(problem_statement: str, student_submission: str, parameter_definitions: dict, sbert_weight: float, tfidf_weight: float, document: dict = None):
     """
     Evaluates a student submission on multiple parameters individually.
     
@@ -38,6 +40,9 @@ def evaluate_parameters(problem_statement: str, student_submission: str, paramet
         parameter_definitions (dict): Dictionary mapping parame ters to their descriptions.
         sbert_weight (float): Weight for SBERT similarity score.
         tfidf_weight (float): Weight for TF-IDF similarity score.
+        document (dict, optional): Long-document embedding of the submission from
+            `generate_document_embedding`. When given, SBERT similarity uses its pooled
+            vector and each parameter also gets its best-matching chunk similarity.
 
     Returns:
         dict: Dictionary containing scores for each parameter.
@@ -56,17 +61,16 @@ def evaluate_parameters(problem_statement: str, student_submission: str, paramet
 
     parameter_scores = {}
 
-    # Generate SBERT embedding for student submission (compute only once)
-    student_embedding = generate_embedding(student_submission)
+    # Tokenise and embed the student submission once for every parameter
+    analysis = DocumentAnalysis(student_submission, encoder=lambda texts: encode_sentences(texts)[0])
+    if document is not None:
+        student_embedding = document["document_embedding"]
+    else:
+        student_embedding = analysis.embedding
 
     for parameter, description in parameter_definitions.items():  # Loop over dictionary
-        # Compute TF-IDF similarity
-        tfidf_score = compute_tfidf_similarity(
-            problem_statement=problem_statement,
-            parameter=parameter,
-            parameter_description=description,  # Pass dynamic description
-            student_submission=student_submission
-        )
+        # Compute TF-IDF similarity (same value as compute_tfidf_similarity, without re-tokenising the submission)
+        tfidf_score = round(analysis.tfidf_similarity(problem_statement + " " + description) * 100, 2)
 
         # Compute SBERT similarity
         parameter_text = f"{problem_statement} - Focus on {description}"
@@ -83,4 +87,7 @@ def evaluate_parameters(problem_statement: str, student_submission: str, paramet
             "final_score": final_score
         }
 
+        if document is not None:
+            parameter_scores[parameter]["sbert_max_chunk_similarity"] = max_chunk_similarity(document, parameter_embedding)
+
     return parameter_scores
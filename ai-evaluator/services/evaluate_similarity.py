@@ -1,10 +1,10 @@
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
-from models.sbert_model import sbert_model
+from services.embedding_cache import encode_text
 
 def generate_embedding(text: str):
-    """Generate SBERT embedding for a given text."""
-    return sbert_model.encode(text, convert_to_numpy=True)
+    """Generate SBERT embedding for a given text, served from the embedding cache when possible."""
+    return encode_text(text)
 
 def compute_similarity(problem_statement: str, student_text: str):
     """
@@ -17,7 +17,7 @@ def compute_similarity(problem_statement: str, student_text: str):
 
     return {
         "similarity_score": round(float(similarity * 100), 2),  # Scale to 0-100
-        "problem_embedding": problem_embedding.tolist(),  # Convert for JSON response
-        "student_embedding": student_embedding.tolist()
+        "problem_embedding": problem_embedding,  # Serialised by the route in the requested encoding
+        "student_embedding": student_embedding
     }
 
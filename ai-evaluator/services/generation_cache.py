@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from config import GENERATION_CACHE_PATH, GENERATION_CACHE_MAX_MB, GENERATION_CACHE_MEMORY_ENTRIES
+
+def is_deterministic(decoding: dict):
+    """Greedy and beam search always produce the same output for the same input; sampling does not."""
+    return not decoding.get("do_sample", False)
+
+class GenerationCache:
+    """
+    Cache of generated texts keyed by model id, decoding parameters and prompt hash.
+
+    An in-memory LRU of `memory_entries` texts sits in front of an optional SQLite
+    file at `path`, shared by every worker on the host. The file is kept under
+    `max_bytes` by evicting the least recently used generations.
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = 0, memory_entries: int = 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with self._connection() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS generations "
+                    "(key TEXT PRIMARY KEY, output TEXT NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS generations_accessed_at ON generations (accessed_at)")
+
+    def _connection(self):
+        """One SQLite connection per thread (FastAPI runs sync endpoints in a thread pool)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def key(model_id: str, decoding: dict, prompt: str):
+        """Cache key: model id, canonical decoding parameters and the prompt's SHA-256."""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        parameters = json.dumps(decoding, sort_keys=True, default=str)
+        return hashlib.sha256(f"{model_id}\n{parameters}\n{prompt_hash}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Cached output for a key, or None."""
+        with self._lock:
+            output = self._entries.get(key)
+            if output is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return output
+
+        if self.path:
+            try:
+                with self._connection() as connection:
+                    row = connection.execute("SELECT output FROM generations WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        connection.execute("UPDATE generations SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error as e:
+                print(f"Generation cache read failed: {str(e)}")
+                row = None
+            if row is not None:
+                self._remember(key, row[0])
+                with self._lock:
+                    self.hits += 1
+                return row[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, output: str):
+        """Stores an output in memory and on disk, evicting old disk entries beyond max_bytes."""
+        self._remember(key, output)
+        if not self.path:
+            return
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO generations (key, output, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, output, len(output.encode("utf-8")), time.time())
+                )
+                total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0]
+                if total > self.max_bytes:
+                    # Drop the least recently used tenth of the entries in one statement
+                    connection.execute(
+                        "DELETE FROM generations WHERE key IN "
+                        "(SELECT key FROM generations ORDER BY accessed_at LIMIT MAX(1, (SELECT COUNT(*) FROM generations) / 10))"
+                    )
+        except sqlite3.Error as e:
+            print(f"Generation cache write failed: {str(e)}")
+
+    def _remember(self, key: str, output: str):
+        with self._lock:
+            self._entries[key] = output
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.memory_entries:
+                self._entries.popitem(last=False)
+
+    def generate(self, model_id: str, decoding: dict, prompt: str, generate_fn):
+        """
+        Returns generate_fn(prompt), served from the cache when the decoding is deterministic.
+
+        Args:
+            model_id (str): Model the output comes from.
+            decoding (dict): Generation parameters, part of the key.
+            prompt (str): Model input, hashed into the key.
+            generate_fn (callable): Produces the output text for the prompt on a miss.
+        """
+        if not is_deterministic(decoding):
+            return generate_fn(prompt)
+
+        key = self.key(model_id, decoding, prompt)
+        output = self.get(key)
+        if output is None:
+            output = generate_fn(prompt)
+            self.put(key, output)
+        return output
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "memory_entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+# Shared by the summariser and the LLM evaluator
+generation_cache = GenerationCache(
+    path=GENERATION_CACHE_PATH,
+    max_bytes=int(GENERATION_CACHE_MAX_MB * 1024 * 1024),
+    memory_entries=GENERATION_CACHE_MEMORY_ENTRIES
+)
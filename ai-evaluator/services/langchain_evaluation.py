@@ -1,34 +1,55 @@
 import json
+import re
 import torch
-from transformers import pipeline
+from transformers import pipeline, LogitsProcessor, LogitsProcessorList
 from langchain.prompts import PromptTemplate
 from langchain_huggingface import HuggingFacePipeline  
 from .prompt_templates import EVALUATION_PROMPT_TEMPLATE
+from .generation_cache import generation_cache, is_deterministic
+from .prompt_builder import PromptBuilder, split_criteria
+from .embedding_cache import encode_sentences
+from utils.document_analysis import DocumentAnalysis
+from config import GENERATION_PROFILE
+from models.generation_profile import generation_profile, load_seq2seq
+
+EVALUATION_MODEL_NAME = "google/flan-t5-large"
+
+# Decoding used for every evaluation, set by the inference profile; part of the generation cache key
+EVALUATION_DECODING = generation_profile()["evaluation"]
 
 # Determine the device: 0 for GPU if available, else -1 for CPU
 device_id = 0 if torch.cuda.is_available() else -1
 
 # Global variables to store model and evaluation chain
+local_pipeline = None
 llm_local = None
 evaluation_chain = None
+prompt_builder = None
+
+# Prompts generated together in one padded batch by evaluate_solutions_batch
+BATCH_SIZE = 8
+
+# Constrained evaluations read "Summary: <text>; <criterion> score: <1-5> feedback: <text>; ..."
+SUMMARY_MAX_TOKENS = 96
+FEEDBACK_MAX_TOKENS = 48
+FIELD_SEPARATOR = ";"
 
 def load_model():
     """
     Loads the model and initializes the pipeline only once.
     """
-    global llm_local, evaluation_chain
+    global local_pipeline, llm_local, evaluation_chain, prompt_builder
 
     if llm_local is None:  # Check if the model is already loaded
         print("Loading FLAN-T5 model for the first time...")
-        model_name = "google/flan-t5-large"
+        tokenizer, model = load_seq2seq(EVALUATION_MODEL_NAME)
         local_pipeline = pipeline(
             "text2text-generation",
-            model=model_name,
-            device=device_id,  
-            do_sample=True,
-            max_new_tokens=150,
-            num_beams=4,
-            temperature=0.2
+            model=model,
+            tokenizer=tokenizer,
+            # Quantised int8 layers only run on CPU
+            device=-1 if generation_profile()["quantize"] else device_id,
+            **EVALUATION_DECODING
         )
         llm_local = HuggingFacePipeline(pipeline=local_pipeline)
         
@@ -40,21 +61,208 @@ def load_model():
         
         # Create evaluation chain
         evaluation_chain = prompt_template | llm_local
+        prompt_builder = PromptBuilder(local_pipeline.tokenizer, EVALUATION_PROMPT_TEMPLATE)
         print("Model and evaluation chain loaded successfully.")
 
-def evaluate_solution(problem_statement, criteria, submission):
+class EvaluationSchemaProcessor(LogitsProcessor):
+    """
+    Makes one generate call produce a complete evaluation for the given criteria:
+    "Summary: <text>; <criterion> score: <1-5> feedback: <text>; ...".
+
+    Labels are forced token by token and scores are restricted to the digits 1-5.
+    Summary and feedback are free text of bounded length that may not contain the
+    separator: where the model would end the sequence, the separator (or, after the
+    last field, end-of-sequence) is produced instead. Every output therefore parses,
+    and generation stops as soon as the last field is complete.
+    """
+
+    def __init__(self, tokenizer, criteria: list):
+        self.eos_token_id = tokenizer.eos_token_id
+        self.separator_id = tokenizer.convert_tokens_to_ids(FIELD_SEPARATOR)
+        if self.separator_id == tokenizer.unk_token_id:
+            raise ValueError(f"The tokenizer has no {FIELD_SEPARATOR!r} token to separate fields")
+        # SentencePiece marks a leading space with "▁"; a score may be spelled either way
+        self.score_ids = sorted({
+            token_id for digit in "12345" for token_id in tokenizer.convert_tokens_to_ids([digit, f"▁{digit}"])
+            if token_id != tokenizer.unk_token_id
+        })
+
+        def label(text):
+            return tokenizer(text, add_special_tokens=False)["input_ids"]
+
+        self.segments = [("force", label("Summary:")), ("free", SUMMARY_MAX_TOKENS)]
+        for criterion in criteria:
+            self.segments += [
+                ("force", [self.separator_id] + label(f"{criterion} score:")),
+                ("score", 1),
+                ("force", label("feedback:")),
+                ("free", FEEDBACK_MAX_TOKENS)
+            ]
+        self.max_new_tokens = sum(len(value) if kind == "force" else value for kind, value in self.segments) + 1
+
+    def _state(self, generated: list):
+        """(segment, tokens of it generated) after `generated`, or None once the sequence has ended."""
+        segment, position = 0, 0
+        for token_id in generated:
+            if token_id == self.eos_token_id or segment == len(self.segments):
+                return None
+            kind, value = self.segments[segment]
+            if kind == "free" and token_id == self.separator_id:
+                # The separator ends the text and starts the next label
+                segment, position = segment + 1, 1
+                kind, value = self.segments[segment]
+            else:
+                position += 1
+            if kind != "free" and position >= (len(value) if kind == "force" else value):
+                segment, position = segment + 1, 0
+        return segment, position
+
+    def __call__(self, input_ids, scores):
+        for row in range(input_ids.shape[0]):
+            # The first decoder token is the start token
+            state = self._state(input_ids[row, 1:].tolist())
+            if state is None:
+                continue
+            segment, position = state
+            kind, value = self.segments[segment]
+            last = segment == len(self.segments) - 1
+
+            if kind == "free" and position < value:
+                if last:
+                    scores[row, self.separator_id] = -float("inf")
+                else:
+                    scores[row, self.separator_id] = scores[row, self.eos_token_id]
+                    scores[row, self.eos_token_id] = -float("inf")
+                continue
+
+            if kind == "force":
+                allowed = [value[position]]
+            elif kind == "score":
+                allowed = self.score_ids
+            else:
+                allowed = [self.eos_token_id if last else self.separator_id]
+            mask = torch.full_like(scores[row], -float("inf"))
+            mask[allowed] = 0
+            scores[row] = scores[row] + mask
+        return scores
+
+def parse_constrained_evaluation(output: str, criteria: list):
+    """Reads an EvaluationSchemaProcessor generation into {"Summary", "Evaluation": [{"Criterion", "Score", "Feedback"}]}."""
+    fields = output.split(FIELD_SEPARATOR)
+    evaluation = []
+    for criterion, field in zip(criteria, fields[1:]):
+        match = re.match(rf"\s*{re.escape(criterion)}\s*score:\s*([1-5])\s*feedback:\s*(.*)", field, re.DOTALL)
+        evaluation.append({
+            "Criterion": criterion,
+            "Score": int(match.group(1)) if match else None,
+            "Feedback": (match.group(2) if match else field).strip()
+        })
+    return {"Summary": re.sub(r"^\s*Summary:", "", fields[0]).strip(), "Evaluation": evaluation}
+
+def generate_constrained_evaluation(prompt: str, criteria: list):
+    """One generate call decoding the prompt under EvaluationSchemaProcessor; returns the generated text."""
+    tokenizer, model = local_pipeline.tokenizer, local_pipeline.model
+    processor = EvaluationSchemaProcessor(tokenizer, criteria)
+    inputs = tokenizer(prompt, return_tensors="pt", truncation=True).to(model.device)
+    decoding = {key: value for key, value in EVALUATION_DECODING.items() if key != "max_new_tokens"}
+    with torch.inference_mode():
+        output_ids = model.generate(
+            **inputs, **decoding,
+            max_new_tokens=processor.max_new_tokens,
+            logits_processor=LogitsProcessorList([processor])
+        )
+    return tokenizer.decode(output_ids[0], skip_special_tokens=True).strip()
+
+def evaluate_solution(problem_statement, criteria, submission, constrained=False):
     """
     Uses LangChain with a locally loaded FLAN-T5 model to evaluate a hackathon submission.
-    Returns a structured JSON object with scores, summary, and feedback.
+    Returns the generated evaluation text.
+
+    With constrained=True the output is decoded against the Summary/Evaluation schema
+    in one generate call (see EvaluationSchemaProcessor) and returned as
+    {"Summary", "Evaluation": [{"Criterion", "Score", "Feedback"}]}, with a 1-5 score per criterion.
     """
     if evaluation_chain is None:
         load_model()  # Ensure model is loaded before running
 
-    # Use the 'invoke' method to get the response
-    response = evaluation_chain.invoke({
-        "problem_statement": problem_statement,
-        "criteria": criteria,
-        "submission": submission
-    })
+    # Long submissions are cut down to their most criteria-relevant sentences so the prompt fits the encoder
+    built = prompt_builder.build(problem_statement=problem_statement, criteria=criteria, submission=submission)
+    inputs = built["values"]
+
+    # Identical inputs (retries, re-runs, unchanged resubmissions) are served from the cache when decoding is deterministic
+    prompt = built["prompt"]
+    if constrained:
+        criteria_list = [" ".join(criterion.split()) for criterion in split_criteria(criteria)] or ["overall"]
+        output = generation_cache.generate(
+            EVALUATION_MODEL_NAME,
+            {**EVALUATION_DECODING, "profile": GENERATION_PROFILE, "constrained": [SUMMARY_MAX_TOKENS, FEEDBACK_MAX_TOKENS]},
+            prompt,
+            lambda _: generate_constrained_evaluation(prompt, criteria_list)
+        )
+        return parse_constrained_evaluation(output, criteria_list)
+
+    response = generation_cache.generate(
+        EVALUATION_MODEL_NAME, {**EVALUATION_DECODING, "profile": GENERATION_PROFILE}, prompt,
+        # Stripped like the batch path's outputs, so both paths cache and return the same text for a key
+        lambda _: evaluation_chain.invoke(inputs).strip()
+    )
 
     return response  # Returning structured JSON response
+
+def parse_score(output: str):
+    """Extracts the 1-5 score from a generated evaluation, or None if it has none."""
+    match = re.search(r"\b([1-5])(?:\s*(?:/|out of)\s*5)?\b", output)
+    return int(match.group(1)) if match else None
+
+def evaluate_solutions_batch(evaluations: list, batch_size: int = BATCH_SIZE):
+    """
+    Evaluates many (problem statement, criteria, submission) prompts with batched generation.
+
+    Prompts are sorted by token length and generated batch_size at a time, so each
+    padded batch holds prompts of similar length and little compute goes to padding.
+    Results come back in input order.
+
+    Args:
+        evaluations (list): Dictionaries with problem_statement, criteria and submission.
+        batch_size (int): Prompts per generation batch.
+
+    Returns:
+        list: One {"criteria", "score", "raw_output"} dictionary per input.
+    """
+    if local_pipeline is None:
+        load_model()  # Ensure model is loaded before running
+
+    # Each submission is segmented, tokenised and embedded once however many criteria it is evaluated on
+    analyses = {}
+    for evaluation in evaluations:
+        submission = evaluation["submission"]
+        if submission not in analyses:
+            analyses[submission] = DocumentAnalysis(submission, encoder=lambda texts: encode_sentences(texts)[0])
+    prompts = [prompt_builder.build(analyses[evaluation["submission"]], **evaluation)["prompt"] for evaluation in evaluations]
+    outputs = [None] * len(prompts)
+
+    # Only prompts missing from the generation cache are generated
+    cacheable = is_deterministic(EVALUATION_DECODING)
+    keys = [generation_cache.key(EVALUATION_MODEL_NAME, {**EVALUATION_DECODING, "profile": GENERATION_PROFILE}, prompt) for prompt in prompts] if cacheable else []
+    if cacheable:
+        outputs = [generation_cache.get(key) for key in keys]
+    pending = [i for i, output in enumerate(outputs) if output is None]
+
+    tokenizer = local_pipeline.tokenizer
+    lengths = {i: len(tokenizer(prompts[i], truncation=True)["input_ids"]) for i in pending}
+    order = sorted(pending, key=lambda i: lengths[i])
+
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        generated = local_pipeline([prompts[i] for i in bucket], batch_size=len(bucket), truncation=True)
+        for i, result in zip(bucket, generated):
+            # The pipeline returns one list of candidates per prompt
+            result = result[0] if isinstance(result, list) else result
+            outputs[i] = result["generated_text"].strip()
+            if cacheable:
+                generation_cache.put(keys[i], outputs[i])
+
+    return [
+        {"criteria": evaluation["criteria"], "score": parse_score(output), "raw_output": output}
+        for evaluation, output in zip(evaluations, outputs)
+    ]
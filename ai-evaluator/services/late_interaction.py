@@ -0,0 +1,137 @@
+from functools import lru_cache
+import numpy as np
+from models.sbert_model import sbert_model
+from utils.text_processing import split_sentences
+from services.embedding_cache import encode_sentences
+
+GRANULARITIES = ("sentence", "token")
+
+def _normalise(vectors):
+    """L2-normalises rows and stores them as float16 so cosine similarity is a plain dot product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float16)
+
+def encode_multi_vector(texts: list, granularity: str = "sentence"):
+    """
+    Encodes each text into a set of float16 unit vectors.
+
+    With "sentence" granularity every text yields one SBERT sentence embedding, served
+    from the sentence embedding cache when possible; with "token" granularity every
+    text yields its contextual word-piece embeddings.
+
+    Returns:
+        list: One (n_vectors, dim) float16 array per input text.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularity must be one of {', '.join(GRANULARITIES)}")
+
+    if not texts:
+        return []
+
+    if granularity == "sentence":
+        embeddings, _ = encode_sentences(texts)
+        return [_normalise(embedding[np.newaxis, :]) for embedding in embeddings]
+
+    token_embeddings = sbert_model.encode(texts, output_value="token_embeddings", convert_to_numpy=False)
+    return [_normalise(embedding.float().cpu().numpy()) for embedding in token_embeddings]
+
+def encode_submission(student_submission: str, granularity: str = "sentence"):
+    """
+    Encodes a submission into its stored multi-vector form.
+
+    The returned float16 matrix can be kept and re-scored against any rubric later
+    with `score_parameters`, without running the encoder again.
+
+    Returns:
+        dict: Sentences, the stacked (n_vectors, dim) float16 vectors, and the sentence each vector came from.
+    """
+    sentences = split_sentences(student_submission)
+    if not sentences:
+        raise ValueError("Student submission cannot be empty")
+
+    per_sentence = encode_multi_vector(sentences, granularity)
+
+    return {
+        "granularity": granularity,
+        "sentences": sentences,
+        "vectors": np.vstack(per_sentence),
+        "sentence_index": np.concatenate([np.full(len(vectors), i) for i, vectors in enumerate(per_sentence)])
+    }
+
+@lru_cache(maxsize=512)
+def encode_parameter(problem_statement: str, parameter: str, description: str, granularity: str = "sentence"):
+    """
+    Encodes one rubric parameter into its query vectors.
+
+    Every sentence of the description becomes one query, prefixed with the parameter
+    name and followed by the problem statement for context. Rubrics are shared by
+    every submission in a hackathon, so results are memoised.
+    """
+    queries = [f"{parameter}: {sentence} Problem statement: {problem_statement}" for sentence in split_sentences(description)]
+    if not queries:
+        queries = [f"{parameter}. Problem statement: {problem_statement}"]
+
+    return np.vstack(encode_multi_vector(queries, granularity))
+
+def encode_rubric(problem_statement: str, parameter_definitions: dict, granularity: str = "sentence"):
+    """Encodes every rubric parameter into its query vectors."""
+    return {
+        parameter: encode_parameter(problem_statement, parameter, description, granularity)
+        for parameter, description in parameter_definitions.items()
+    }
+
+def score_parameters(rubric_vectors: dict, submission: dict):
+    """
+    Scores a stored submission against encoded rubric parameters by late interaction.
+
+    Each query vector of a parameter is matched to its most similar submission vector,
+    and the summed max-similarities are averaged over the queries so the score stays
+    on the usual 0-100 scale. Only matrix products are needed here.
+
+    Returns:
+        dict: Late-interaction score and best-supporting sentence for each parameter.
+    """
+    document_vectors = submission["vectors"].astype(np.float32)
+    parameter_scores = {}
+
+    for parameter, query_vectors in rubric_vectors.items():
+        similarities = query_vectors.astype(np.float32) @ document_vectors.T
+        best_matches = similarities.argmax(axis=1)
+        max_similarities = similarities[np.arange(len(best_matches)), best_matches]
+
+        score = round(float(np.clip(max_similarities.sum() / len(max_similarities), 0, 1) * 100), 2)
+        strongest_query = max_similarities.argmax()
+        best_sentence = submission["sentences"][submission["sentence_index"][best_matches[strongest_query]]]
+
+        parameter_scores[parameter] = {
+            "late_interaction_similarity": score,
+            "final_score": score,
+            "best_sentence": best_sentence
+        }
+
+    return parameter_scores
+
+def evaluate_parameters_late_interaction(problem_statement: str, student_submission: str, parameter_definitions: dict, granularity: str = "sentence"):
+    """
+    Evaluates a student submission on multiple parameters with multi-vector late interaction.
+
+    Args:
+        problem_statement (str): The problem statement to evaluate against.
+        student_submission (str): The student's submission text.
+        parameter_definitions (dict): Dictionary mapping parameters to their descriptions.
+        granularity (str): "sentence" or "token" vectors.
+
+    Returns:
+        dict: Dictionary containing scores for each parameter.
+    """
+    if not problem_statement or not student_submission:
+        raise ValueError("Problem statement and student submission cannot be empty")
+
+    if not parameter_definitions:
+        raise ValueError("At least one parameter must be provided")
+
+    submission = encode_submission(student_submission, granularity)
+    rubric_vectors = encode_rubric(problem_statement, parameter_definitions, granularity)
+
+    return score_parameters(rubric_vectors, submission)
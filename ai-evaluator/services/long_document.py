@@ -0,0 +1,141 @@
+import time
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+from models.sbert_model import sbert_model
+from services.embedding_cache import encode_sentences
+from utils.text_processing import split_sentences
+from config import LONG_DOC_CHUNK_TOKENS, LONG_DOC_CHUNK_OVERLAP, LONG_DOC_MAX_CHUNKS, LONG_DOC_BATCH_SIZE
+
+def split_into_chunks(text: str, chunk_tokens: int = LONG_DOC_CHUNK_TOKENS, overlap: int = LONG_DOC_CHUNK_OVERLAP, max_chunks: int = LONG_DOC_MAX_CHUNKS):
+    """
+    Splits text into overlapping chunks that each fit in the SBERT context window.
+
+    Chunk boundaries are computed on word pieces and mapped back to character
+    offsets, so every chunk is a verbatim slice of the original text. When the
+    document needs more than `max_chunks` windows, windows are sampled evenly
+    across the whole document instead of keeping only the beginning.
+
+    Returns:
+        tuple: (chunk strings, word-piece count per chunk, total word pieces in the text,
+        whether windows had to be sampled to respect `max_chunks`)
+    """
+    window = min(chunk_tokens, sbert_model.max_seq_length) - 2  # Leave room for [CLS] and [SEP]
+    if window <= 0:
+        raise ValueError("Chunk size must be larger than the special tokens")
+    if not (0 <= overlap < window):
+        raise ValueError("Chunk overlap must be between 0 and the chunk size")
+    if max_chunks < 1:
+        raise ValueError("At least one chunk must be allowed")
+
+    encoding = sbert_model.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+    offsets = encoding["offset_mapping"]
+    token_count = len(offsets)
+
+    if token_count == 0:
+        return [], [], 0, False
+
+    stride = window - overlap
+    starts = list(range(0, max(token_count - overlap, 1), stride))
+
+    sampled = len(starts) > max_chunks
+    if sampled:
+        picked = np.unique(np.linspace(0, len(starts) - 1, max_chunks).round().astype(int))
+        starts = [starts[i] for i in picked]
+
+    chunks = []
+    chunk_token_counts = []
+    for start in starts:
+        end = min(start + window, token_count)
+        chunks.append(text[offsets[start][0]:offsets[end - 1][1]])
+        chunk_token_counts.append(end - start)
+
+    return chunks, chunk_token_counts, token_count, sampled
+
+def generate_document_embedding(text: str, chunk_tokens: int = LONG_DOC_CHUNK_TOKENS, overlap: int = LONG_DOC_CHUNK_OVERLAP, max_chunks: int = LONG_DOC_MAX_CHUNKS):
+    """
+    Embeds a document of any length by batch-encoding its chunks.
+
+    Returns:
+        dict: Chunk embeddings, the token-weighted mean-pooled document embedding,
+        and the token counts and encode time needed to report cost per token.
+    """
+    started = time.perf_counter()
+
+    chunks, chunk_token_counts, token_count, sampled = split_into_chunks(text, chunk_tokens, overlap, max_chunks)
+    if not chunks:
+        raise ValueError("Cannot embed an empty document")
+
+    chunk_embeddings = sbert_model.encode(chunks, batch_size=LONG_DOC_BATCH_SIZE, convert_to_numpy=True)
+    document_embedding = np.average(chunk_embeddings, axis=0, weights=chunk_token_counts)
+
+    encode_ms = (time.perf_counter() - started) * 1000
+    encoded_tokens = int(sum(chunk_token_counts))
+
+    return {
+        "chunk_embeddings": chunk_embeddings,
+        "document_embedding": document_embedding,
+        "chunk_count": len(chunks),
+        "token_count": token_count,
+        "encoded_tokens": encoded_tokens,
+        "sampled": sampled,
+        "encode_ms": round(encode_ms, 2)
+    }
+
+def generate_incremental_document_embedding(text: str):
+    """
+    Embeds a document sentence by sentence through the sentence embedding cache.
+
+    Only sentences that are new or changed since they were last seen are encoded;
+    the document vector is rebuilt from the cached pieces as their token-weighted
+    mean. A lightly edited re-submission therefore costs a few sentence encodes.
+
+    Returns:
+        dict: Same fields as `generate_document_embedding`, with sentences as chunks,
+        plus how many sentences were served from the cache.
+    """
+    started = time.perf_counter()
+
+    sentences = split_sentences(text)
+    if not sentences:
+        raise ValueError("Cannot embed an empty document")
+
+    sentence_embeddings, cache_hits = encode_sentences(sentences)
+
+    max_tokens = sbert_model.max_seq_length - 2  # Longer sentences are truncated by the encoder
+    token_counts = np.array([
+        max(1, min(len(ids), max_tokens))
+        for ids in sbert_model.tokenizer(sentences, add_special_tokens=False, verbose=False)["input_ids"]
+    ])
+    document_embedding = np.average(sentence_embeddings, axis=0, weights=token_counts)
+
+    encode_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "chunk_embeddings": sentence_embeddings,
+        "document_embedding": document_embedding,
+        "chunk_count": len(sentences),
+        "token_count": int(token_counts.sum()),
+        "encoded_tokens": int(token_counts[~cache_hits].sum()),
+        "sampled": False,
+        "encode_ms": round(encode_ms, 2),
+        "cached_sentences": int(cache_hits.sum())
+    }
+
+def max_chunk_similarity(document: dict, parameter_embedding):
+    """Cosine similarity (0-100) between a parameter and the document chunk that matches it best."""
+    similarities = cosine_similarity([parameter_embedding], document["chunk_embeddings"])[0]
+    return round(float(similarities.max() * 100), 2)
+
+def document_stats(document: dict):
+    """JSON-serialisable size and cost figures for a document embedding."""
+    stats = {
+        "token_count": document["token_count"],
+        "chunk_count": document["chunk_count"],
+        "encoded_tokens": document["encoded_tokens"],
+        "sampled": document["sampled"],
+        "encode_ms": document["encode_ms"],
+        "ms_per_1k_tokens": round(document["encode_ms"] * 1000 / max(document["encoded_tokens"], 1), 2)
+    }
+    if "cached_sentences" in document:
+        stats["cached_sentences"] = document["cached_sentences"]
+    return stats
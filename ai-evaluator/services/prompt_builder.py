@@ -0,0 +1,107 @@
+import re
+import string
+from collections import deque
+from functools import lru_cache
+import numpy as np
+from services.embedding_cache import encode_sentences
+from utils.document_analysis import DocumentAnalysis
+from config import PROMPT_TOKEN_BUDGET
+
+# Tokens kept free for the end-of-sequence token and for merges at the joins between template and values
+PROMPT_TOKEN_MARGIN = 8
+
+def split_criteria(criteria: str):
+    """Criteria given as a comma-, semicolon- or line-separated list."""
+    return [criterion.strip(" -*\t") for criterion in re.split(r"[,;\n]+", criteria) if criterion.strip(" -*\t")]
+
+class PromptBuilder:
+    """
+    Builds evaluation prompts that fit the model's encoder instead of being truncated by it.
+
+    The template's static text is tokenised once. Problem statements and criteria,
+    which repeat across a hackathon's submissions, have their token counts memoised.
+    The remaining budget is filled with the submission sentences most similar to the
+    criteria: each criterion in turn gets its next best sentence, so every criterion
+    is covered before any gets a second one. Selected sentences keep their document order.
+    """
+
+    def __init__(self, tokenizer, template: str, budget: int = PROMPT_TOKEN_BUDGET):
+        self.tokenizer = tokenizer
+        self.template = template
+        self.budget = budget
+        self.fields = [field for _, field, _, _ in string.Formatter().parse(template) if field]
+        static_text = [literal for literal, _, _, _ in string.Formatter().parse(template)]
+        self.static_tokens = sum(len(ids) for ids in tokenizer(static_text, add_special_tokens=False)["input_ids"])
+        self._count = lru_cache(maxsize=4096)(self._count_uncached)
+
+    def _count_uncached(self, text: str):
+        return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    def count_tokens(self, text: str):
+        """Model tokens in text, memoised for repeated values such as problem statements."""
+        return self._count(text)
+
+    def select(self, submission: DocumentAnalysis, criteria: str, budget: int):
+        """
+        The most criteria-relevant sentences of a submission that fit in `budget` tokens, in document order.
+        The submission's sentences, token counts and embeddings come from its analysis, so
+        selecting for several criteria segments, tokenises and embeds the submission once.
+
+        Returns:
+            tuple: (selected text, its token count, sentences selected, sentences in the submission)
+        """
+        sentences = submission.sentences
+        if not sentences or budget <= 0:
+            return "", 0, 0, len(sentences)
+
+        _, lengths = submission.model_token_counts(self.tokenizer)
+        targets, _ = encode_sentences(split_criteria(criteria) or [criteria])
+        embeddings = submission.sentence_embeddings
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        targets = targets / np.maximum(np.linalg.norm(targets, axis=1, keepdims=True), 1e-12)
+        similarity = targets @ embeddings.T  # criteria x sentences
+
+        rankings = [deque(np.argsort(-row, kind="stable").tolist()) for row in similarity]
+        selected = set()
+        used = 0
+        while any(rankings):
+            for ranking in rankings:
+                # Skip sentences already taken for another criterion, and ones that no longer fit
+                while ranking and (ranking[0] in selected or used + lengths[ranking[0]] > budget):
+                    ranking.popleft()
+                if ranking:
+                    index = ranking.popleft()
+                    selected.add(index)
+                    used += lengths[index]
+
+        picked = sorted(selected)
+        return " ".join(sentences[i] for i in picked), used, len(picked), len(sentences)
+
+    def build(self, analysis: DocumentAnalysis = None, **values):
+        """
+        Fills the template, shortening the submission to the token budget when the full prompt would not fit.
+        Pass the submission's analysis when building several prompts for it, e.g. one per criterion.
+
+        Returns:
+            dict: The prompt, its values, estimated prompt tokens, and how many submission sentences were kept.
+        """
+        submission = values.get("submission", "")
+        analysis = analysis or DocumentAnalysis(submission, encoder=lambda texts: encode_sentences(texts)[0])
+        fixed = sum(self.count_tokens(str(values[field])) for field in self.fields if field != "submission")
+        available = self.budget - self.static_tokens - fixed - PROMPT_TOKEN_MARGIN
+        submission_tokens, _ = analysis.model_token_counts(self.tokenizer)
+
+        if submission_tokens <= available:
+            kept, total = None, None
+        else:
+            submission, submission_tokens, kept, total = self.select(analysis, values.get("criteria", ""), available)
+
+        values = {**values, "submission": submission}
+        return {
+            "prompt": self.template.format(**values),
+            "values": values,
+            "prompt_tokens": self.static_tokens + fixed + submission_tokens,
+            "shortened": kept is not None,
+            "sentences_kept": kept,
+            "sentences_total": total
+        }
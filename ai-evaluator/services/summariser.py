@@ -1,16 +1,144 @@
+import os
+import time
+import torch
+import numpy as np
 from models.bart_model import bart_model, tokenizer
+from config import (
+    BART_MODEL_NAME, SUMMARY_CHUNK_TOKENS, SUMMARY_MAX_CHUNKS, SUMMARY_CHUNK_SUMMARY_TOKENS,
+    SUMMARY_MAX_TOKENS, SUMMARY_MAP_BEAMS, SUMMARY_BATCH_SIZE, GENERATION_PROFILE
+)
+from models.generation_profile import generation_profile
+from services.generation_cache import generation_cache
+from utils.text_processing import split_sentences
+
+# Beam search is deterministic, so identical texts are summarised once and then served from the cache.
+# The inference profile may lower the beams and length caps; it is part of the key since quantised weights change outputs.
+# Caps set explicitly in the environment win over the profile's presets.
+_SUMMARY_ENV_SETTINGS = {
+    "chunk_summary_tokens": ("SUMMARY_CHUNK_SUMMARY_TOKENS", SUMMARY_CHUNK_SUMMARY_TOKENS),
+    "max_summary_tokens": ("SUMMARY_MAX_TOKENS", SUMMARY_MAX_TOKENS),
+    "map_beams": ("SUMMARY_MAP_BEAMS", SUMMARY_MAP_BEAMS)
+}
+SUMMARY_DECODING = {
+    "max_input_tokens": 1024,
+    "length_penalty": 2.0,
+    "num_beams": 4,
+    "early_stopping": True,
+    "chunk_tokens": SUMMARY_CHUNK_TOKENS,
+    "max_chunks": SUMMARY_MAX_CHUNKS,
+    "chunk_summary_tokens": SUMMARY_CHUNK_SUMMARY_TOKENS,
+    "max_summary_tokens": SUMMARY_MAX_TOKENS,
+    "map_beams": SUMMARY_MAP_BEAMS,
+    **generation_profile()["summary"],
+    **{key: value for key, (variable, value) in _SUMMARY_ENV_SETTINGS.items() if variable in os.environ},
+    "profile": GENERATION_PROFILE
+}
+
+# Reduce rounds before the remaining chunk summaries are truncated into one final input
+MAX_REDUCE_LEVELS = 3
+
+def _generate(texts, num_beams: int, max_new_tokens: int, batch_size: int = SUMMARY_BATCH_SIZE):
+    """Summarises texts in padded batches of batch_size; each text must fit in the model's input."""
+    summaries = []
+    for start in range(0, len(texts), batch_size):
+        inputs = tokenizer(
+            texts[start:start + batch_size], return_tensors="pt", padding=True,
+            max_length=SUMMARY_DECODING["max_input_tokens"], truncation=True
+        )
+        with torch.inference_mode():
+            summary_ids = bart_model.generate(
+                inputs.input_ids,
+                attention_mask=inputs.attention_mask,
+                max_new_tokens=max_new_tokens,
+                min_length=min(bart_model.config.min_length or 0, max_new_tokens // 2),
+                length_penalty=SUMMARY_DECODING["length_penalty"],
+                num_beams=num_beams,
+                early_stopping=SUMMARY_DECODING["early_stopping"]
+            )
+        summaries.extend(tokenizer.batch_decode(summary_ids, skip_special_tokens=True))
+    return [summary.strip() for summary in summaries]
+
+def split_into_chunks(text: str, chunk_tokens: int = SUMMARY_CHUNK_TOKENS):
+    """
+    Packs consecutive sentences into chunks of at most chunk_tokens BART tokens.
+    Sentences longer than a chunk are cut at token boundaries.
+
+    Returns:
+        tuple: (chunk strings, total BART tokens in the text)
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return [], 0
+
+    token_ids = tokenizer(sentences, add_special_tokens=False)["input_ids"]
+    chunks = []
+    current, current_tokens = [], 0
+    for sentence, ids in zip(sentences, token_ids):
+        if len(ids) > chunk_tokens:
+            pieces = [tokenizer.decode(ids[start:start + chunk_tokens]) for start in range(0, len(ids), chunk_tokens)]
+            piece_lengths = [min(chunk_tokens, len(ids) - start) for start in range(0, len(ids), chunk_tokens)]
+        else:
+            pieces, piece_lengths = [sentence], [len(ids)]
+
+        for piece, length in zip(pieces, piece_lengths):
+            if current and current_tokens + length > chunk_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += length
+    if current:
+        chunks.append(" ".join(current))
+
+    return chunks, sum(len(ids) for ids in token_ids)
+
+def summarise_long_document(text: str, max_chunks: int = SUMMARY_MAX_CHUNKS):
+    """
+    Map-reduce summary of a text of any length.
+
+    The text is split into chunks that fit BART's input, the chunks are
+    summarised in batches, and the joined chunk summaries are summarised
+    again until they fit one input. When the text needs more than max_chunks
+    chunks, chunks are sampled evenly across the whole document, so the
+    generation work per submission never exceeds max_chunks chunk summaries
+    plus the reduce step.
+
+    Returns:
+        dict: The summary, chunk and token counts, whether chunks were sampled,
+        the number of reduce levels and the generation time.
+    """
+    started = time.perf_counter()
+    chunks, token_count = split_into_chunks(text)
+    chunk_count = len(chunks)
+
+    sampled = chunk_count > max_chunks
+    if sampled:
+        picked = np.unique(np.linspace(0, chunk_count - 1, max_chunks).round().astype(int))
+        chunks = [chunks[i] for i in picked]
+
+    levels = 0
+    while len(chunks) > 1 and levels < MAX_REDUCE_LEVELS:
+        summaries = _generate(chunks, SUMMARY_DECODING["map_beams"], SUMMARY_DECODING["chunk_summary_tokens"])
+        chunks, _ = split_into_chunks(" ".join(summaries))
+        levels += 1
+
+    summary = _generate([" ".join(chunks)], SUMMARY_DECODING["num_beams"], SUMMARY_DECODING["max_summary_tokens"])[0] if chunks else ""
+
+    return {
+        "summary": summary,
+        "chunk_count": chunk_count,
+        "summarised_chunks": min(chunk_count, max_chunks),
+        "token_count": token_count,
+        "sampled": sampled,
+        "reduce_levels": levels,
+        "generate_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+def _summarise(text: str):
+    return summarise_long_document(text)["summary"]
 
 def generate_summary(text: str):
     """
     Generates a summary using the preloaded BART model.
+    Texts longer than one BART input are summarised chunk by chunk and then merged.
     """
-    inputs = tokenizer(text, return_tensors="pt", max_length=1024, truncation=True)
-    summary_ids = bart_model.generate(
-        inputs.input_ids, 
-        # max_length=150, 
-        # min_length=40, 
-        length_penalty=2.0, 
-        num_beams=4, 
-        early_stopping=True
-    )
-    return tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+    return generation_cache.generate(BART_MODEL_NAME, SUMMARY_DECODING, text, _summarise)
@@ -0,0 +1,41 @@
+import sys
+import time
+from common import load_fixtures
+
+from services.langchain_evaluation import evaluate_solution, evaluate_solutions_batch, load_model
+
+CRITERIA = ["feasibility", "innovation", "impact", "clarity"]
+BATCH_SIZES = (4, 8, 16)
+
+def fixture_prompts():
+    """Every langchain_evaluation fixture paired with every criterion, as a judge panel would request them."""
+    return [
+        {"problem_statement": fixture["problem_statement"], "criteria": criteria, "submission": fixture["submission"]}
+        for fixture in load_fixtures("langchain_evaluation").values()
+        for criteria in CRITERIA
+    ]
+
+def run():
+    """Compares prompts/sec of one evaluation_chain.invoke per prompt with length-bucketed batches."""
+    prompts = fixture_prompts()
+    load_model()
+    evaluate_solutions_batch(prompts[:2], batch_size=2)  # Warm up
+
+    started = time.perf_counter()
+    for prompt in prompts:
+        evaluate_solution(**prompt)
+    sequential_seconds = time.perf_counter() - started
+
+    print(f"\n=== FLAN-T5 evaluation of {len(prompts)} prompts ===")
+    print(f"one at a time:   {len(prompts) / sequential_seconds:6.2f} prompts/sec")
+
+    for batch_size in BATCH_SIZES:
+        started = time.perf_counter()
+        results = evaluate_solutions_batch(prompts, batch_size=batch_size)
+        batch_seconds = time.perf_counter() - started
+        parsed = sum(result["score"] is not None for result in results)
+        print(f"batch size {batch_size:>3}:  {len(prompts) / batch_seconds:6.2f} prompts/sec  "
+              f"({sequential_seconds / batch_seconds:.1f}x, {parsed}/{len(results)} scores parsed)")
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,81 @@
+import sys
+import torch
+from common import load_fixtures, timed, percentile
+
+from config import BART_MODEL_NAME, SUMMARY_MAX_TOKENS, TORCH_NUM_THREADS
+from models.generation_profile import GENERATION_PROFILES, load_seq2seq
+from services.prompt_templates import EVALUATION_PROMPT_TEMPLATE
+from services.langchain_evaluation import EVALUATION_MODEL_NAME, parse_score
+
+def rouge_l(candidate: str, reference: str):
+    """ROUGE-L F1 between two texts over lower-cased words."""
+    a, b = candidate.lower().split(), reference.lower().split()
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for word in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if word == other else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+def generate(tokenizer, model, text: str, max_input_tokens: int, **decoding):
+    inputs = tokenizer(text, return_tensors="pt", max_length=max_input_tokens, truncation=True)
+    with torch.inference_mode():
+        output_ids = model.generate(**inputs, **decoding)
+    return tokenizer.decode(output_ids[0], skip_special_tokens=True).strip()
+
+def run_profile(name: str):
+    """Summaries and evaluations of every fixture under one profile, with per-call latencies."""
+    profile = GENERATION_PROFILES[name]
+    summary_decoding = {
+        "num_beams": profile["summary"]["num_beams"],
+        "max_new_tokens": profile["summary"].get("max_summary_tokens", SUMMARY_MAX_TOKENS),
+        "length_penalty": 2.0,
+        "early_stopping": True
+    }
+    results = {"summaries": {}, "scores": {}, "summary_ms": [], "evaluation_ms": []}
+
+    tokenizer, model = load_seq2seq(BART_MODEL_NAME, name)
+    for fixture_name, fixture in load_fixtures("summary").items():
+        summary, elapsed = timed(generate, tokenizer, model, fixture["student_submission"], 1024, **summary_decoding)
+        results["summaries"][fixture_name] = summary
+        results["summary_ms"].append(elapsed)
+
+    tokenizer, model = load_seq2seq(EVALUATION_MODEL_NAME, name)
+    for fixture_name, fixture in load_fixtures("langchain_evaluation").items():
+        prompt = EVALUATION_PROMPT_TEMPLATE.format(**fixture)
+        output, elapsed = timed(generate, tokenizer, model, prompt, 512, **profile["evaluation"])
+        results["scores"][fixture_name] = parse_score(output)
+        results["evaluation_ms"].append(elapsed)
+
+    return results
+
+def run():
+    """
+    Compares latency and output quality of the generative inference profiles on the
+    test/summary and test/langchain_evaluation fixtures. Quality is measured against
+    the default profile: ROUGE-L of the summaries and agreement of the 1-5 scores.
+    """
+    print(f"torch threads: {TORCH_NUM_THREADS}")
+    results = {name: run_profile(name) for name in GENERATION_PROFILES}
+    baseline = results["default"]
+
+    for name, result in results.items():
+        rouge = [rouge_l(result["summaries"][fixture], baseline["summaries"][fixture]) for fixture in baseline["summaries"]]
+        agreement = [result["scores"][fixture] == baseline["scores"][fixture] for fixture in baseline["scores"]]
+        print(f"\n=== {name} ===")
+        print(f"BART summary:      p50 {percentile(result['summary_ms'], 50):8.0f} ms  p95 {percentile(result['summary_ms'], 95):8.0f} ms  "
+              f"ROUGE-L vs default {sum(rouge) / len(rouge):.3f}")
+        print(f"FLAN-T5 evaluation: p50 {percentile(result['evaluation_ms'], 50):7.0f} ms  p95 {percentile(result['evaluation_ms'], 95):8.0f} ms  "
+              f"scores matching default {sum(agreement)}/{len(agreement)}")
+        for fixture, score in result["scores"].items():
+            print(f"  {fixture:<16} score {score}")
+
+if __name__ == "__main__":
+    sys.exit(run())
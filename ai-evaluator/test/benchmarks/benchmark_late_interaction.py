@@ -0,0 +1,54 @@
+from common import load_fixtures, timed
+
+from services.evaluate_parameters import evaluate_parameters
+from services.late_interaction import encode_submission, encode_rubric, score_parameters, encode_parameter
+
+RESCORE_ROUNDS = 200
+
+def benchmark(granularity: str = "sentence"):
+    """
+    Compares the weighted SBERT/TF-IDF scorer with the late-interaction scorer on the
+    fixtures in test/evaluate_parameters/, including re-scoring stored submission vectors.
+    """
+    fixtures = load_fixtures("evaluate_parameters")
+    weighted_ms = encode_ms = rubric_ms = rescore_ms = 0.0
+    parameter_count = 0
+
+    for name, fixture in fixtures.items():
+        weighted, elapsed = timed(
+            evaluate_parameters,
+            fixture["problem_statement"],
+            fixture["student_submission"],
+            fixture["parameter_definitions"],
+            fixture["sbert_weight"],
+            fixture["tfidf_weight"]
+        )
+        weighted_ms += elapsed
+
+        submission, elapsed = timed(encode_submission, fixture["student_submission"], granularity)
+        encode_ms += elapsed
+
+        encode_parameter.cache_clear()
+        rubric, elapsed = timed(encode_rubric, fixture["problem_statement"], fixture["parameter_definitions"], granularity)
+        rubric_ms += elapsed
+
+        _, elapsed = timed(lambda: [score_parameters(rubric, submission) for _ in range(RESCORE_ROUNDS)])
+        rescore_ms += elapsed / RESCORE_ROUNDS
+        late = score_parameters(rubric, submission)
+        parameter_count += len(rubric)
+
+        print(f"\n{name}: {len(submission['sentences'])} sentences, {submission['vectors'].shape[0]} vectors, "
+              f"{submission['vectors'].nbytes} bytes stored")
+        for parameter in fixture["parameter_definitions"]:
+            print(f"  {parameter:<40} weighted={weighted[parameter]['final_score']:6.2f}  "
+                  f"late_interaction={late[parameter]['final_score']:6.2f}")
+
+    submissions = len(fixtures)
+    print(f"\n=== Throughput ({granularity} vectors, {submissions} submissions, {parameter_count} parameters) ===")
+    print(f"weighted scorer:            {submissions / (weighted_ms / 1000):8.2f} submissions/sec")
+    print(f"late interaction (cold):    {submissions / ((encode_ms + rubric_ms) / 1000):8.2f} submissions/sec")
+    print(f"late interaction (re-score):{parameter_count / (rescore_ms / 1000):8.0f} parameters/sec")
+
+if __name__ == "__main__":
+    benchmark("sentence")
+    benchmark("token")
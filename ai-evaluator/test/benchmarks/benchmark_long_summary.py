@@ -0,0 +1,29 @@
+import sys
+from common import load_fixtures, timed
+
+from services.summariser import summarise_long_document, split_into_chunks
+
+# Transcript lengths simulated by repeating the summary fixtures
+REPEATS = (1, 4, 16, 64)
+MAX_CHUNKS = (4, 8)
+
+def run():
+    """
+    Reports chunks, reduce levels and wall time of the map-reduce summariser as
+    submissions grow, showing that time levels off once max_chunks is reached.
+    """
+    fixtures = load_fixtures("summary")
+    summarise_long_document("Warm up the model with a short text.")
+
+    for name, fixture in fixtures.items():
+        print(f"\n=== {name} ===")
+        for repeats in REPEATS:
+            text = "\n".join([fixture["student_submission"]] * repeats)
+            chunks, token_count = split_into_chunks(text)
+            for max_chunks in MAX_CHUNKS:
+                result, elapsed = timed(summarise_long_document, text, max_chunks)
+                print(f"{token_count:>7} tokens  {len(chunks):>3} chunks  max_chunks={max_chunks}  "
+                      f"levels={result['reduce_levels']}  sampled={result['sampled']!s:<5}  {elapsed:8.0f} ms")
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,58 @@
+import sys
+import numpy as np
+from common import load_fixtures, timed
+
+from transformers import AutoTokenizer
+from services.langchain_evaluation import EVALUATION_MODEL_NAME
+from services.prompt_templates import EVALUATION_PROMPT_TEMPLATE
+from services.prompt_builder import PromptBuilder, split_criteria
+from services.embedding_cache import encode_sentences
+from utils.text_processing import split_sentences
+
+CRITERIA = "feasibility, innovation, impact, scalability, clarity"
+ENCODER_LIMIT = 512
+BUDGETS = (512, 384, 256)
+
+def seen_text(tokenizer, prompt: str):
+    """What the encoder actually reads of a prompt after truncation at ENCODER_LIMIT tokens."""
+    ids = tokenizer(prompt, truncation=True, max_length=ENCODER_LIMIT)["input_ids"]
+    return tokenizer.decode(ids, skip_special_tokens=True), len(ids)
+
+def coverage(text: str, criteria: str):
+    """Mean over criteria of the best sentence similarity to the criterion in the text."""
+    sentences = split_sentences(text)
+    targets = split_criteria(criteria)
+    embeddings, _ = encode_sentences(targets + sentences)
+    embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    similarity = embeddings[:len(targets)] @ embeddings[len(targets):].T
+    return float(similarity.max(axis=1).mean())
+
+def run():
+    """
+    Compares the full-submission prompt (which the encoder truncates) with budgeted prompts
+    on long submissions built from the langchain_evaluation fixtures: tokens the encoder
+    reads and how well the text it reads covers the criteria.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(EVALUATION_MODEL_NAME)
+    fixtures = load_fixtures("langchain_evaluation")
+    # Every fixture's submission appended to the long ones, as a rambling multi-part transcript would be
+    padding = " ".join(fixture["submission"] for fixture in fixtures.values())
+
+    for name, fixture in fixtures.items():
+        if len(fixture["submission"]) < 1000:
+            continue
+        values = {"problem_statement": fixture["problem_statement"], "criteria": CRITERIA, "submission": f"{padding} {fixture['submission']}"}
+        full_text, full_tokens = seen_text(tokenizer, EVALUATION_PROMPT_TEMPLATE.format(**values))
+        submission_tokens = len(tokenizer(values["submission"], add_special_tokens=False)["input_ids"])
+        print(f"\n=== {name} ({submission_tokens} submission tokens) ===")
+        print(f"full prompt:  {full_tokens:>4} tokens read  coverage {coverage(full_text, CRITERIA):.3f}")
+
+        for budget in BUDGETS:
+            builder = PromptBuilder(tokenizer, EVALUATION_PROMPT_TEMPLATE, budget)
+            built, elapsed = timed(builder.build, **values)
+            text, tokens = seen_text(tokenizer, built["prompt"])
+            print(f"budget {budget:>4}:  {tokens:>4} tokens read  coverage {coverage(text, CRITERIA):.3f}  "
+                  f"{built['sentences_kept']}/{built['sentences_total']} sentences  {elapsed:6.1f} ms")
+
+if __name__ == "__main__":
+    sys.exit(run())
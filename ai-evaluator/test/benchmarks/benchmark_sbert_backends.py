@@ -0,0 +1,81 @@
+import sys
+from common import load_fixtures, timed, percentile
+
+from sklearn.metrics.pairwise import cosine_similarity
+from config import SBERT_BACKEND
+from models.sbert_model import load_sbert_model, sbert_model
+
+# Maximum allowed difference from the fp32 PyTorch model, in similarity points on the 0-100 scale
+SCORE_TOLERANCE = {
+    "onnx": 0.1,
+    "onnx-int8": 2.0
+}
+
+LATENCY_ROUNDS = 20
+
+def fixture_pairs():
+    """(label, text_a, text_b) pairs scored by the SBERT paths of evaluate_parameters and evaluate_similarity."""
+    pairs = []
+    for name, fixture in load_fixtures("evaluate_parameters").items():
+        for parameter, description in fixture["parameter_definitions"].items():
+            parameter_text = f"{fixture['problem_statement']} - Focus on {description}"
+            pairs.append((f"evaluate_parameters/{name}/{parameter}", fixture["student_submission"], parameter_text))
+    for name, fixture in load_fixtures("ideal_solution").items():
+        pairs.append((f"ideal_solution/{name}", fixture["student_submission"], fixture["ideal_solution"]))
+    return pairs
+
+def similarity_scores(model, pairs):
+    """SBERT similarity (0-100) for every pair, as the evaluation services compute it."""
+    scores = []
+    for _, text_a, text_b in pairs:
+        embedding_a, embedding_b = model.encode([text_a, text_b], convert_to_numpy=True)
+        scores.append(round(float(cosine_similarity([embedding_a], [embedding_b])[0][0] * 100), 2))
+    return scores
+
+def latency_profile(model, texts):
+    """Single-text encode latency in milliseconds over LATENCY_ROUNDS passes of the fixture texts."""
+    model.encode(texts[:2], convert_to_numpy=True)  # Warm up
+    latencies = []
+    for _ in range(LATENCY_ROUNDS):
+        for text in texts:
+            _, elapsed = timed(model.encode, text, convert_to_numpy=True)
+            latencies.append(elapsed)
+    return {
+        "encodes_per_sec": round(len(latencies) / (sum(latencies) / 1000), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2)
+    }
+
+def run(backends=("onnx", "onnx-int8")):
+    """Checks each optimised backend against the fp32 reference on the fixtures and reports throughput."""
+    pairs = fixture_pairs()
+    texts = sorted({text for _, text_a, text_b in pairs for text in (text_a, text_b)})
+
+    reference = sbert_model if SBERT_BACKEND == "torch" else load_sbert_model("torch")
+    reference_scores = similarity_scores(reference, pairs)
+    profiles = {"torch": latency_profile(reference, texts)}
+    failures = []
+
+    for backend in backends:
+        model = load_sbert_model(backend)
+        scores = similarity_scores(model, pairs)
+        max_diff = max(abs(score - ref) for score, ref in zip(scores, reference_scores))
+        worst = max(range(len(pairs)), key=lambda i: abs(scores[i] - reference_scores[i]))
+        passed = max_diff <= SCORE_TOLERANCE[backend]
+        if not passed:
+            failures.append(backend)
+
+        print(f"\n=== {backend} vs torch: max score difference {max_diff:.2f} "
+              f"(tolerance {SCORE_TOLERANCE[backend]}) {'PASS' if passed else 'FAIL'} ===")
+        print(f"worst pair: {pairs[worst][0]} torch={reference_scores[worst]} {backend}={scores[worst]}")
+        profiles[backend] = latency_profile(model, texts)
+
+    print(f"\n=== Encode latency ({len(texts)} fixture texts x {LATENCY_ROUNDS} rounds) ===")
+    for backend, profile in profiles.items():
+        print(f"{backend:<10} {profile['encodes_per_sec']:8.2f} encodes/sec  "
+              f"p50 {profile['p50_ms']:7.2f} ms  p99 {profile['p99_ms']:7.2f} ms")
+
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if run() else 0)
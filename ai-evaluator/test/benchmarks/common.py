@@ -0,0 +1,33 @@
+import os
+import sys
+import json
+import time
+
+# Benchmarks run from the ai-evaluator directory: python test/benchmarks/<script>.py
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FIXTURES_DIR = os.path.join(SERVICE_DIR, "test")
+
+if SERVICE_DIR not in sys.path:
+    sys.path.insert(0, SERVICE_DIR)
+
+def load_fixtures(folder: str):
+    """Loads every JSON fixture in test/<folder>/ as a {name: payload} dict."""
+    fixtures = {}
+    fixture_dir = os.path.join(FIXTURES_DIR, folder)
+    for filename in sorted(os.listdir(fixture_dir)):
+        if filename.endswith(".json"):
+            with open(os.path.join(fixture_dir, filename), "r", encoding="utf-8") as file:
+                fixtures[filename[:-5]] = json.load(file)
+    return fixtures
+
+def timed(fn, *args, **kwargs):
+    """Runs fn once and returns (result, elapsed milliseconds)."""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+def percentile(values, pct: float):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
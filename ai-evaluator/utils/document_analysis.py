@@ -0,0 +1,115 @@
+import math
+from collections import Counter
+from functools import cached_property
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from utils.text_processing import split_sentences
+
+# sklearn's default TF-IDF tokenisation (lower-cased words of two or more characters)
+_tfidf_analyzer = TfidfVectorizer().build_analyzer()
+
+# Smoothed IDF of a term in a two-document corpus: in one document, or in both
+_IDF_ONE = math.log(3 / 2) + 1
+_IDF_BOTH = 1.0
+
+class DocumentAnalysis:
+    """
+    Everything the scorers and the prompt builder derive from one submission text,
+    computed on first use and then reused for the rest of the request.
+
+    Build one per evaluated text and pass it along instead of the raw text, so the
+    text is segmented, tokenised and embedded once however many parameters or
+    criteria it is scored against. Embeddings need an `encoder` (a function
+    from a list of texts to an (n, dim) array).
+    """
+
+    def __init__(self, text: str, encoder=None):
+        self.text = text or ""
+        self.encoder = encoder
+        self._model_token_counts = {}
+
+    @cached_property
+    def lower(self):
+        return self.text.lower()
+
+    @cached_property
+    def words(self):
+        """Whitespace-separated words, as shown to readers."""
+        return self.text.split()
+
+    @cached_property
+    def sentences(self):
+        return split_sentences(self.text)
+
+    @cached_property
+    def tfidf_terms(self):
+        return Counter(_tfidf_analyzer(self.text))
+
+    @cached_property
+    def _tfidf_sum_squares(self):
+        return sum(count * count for count in self.tfidf_terms.values())
+
+    def tfidf_similarity(self, other: str):
+        """
+        Cosine similarity (0-1) of TF-IDF vectors fitted on just this text and `other`,
+        the same value as TfidfVectorizer().fit_transform([other, text]) gives, without
+        re-tokenising this text for every comparison.
+        """
+        other_terms = Counter(_tfidf_analyzer(other or ""))
+        if not self.tfidf_terms and not other_terms:
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+
+        dot = 0.0
+        self_squares = self._tfidf_sum_squares * _IDF_ONE ** 2
+        other_squares = 0.0
+        for term, count in other_terms.items():
+            self_count = self.tfidf_terms.get(term, 0)
+            if self_count:
+                dot += count * self_count * _IDF_BOTH ** 2
+                self_squares += self_count * self_count * (_IDF_BOTH ** 2 - _IDF_ONE ** 2)
+                other_squares += count * count * _IDF_BOTH ** 2
+            else:
+                other_squares += count * count * _IDF_ONE ** 2
+
+        if dot == 0:
+            return 0.0
+        return dot / math.sqrt(self_squares * other_squares)
+
+    def contains(self, phrase: str):
+        """Case-insensitive substring test."""
+        return phrase.lower() in self.lower
+
+    def model_token_counts(self, tokenizer):
+        """
+        Model tokens in the whole text and in each sentence, for the given tokenizer.
+
+        Returns:
+            tuple: (token count of the text, list of token counts per sentence)
+        """
+        key = id(tokenizer)
+        if key not in self._model_token_counts:
+            total = len(tokenizer(self.text, add_special_tokens=False)["input_ids"])
+            per_sentence = [len(ids) for ids in tokenizer(self.sentences, add_special_tokens=False)["input_ids"]] if self.sentences else []
+            self._model_token_counts[key] = (total, per_sentence)
+        return self._model_token_counts[key]
+
+    def _encode(self, texts: list):
+        if self.encoder is None:
+            raise ValueError("This analysis has no encoder for embeddings")
+        return np.asarray(self.encoder(texts), dtype=np.float32)
+
+    @cached_property
+    def embedding(self):
+        return self._encode([self.text])[0]
+
+    @cached_property
+    def sentence_embeddings(self):
+        return self._encode(self.sentences or [self.text])
+
+    def best_matching_sentence(self, vector):
+        """The sentence whose embedding is most cosine-similar to vector, with that similarity."""
+        embeddings = self.sentence_embeddings
+        norms = np.linalg.norm(embeddings, axis=1) * max(float(np.linalg.norm(vector)), 1e-12)
+        scores = embeddings @ np.asarray(vector, dtype=np.float32) / np.maximum(norms, 1e-12)
+        index = int(scores.argmax())
+        return (self.sentences or [self.text])[index], float(scores[index])
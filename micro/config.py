@@ -1,2 +1,51 @@
+import os
+
 MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"  # Lightweight SBERT model
 BART_MODEL_NAME = "facebook/bart-large-cnn"  # Large BART model
+# Redis holding the LLM stage queue (the stage stays pending when unset)
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Evaluation write buffer: flush after this many evaluations or seconds, block producers beyond the pending limit
+EVALUATION_SINK_BATCH_SIZE = int(os.getenv("EVALUATION_SINK_BATCH_SIZE", "500"))
+EVALUATION_SINK_FLUSH_SECONDS = float(os.getenv("EVALUATION_SINK_FLUSH_SECONDS", "1.0"))
+EVALUATION_SINK_MAX_PENDING = int(os.getenv("EVALUATION_SINK_MAX_PENDING", "5000"))
+
+# How long a worker trusts its cached ideal solutions before re-checking their version in MongoDB
+IDEAL_SOLUTION_CACHE_TTL_SECONDS = float(os.getenv("IDEAL_SOLUTION_CACHE_TTL_SECONDS", "30"))
+
+# Per-hackathon search indexes are kept on disk here and saved after this many changes (and on shutdown)
+SEARCH_INDEX_DIR = os.getenv("SEARCH_INDEX_DIR", "search_index")
+SEARCH_INDEX_SAVE_EVERY = int(os.getenv("SEARCH_INDEX_SAVE_EVERY", "50"))
+# Semantic search ignores submissions whose embedding is less cosine-similar to the query than this
+SEARCH_MIN_SIMILARITY = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.3"))
+
+# Summary written with each evaluation unless the request or the hackathon's settings choose another: "truncate" or "extractive"
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "truncate")
+
+# Evaluation mode unless a hackathon's settings choose another: "cheap" (TF-IDF only), "cascade" (LLM for a band) or "full" (LLM for every submission)
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "cheap")
+
+# Cascade band defaults; hackathon settings override each of them
+CASCADE_CUTOFF = float(os.getenv("CASCADE_CUTOFF", "50"))  # Pass/fail score whose neighbourhood is re-evaluated
+CASCADE_BAND = float(os.getenv("CASCADE_BAND", "5"))  # Scores within this distance of the cut-off are borderline
+CASCADE_TOP_K = int(os.getenv("CASCADE_TOP_K", "10"))  # Submissions ranked this high are shortlisted for the LLM
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", "0.5"))  # Cheap results less confident than this go to the LLM
+CASCADE_CONCURRENCY = int(os.getenv("CASCADE_CONCURRENCY", "1"))  # LLM stage requests in flight to ai-evaluator per process
+
+# ai-evaluator hosts the models this service does not load: the LLM stage (FLAN-T5 and BART), whose jobs
+# wait in this Redis list for the worker, and SBERT embeddings
+AI_EVALUATOR_URL = os.getenv("AI_EVALUATOR_URL", "http://localhost:8001").rstrip("/")
+AI_EVALUATOR_TIMEOUT_SECONDS = float(os.getenv("AI_EVALUATOR_TIMEOUT_SECONDS", "300"))
+AI_EVALUATOR_EMBED_TIMEOUT_SECONDS = float(os.getenv("AI_EVALUATOR_EMBED_TIMEOUT_SECONDS", "30"))  # SBERT embeddings for the ideal-solution store
+LLM_QUEUE = os.getenv("LLM_QUEUE", "llm_evaluation:queue")
+
+# Hosted LLM (summary & feedback) client: one pooled connection set, capped concurrency per endpoint,
+# retries limited to a share of traffic, and a circuit breaker that falls back to the local summariser
+HOSTED_LLM_URL = os.getenv("HOSTED_LLM_URL", "https://api-inference.huggingface.co/models/meta-llama/Llama-3-8B")
+HOSTED_LLM_TIMEOUT_SECONDS = float(os.getenv("HOSTED_LLM_TIMEOUT_SECONDS", "30"))
+HOSTED_LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HOSTED_LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+HOSTED_LLM_MAX_CONCURRENCY = int(os.getenv("HOSTED_LLM_MAX_CONCURRENCY", "4"))  # In-flight requests per endpoint
+HOSTED_LLM_MAX_RETRIES = int(os.getenv("HOSTED_LLM_MAX_RETRIES", "2"))
+HOSTED_LLM_RETRY_RATIO = float(os.getenv("HOSTED_LLM_RETRY_RATIO", "0.2"))  # Retries allowed per request, on average
+HOSTED_LLM_BREAKER_FAILURES = int(os.getenv("HOSTED_LLM_BREAKER_FAILURES", "5"))  # Consecutive failures that open the breaker
+HOSTED_LLM_BREAKER_RESET_SECONDS = float(os.getenv("HOSTED_LLM_BREAKER_RESET_SECONDS", "30"))  # Open time before a trial request
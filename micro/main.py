@@ -1,10 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
+import asyncio
 from dotenv import load_dotenv
 from routes.transcribe import router as transcription_router
 from routes.transcribe_s3 import router as transcribe_s3_router
 from routes.hackathon_evaluations import router as hackathon_evaluations_router
+from routes.ideal_solutions import router as ideal_solutions_router
+from routes.summary_feedback import router as summary_feedback_router
+from utils.db_connector import ensure_indexes
+from services.evaluation_sink import evaluation_sink
+from services.search_index import search_indexes
+from services.cascade import ai_evaluator_client, llm_queue
+from services.evaluation import embedding_client
+from services.hosted_llm import hosted_llm_client
 
 # Load environment variables
 load_dotenv()
@@ -28,10 +37,36 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+@app.on_event("startup")
+async def create_indexes():
+    # Compound indexes for hackathon queries, then the unique submission_id index (older duplicates removed first);
+    # startup fails if the unique index cannot be built
+    await ensure_indexes()
+
+@app.on_event("shutdown")
+async def flush_evaluation_sink():
+    # Write any buffered evaluations before the process exits
+    await evaluation_sink.close()
+    await asyncio.to_thread(search_indexes.save_all)
+
+@app.on_event("shutdown")
+async def close_ai_evaluator_clients():
+    # Queued LLM stages live in Redis and MongoDB, so shutdown does not wait for them
+    await ai_evaluator_client.close()
+    await llm_queue.close()
+    await embedding_client.close()
+
+@app.on_event("shutdown")
+async def close_hosted_llm_client():
+    # Release pooled connections to hosted inference endpoints
+    await hosted_llm_client.close()
+
 # Include API routes
 app.include_router(transcription_router, prefix="/api", tags=["Transcription"])
 app.include_router(transcribe_s3_router, prefix="/api", tags=["S3 Transcription"])
 app.include_router(hackathon_evaluations_router, prefix="/api", tags=["Hackathon Evaluations"])
+app.include_router(ideal_solutions_router, prefix="/api", tags=["Ideal Solutions"])
+app.include_router(summary_feedback_router, prefix="/api", tags=["Summary & Feedback"])
 
 # Add documentation for the video transcription feature
 description += """
@@ -1,11 +1,55 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
-from utils.db_connector import get_evaluations_by_hackathon_id
+from typing import List, Dict, Any, Optional
+import json
+from utils.db_connector import (
+    iter_evaluations_by_hackathon_id, encode_page_cursor, decode_page_cursor, EVALUATION_SORT_KEYS,
+    get_hackathon_statistics as read_hackathon_statistics, get_hackathon_leaderboard, LEADERBOARD_SIZE,
+    get_duplicate_clusters, get_hackathon_settings, update_hackathon_settings, get_hackathon_compute,
+    count_llm_statuses, rebuild_hackathon_stats
+)
 from services.evaluation_service import format_evaluation_results
+from services.evaluation_sink import evaluation_sink
+from services.search_index import search_submissions, rebuild_search_index, SEARCH_MODES
+from services.extractive_summary import SUMMARY_MODES
+from services.cascade import EVALUATION_MODES, run_llm_stage, requeue_llm_stages, llm_queue
+from services.hosted_llm import HostedLLMError
+from config import SUMMARY_MODE, EVALUATION_MODE, CASCADE_CUTOFF, CASCADE_BAND, CASCADE_TOP_K, CASCADE_MIN_CONFIDENCE
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Fields clients may request from the evaluations listing
+LISTABLE_FIELDS = ("submission_id", "hackathon_id", "overall_score", "parameter_scores", "summary_feedback", "created_at", "updated_at")
+DEFAULT_FIELDS = ("submission_id", "hackathon_id", "overall_score", "parameter_scores")
+
+def evaluation_projection(fields: Optional[str]) -> Dict[str, int]:
+    """MongoDB projection for a comma-separated field list; transcripts are never listed."""
+    requested = [field.strip() for field in fields.split(",") if field.strip()] if fields else list(DEFAULT_FIELDS)
+    unknown = [field for field in requested if field not in LISTABLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(LISTABLE_FIELDS)}")
+    return {field: 1 for field in requested}
+
+def format_listed_evaluation(doc: Dict[str, Any], projection: Dict[str, int]) -> Dict[str, Any]:
+    """Shape one listed document: the usual formatted result when scores were requested, else the requested fields."""
+    formatted = {}
+    if "parameter_scores" in projection:
+        formatted = format_evaluation_results(
+            submission_id=doc.get("submission_id"),
+            hackathon_id=doc.get("hackathon_id"),
+            parameter_scores=doc["parameter_scores"],
+            overall_score=doc.get("overall_score")
+        )
+        formatted = {key: value for key, value in formatted.items() if key in ("parameters", "status") or key in projection}
+    for field in projection:
+        if field != "parameter_scores" and field in doc:
+            formatted[field] = doc[field]
+    return formatted
+
 class HackathonStatsResponse(BaseModel):
     hackathon_id: str
     submission_count: int
@@ -13,16 +57,88 @@ class HackathonStatsResponse(BaseModel):
     parameter_averages: Dict[str, float]
     submissions: List[Dict[str, Any]]
 
+class ImportedEvaluation(BaseModel):
+    submission_id: str
+    parameter_scores: Dict[str, Dict[str, Any]]
+    overall_score: float
+    text_content: Optional[str] = ""
+    summary_feedback: Optional[Dict[str, Any]] = None
+
+class EvaluationImportRequest(BaseModel):
+    evaluations: List[ImportedEvaluation]
+
+class HackathonSettingsRequest(BaseModel):
+    summary_mode: Optional[str] = None
+    evaluation_mode: Optional[str] = None
+    problem_statement: Optional[str] = None  # Given to the LLM stage
+    cascade_cutoff: Optional[float] = None
+    cascade_band: Optional[float] = None
+    cascade_top_k: Optional[int] = None
+    cascade_min_confidence: Optional[float] = None
+
+def default_settings() -> Dict[str, Any]:
+    """Settings a hackathon gets for anything it has not set."""
+    return {
+        "summary_mode": SUMMARY_MODE,
+        "evaluation_mode": EVALUATION_MODE,
+        "cascade_cutoff": CASCADE_CUTOFF,
+        "cascade_band": CASCADE_BAND,
+        "cascade_top_k": CASCADE_TOP_K,
+        "cascade_min_confidence": CASCADE_MIN_CONFIDENCE
+    }
+
 @router.get("/hackathon/{hackathon_id}/evaluations")
-async def get_hackathon_evaluations(hackathon_id: str):
+async def get_hackathon_evaluations(
+    hackathon_id: str,
+    sort: str = Query("overall_score", description="Sort key: overall_score or created_at"),
+    order: str = Query("desc", regex="^(asc|desc)$"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    format: str = Query("json", regex="^(json|ndjson)$")
+):
     """
-    Get all evaluation results for a specific hackathon
+    Get evaluation results for a specific hackathon, one page at a time.
+    
+    Pages are keyset-paginated on the sort key, so pass the returned next_cursor
+    to fetch the next page. With format=ndjson every matching evaluation is
+    streamed as one JSON document per line, as MongoDB returns it.
     """
+    if sort not in EVALUATION_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(EVALUATION_SORT_KEYS)}")
+    
+    try:
+        projection = evaluation_projection(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if cursor:
+        try:
+            decode_page_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    documents = iter_evaluations_by_hackathon_id(
+        hackathon_id,
+        sort_key=sort,
+        descending=order == "desc",
+        after=cursor,
+        limit=None if format == "ndjson" else limit,
+        projection=projection
+    )
+    
+    if format == "ndjson":
+        async def stream():
+            async for doc in documents:
+                yield json.dumps(format_listed_evaluation(doc, projection), default=str) + "\n"
+        
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+    
     try:
-        # Get all evaluations for the hackathon
-        evaluations = await get_evaluations_by_hackathon_id(hackathon_id)
+        # Averages come from the materialised statistics; only one page of submissions is read
+        statistics = await read_hackathon_statistics(hackathon_id)
         
-        if not evaluations:
+        if statistics["submission_count"] == 0:
             return {
                 "status": "success",
                 "hackathon_id": hackathon_id,
@@ -30,42 +146,22 @@ async def get_hackathon_evaluations(hackathon_id: str):
                 "message": "No evaluations found for this hackathon"
             }
         
-        # Format evaluations
         formatted_evaluations = []
-        for eval_doc in evaluations:
-            formatted_eval = format_evaluation_results(
-                submission_id=eval_doc["submission_id"],
-                hackathon_id=eval_doc["hackathon_id"],
-                parameter_scores=eval_doc["parameter_scores"],
-                overall_score=eval_doc["overall_score"]
-            )
-            formatted_evaluations.append(formatted_eval)
-        
-        # Calculate hackathon statistics
-        submission_count = len(evaluations)
-        overall_scores = [eval_doc["overall_score"] for eval_doc in evaluations]
-        average_score = round(sum(overall_scores) / submission_count, 2) if submission_count > 0 else 0
-        
-        # Calculate average scores for each parameter
-        parameter_scores = {}
-        for eval_doc in evaluations:
-            for param_name, param_data in eval_doc["parameter_scores"].items():
-                if param_name not in parameter_scores:
-                    parameter_scores[param_name] = []
-                parameter_scores[param_name].append(param_data["final_score"])
-        
-        parameter_averages = {
-            param: round(sum(scores) / len(scores), 2) 
-            for param, scores in parameter_scores.items()
-        }
+        last_doc = None
+        async for doc in documents:
+            formatted_evaluations.append(format_listed_evaluation(doc, projection))
+            last_doc = doc
+        
+        has_more = len(formatted_evaluations) == limit
         
         return {
             "status": "success",
             "hackathon_id": hackathon_id,
-            "submission_count": submission_count,
-            "average_score": average_score,
-            "parameter_averages": parameter_averages,
-            "submissions": formatted_evaluations
+            "submission_count": statistics["submission_count"],
+            "average_score": statistics["average_score"],
+            "parameter_averages": statistics["parameter_averages"],
+            "submissions": formatted_evaluations,
+            "next_cursor": encode_page_cursor(last_doc, sort) if has_more else None
         }
         
     except Exception as e:
@@ -77,10 +173,11 @@ async def get_hackathon_statistics(hackathon_id: str):
     Get aggregated statistics for a hackathon's evaluations
     """
     try:
-        # Get all evaluations for the hackathon
-        evaluations = await get_evaluations_by_hackathon_id(hackathon_id)
+        # Read from the per-hackathon statistics document maintained on every evaluation write
+        statistics = await read_hackathon_statistics(hackathon_id)
+        submission_count = statistics["submission_count"]
         
-        if not evaluations:
+        if submission_count == 0:
             return {
                 "status": "success",
                 "hackathon_id": hackathon_id,
@@ -88,40 +185,7 @@ async def get_hackathon_statistics(hackathon_id: str):
                 "message": "No evaluations found for this hackathon"
             }
         
-        # Calculate hackathon statistics
-        submission_count = len(evaluations)
-        overall_scores = [eval_doc["overall_score"] for eval_doc in evaluations]
-        average_score = round(sum(overall_scores) / submission_count, 2) if submission_count > 0 else 0
-        
-        # Calculate average scores for each parameter
-        parameter_scores = {}
-        for eval_doc in evaluations:
-            for param_name, param_data in eval_doc["parameter_scores"].items():
-                if param_name not in parameter_scores:
-                    parameter_scores[param_name] = []
-                parameter_scores[param_name].append(param_data["final_score"])
-        
-        parameter_averages = {
-            param: round(sum(scores) / len(scores), 2) 
-            for param, scores in parameter_scores.items()
-        }
-        
-        # Generate score distribution
-        score_ranges = {
-            "excellent": [90, 100],
-            "good": [75, 89.99],
-            "average": [60, 74.99],
-            "below_average": [40, 59.99],
-            "poor": [0, 39.99]
-        }
-        
-        distribution = {category: 0 for category in score_ranges.keys()}
-        
-        for score in overall_scores:
-            for category, [min_val, max_val] in score_ranges.items():
-                if min_val <= score <= max_val:
-                    distribution[category] += 1
-                    break
+        distribution = statistics["score_distribution"]
         
         # Convert counts to percentages
         distribution_percentages = {
@@ -133,11 +197,212 @@ async def get_hackathon_statistics(hackathon_id: str):
             "status": "success",
             "hackathon_id": hackathon_id,
             "submission_count": submission_count,
-            "average_score": average_score,
-            "parameter_averages": parameter_averages,
+            "average_score": statistics["average_score"],
+            "parameter_averages": statistics["parameter_averages"],
+            "score_std_dev": statistics.get("score_std_dev"),
+            "parameter_std_devs": statistics.get("parameter_std_devs"),
             "score_distribution": distribution,
             "score_distribution_percentages": distribution_percentages
         }
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving hackathon statistics: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error retrieving hackathon statistics: {str(e)}")
+
+@router.post("/hackathon/{hackathon_id}/statistics/rebuild")
+async def rebuild_hackathon_statistics(hackathon_id: str):
+    """
+    Recompute a hackathon's materialised statistics and leaderboard from its stored evaluations
+    """
+    try:
+        counted = await rebuild_hackathon_stats(hackathon_id)
+        return {"status": "success", "hackathon_id": hackathon_id, "submission_count": counted}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding hackathon statistics: {str(e)}")
+
+@router.get("/hackathon/{hackathon_id}/leaderboard")
+async def get_hackathon_leaderboard_route(hackathon_id: str, limit: int = Query(10, ge=1, le=LEADERBOARD_SIZE)):
+    """
+    Get the top-scoring submissions of a hackathon
+    """
+    try:
+        leaderboard = await get_hackathon_leaderboard(hackathon_id, limit)
+        
+        return {
+            "status": "success",
+            "hackathon_id": hackathon_id,
+            "leaderboard": [
+                {"rank": rank, **entry}
+                for rank, entry in enumerate(leaderboard, start=1)
+            ]
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving hackathon leaderboard: {str(e)}")
+
+@router.post("/hackathon/{hackathon_id}/evaluations/import")
+async def import_hackathon_evaluations(hackathon_id: str, request: EvaluationImportRequest):
+    """
+    Store many already-computed evaluations for a hackathon, e.g. when re-running
+    or migrating one. Writes go through the buffered bulk-write sink.
+    """
+    try:
+        results = await evaluation_sink.submit_many([
+            {**evaluation.dict(), "hackathon_id": hackathon_id}
+            for evaluation in request.evaluations
+        ])
+        
+        errors = [result for result in results if not result.get("success")]
+        
+        return {
+            "status": "success" if not errors else "partial",
+            "hackathon_id": hackathon_id,
+            "stored": len(results) - len(errors),
+            "failed": len(errors),
+            "errors": errors
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing hackathon evaluations: {str(e)}")
+
+@router.get("/hackathon/{hackathon_id}/duplicates")
+async def get_hackathon_duplicates(
+    hackathon_id: str,
+    min_jaccard: Optional[float] = Query(None, ge=0, le=1, description="Minimum shingle overlap (textual copying)"),
+    min_cosine: Optional[float] = Query(None, ge=-1, le=1, description="Minimum SBERT embedding similarity (paraphrased copying)")
+):
+    """
+    Get clusters of suspected duplicate submissions in a hackathon
+    """
+    try:
+        clusters = await get_duplicate_clusters(hackathon_id, min_jaccard=min_jaccard, min_cosine=min_cosine)
+        
+        return {
+            "status": "success",
+            "hackathon_id": hackathon_id,
+            "cluster_count": len(clusters),
+            "clusters": clusters
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving duplicate submissions: {str(e)}")
+
+@router.get("/hackathon/{hackathon_id}/search")
+async def search_hackathon_submissions(
+    hackathon_id: str,
+    q: str = Query(..., min_length=1, description="Keywords or a description of what to look for"),
+    k: int = Query(10, ge=1, le=100),
+    mode: str = Query("hybrid", description="hybrid, keyword or semantic")
+):
+    """
+    Search a hackathon's submissions by keyword (BM25), by meaning (SBERT embeddings), or both fused by rank
+    """
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SEARCH_MODES)}")
+    
+    try:
+        results = await search_submissions(hackathon_id, q, k=k, mode=mode)
+        
+        return {
+            "status": "success",
+            "hackathon_id": hackathon_id,
+            "query": q,
+            "mode": mode,
+            "results": results
+        }
+        
+    except HostedLLMError as e:
+        raise HTTPException(status_code=502, detail=f"Could not embed search query: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching hackathon submissions: {str(e)}")
+
+@router.post("/hackathon/{hackathon_id}/search/rebuild")
+async def rebuild_hackathon_search_index(hackathon_id: str):
+    """
+    Rebuild a hackathon's search index from its stored evaluations
+    """
+    try:
+        indexed = await rebuild_search_index(hackathon_id)
+        return {"status": "success", "hackathon_id": hackathon_id, "indexed": indexed}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding search index: {str(e)}")
+
+@router.get("/hackathon/{hackathon_id}/settings")
+async def get_hackathon_settings_route(hackathon_id: str):
+    """
+    Get a hackathon's evaluation settings, with defaults for anything not set
+    """
+    try:
+        settings = await get_hackathon_settings(hackathon_id)
+        return {"status": "success", "hackathon_id": hackathon_id, "settings": {**default_settings(), **settings}}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving hackathon settings: {str(e)}")
+
+@router.put("/hackathon/{hackathon_id}/settings")
+async def update_hackathon_settings_route(hackathon_id: str, request: HackathonSettingsRequest):
+    """
+    Update a hackathon's evaluation settings; fields left out keep their current value
+    """
+    settings = {key: value for key, value in request.dict().items() if value is not None}
+    if "summary_mode" in settings and settings["summary_mode"] not in SUMMARY_MODES:
+        raise HTTPException(status_code=400, detail=f"summary_mode must be one of {', '.join(SUMMARY_MODES)}")
+    if "evaluation_mode" in settings and settings["evaluation_mode"] not in EVALUATION_MODES:
+        raise HTTPException(status_code=400, detail=f"evaluation_mode must be one of {', '.join(EVALUATION_MODES)}")
+    
+    try:
+        stored = await update_hackathon_settings(hackathon_id, settings)
+        return {"status": "success", "hackathon_id": hackathon_id, "settings": {**default_settings(), **stored}}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating hackathon settings: {str(e)}")
+
+@router.get("/hackathon/{hackathon_id}/compute")
+async def get_hackathon_compute_route(hackathon_id: str):
+    """
+    Get the evaluation compute spent on a hackathon: submissions and seconds per stage
+    (cheap scoring, LLM stage, and cascade submissions that skipped the LLM)
+    """
+    try:
+        compute = await get_hackathon_compute(hackathon_id)
+        for stage in compute.values():
+            stage["seconds"] = round(stage.get("seconds", 0.0), 3)
+            stage["average_seconds"] = round(stage["seconds"] / stage["count"], 3) if stage.get("count") else 0.0
+        
+        return {
+            "status": "success",
+            "hackathon_id": hackathon_id,
+            "total_seconds": round(sum(stage["seconds"] for stage in compute.values()), 3),
+            "stages": compute,
+            "llm_status": await count_llm_statuses(hackathon_id),
+            "llm_queue_length": await llm_queue.length()
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving hackathon compute: {str(e)}")
+
+@router.post("/llm_evaluation/{submission_id}")
+async def run_llm_evaluation(submission_id: str):
+    """
+    Run the pending LLM stage of a cascade evaluation. Called by the worker for
+    each job in the LLM queue; a failed attempt is recorded on the evaluation and
+    returns 502 so the worker retries it.
+    """
+    try:
+        result = await run_llm_stage(submission_id)
+        return {"status": "success", **result}
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"LLM stage failed for submission {submission_id}: {str(e)}")
+
+@router.post("/hackathon/{hackathon_id}/llm_evaluation/requeue")
+async def requeue_llm_evaluations(hackathon_id: str, include_failed: bool = Query(True)):
+    """
+    Queue again the hackathon's pending LLM stages (and failed ones unless include_failed is false),
+    e.g. after Redis lost its queue or ai-evaluator was down longer than the worker's retries
+    """
+    try:
+        queued = await requeue_llm_stages(hackathon_id, include_failed)
+        return {"status": "success", "hackathon_id": hackathon_id, "queued": queued}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error re-queueing LLM evaluations: {str(e)}")
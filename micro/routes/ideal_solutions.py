@@ -0,0 +1,100 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List
+from services.evaluation import parameter_based_evaluation, generate_embedding
+from services.hosted_llm import HostedLLMError
+from services.ideal_solutions import register_ideal_solutions, remove_ideal_solution, compare_with_ideal_solutions
+from utils.db_connector import get_ideal_solutions
+from utils.embedding_codec import serialize_embedding
+
+router = APIRouter()
+
+class IdealSolutionsRequest(BaseModel):
+    ideal_solutions: List[str]  # One or more reference solutions
+    replace: bool = False  # Replace the hackathon's existing references instead of adding to them
+
+@router.post("/hackathon/{hackathon_id}/ideal_solutions/")
+async def store_ideal_solutions(hackathon_id: str, request: IdealSolutionsRequest):
+    """
+    Stores reference solutions for a hackathon. They are embedded once, here,
+    and persisted in MongoDB for every worker.
+    """
+    try:
+        stored = await register_ideal_solutions(hackathon_id, request.ideal_solutions, replace=request.replace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HostedLLMError as e:
+        raise HTTPException(status_code=502, detail=f"Could not embed ideal solutions: {str(e)}")
+    return {
+        "message": "Ideal solutions stored successfully",
+        "hackathon_id": hackathon_id,
+        "version": stored["version"],
+        "reference_ids": stored["reference_ids"]
+    }
+
+@router.get("/hackathon/{hackathon_id}/ideal_solutions/")
+async def list_ideal_solutions(hackathon_id: str):
+    """
+    Lists a hackathon's reference solutions, without their embeddings.
+    """
+    stored = await get_ideal_solutions(hackathon_id, include_embeddings=False)
+    references = stored.get("references", []) if stored else []
+    return {
+        "hackathon_id": hackathon_id,
+        "version": stored["version"] if stored else 0,
+        "ideal_solutions": [{"reference_id": reference["reference_id"], "text": reference["text"]} for reference in references]
+    }
+
+@router.delete("/hackathon/{hackathon_id}/ideal_solutions/{reference_id}")
+async def delete_ideal_solution(hackathon_id: str, reference_id: str):
+    """
+    Removes one reference solution from a hackathon.
+    """
+    if not await remove_ideal_solution(hackathon_id, reference_id):
+        raise HTTPException(status_code=404, detail=f"No ideal solution {reference_id} for hackathon {hackathon_id}")
+    return {"message": "Ideal solution deleted successfully", "hackathon_id": hackathon_id, "reference_id": reference_id}
+
+@router.post("/store_ideal_solution/")
+async def store_ideal_solution(hackathon_id: str, ideal_text: str, embedding_encoding: str = "list"):
+    """
+    Stores the ideal solution embeddings when a hackathon is created.
+    Adds one reference solution to the hackathon's store.
+    """
+    try:
+        stored = await register_ideal_solutions(hackathon_id, [ideal_text])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HostedLLMError as e:
+        raise HTTPException(status_code=502, detail=f"Could not embed ideal solution: {str(e)}")
+    return {
+        "message": "Ideal solution stored successfully",
+        "reference_id": stored["reference_ids"][0],
+        "embedding": serialize_embedding(stored["embeddings"][0], encoding=embedding_encoding, model_id=stored["model"])
+    }
+
+@router.post("/submission/")
+async def evaluate_submission(hackathon_id: str, student_text: str, embedding_encoding: str = "list"):
+    """
+    Evaluates a student's submission against every stored ideal solution of its hackathon.
+    Pass embedding_encoding=base64 to receive the student embedding as packed binary.
+    """
+    try:
+        # Embedded by ai-evaluator; awaiting the request keeps the event loop free
+        student_embedding, model_id = await generate_embedding(student_text)
+        similarity_data = await compare_with_ideal_solutions(hackathon_id, student_embedding, model_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HostedLLMError as e:
+        raise HTTPException(status_code=502, detail=f"Could not embed submission: {str(e)}")
+    if similarity_data is None:
+        return {"error": "Ideal solution embeddings not stored for this hackathon. Please upload first."}
+
+    parameter_scores = parameter_based_evaluation(student_text)
+
+    return {
+        "cosine_similarity": similarity_data["similarity_score"],
+        "best_reference_id": similarity_data["best_reference_id"],
+        "reference_similarities": similarity_data["reference_similarities"],
+        "parameter_scores": parameter_scores,
+        "student_embedding": serialize_embedding(student_embedding, encoding=embedding_encoding, model_id=model_id)
+    }
@@ -10,13 +10,13 @@ class FeedbackRequest(BaseModel):
     parameter_definitions: dict  # Dictionary containing parameter names & descriptions
 
 @router.post("/generate_summary_feedback/")
-def generate_summary_feedback(request: FeedbackRequest):
+async def generate_summary_feedback(request: FeedbackRequest):
     """
     API endpoint to generate both a **summary** and **constructive feedback**
     for a student's submission using LLaMA 3.
     """
     try:
-        summary, feedback = generate_summary_feedback_llama(
+        summary, feedback, source = await generate_summary_feedback_llama(
             request.problem_statement, 
             request.student_submission, 
             request.parameter_definitions
@@ -25,7 +25,8 @@ def generate_summary_feedback(request: FeedbackRequest):
         return {
             "status": "success",
             "summary": summary,
-            "feedback": feedback
+            "feedback": feedback,
+            "source": source
         }
     except Exception as e:
         return {
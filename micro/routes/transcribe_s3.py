@@ -5,8 +5,9 @@ import logging
 import os
 from services.s3_service import process_file_from_s3, download_from_s3
 from services.evaluation_service import format_evaluation_results
+from services.extractive_summary import SUMMARY_MODES
 from services.transcription import extract_text
-from utils.db_connector import get_evaluation_by_submission_id
+from utils.db_connector import get_evaluation_by_submission_id, get_transcript
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +27,7 @@ class S3ProcessRequest(BaseModel):
     hackathon_id: str
     parameters: List[Parameter]  # List of evaluation parameters
     submission_text: Optional[str] = None
+    summary_mode: Optional[str] = None  # Overrides the hackathon's summary mode for this submission
     
     @validator('s3_url')
     def validate_s3_url(cls, v, values):
@@ -47,6 +49,12 @@ class S3ProcessRequest(BaseModel):
         if not v and ('s3_url' not in values or not values['s3_url']):
             raise ValueError('Either s3_url or submission_text must be provided')
         return v
+    
+    @validator('summary_mode')
+    def validate_summary_mode(cls, v):
+        if v is not None and v not in SUMMARY_MODES:
+            raise ValueError(f"summary_mode must be one of {', '.join(SUMMARY_MODES)}")
+        return v
 
 class S3TranscribeRequest(BaseModel):
     s3_url: str
@@ -70,11 +78,15 @@ async def transcribe_evaluate_s3_file(request: S3ProcessRequest, background_task
         background_tasks: Optional background tasks
         
     Returns:
-        Dictionary containing evaluation results, extracted text, and summary/feedback
+        Dictionary containing evaluation results and summary/feedback; the extracted
+        text is available from /evaluation/{submission_id}/transcript
     """
     try:
-        # Check if evaluation already exists for this submission
-        existing_eval = await get_evaluation_by_submission_id(request.submission_id)
+        # Check if evaluation already exists for this submission: one projected lookup on the submission_id index
+        existing_eval = await get_evaluation_by_submission_id(
+            request.submission_id,
+            projection={"_id": 0, "overall_score": 1, "parameter_scores": 1, "summary_feedback": 1}
+        )
         
         if existing_eval:
             # Format the existing evaluation for API response
@@ -94,7 +106,8 @@ async def transcribe_evaluate_s3_file(request: S3ProcessRequest, background_task
             submission_id=request.submission_id,
             hackathon_id=request.hackathon_id,
             parameters=request.parameters,
-            submission_text=request.submission_text
+            submission_text=request.submission_text,
+            summary_mode=request.summary_mode
         )
         
         # Check if extraction/processing was successful
@@ -119,8 +132,9 @@ async def transcribe_evaluate_s3_file(request: S3ProcessRequest, background_task
         return {
             "status": "success",
             **formatted_result,
-            "extracted_text": result.get("extracted_text", ""),
-            "summary_feedback": result.get("summary_feedback", {})
+            "transcript_length": len(result.get("extracted_text", "")),
+            "summary_feedback": result.get("summary_feedback", {}),
+            "cascade": result.get("cascade")
         }
 
     except Exception as e:
@@ -138,7 +152,7 @@ async def get_evaluation(submission_id: str):
     Get the evaluation results for a specific submission
     """
     try:
-        evaluation = await get_evaluation_by_submission_id(submission_id)
+        evaluation = await get_evaluation_by_submission_id(submission_id, projection={"text_content": 0})  # Legacy inline transcripts
         
         if not evaluation:
             logger.warning(f"No evaluation found for submission ID: {submission_id}")
@@ -163,6 +177,30 @@ async def get_evaluation(submission_id: str):
         logger.error(f"Error retrieving evaluation: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error retrieving evaluation: {str(e)}")
 
+@router.get("/evaluation/{submission_id}/transcript")
+async def get_evaluation_transcript(submission_id: str):
+    """
+    Get the extracted text of an evaluated submission
+    """
+    try:
+        transcript = await get_transcript(submission_id)
+        
+        if transcript is None:
+            logger.warning(f"No transcript found for submission ID: {submission_id}")
+            raise HTTPException(status_code=404, detail=f"No transcript found for submission ID: {submission_id}")
+        
+        return {
+            "status": "success",
+            "submission_id": submission_id,
+            "extracted_text": transcript
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving transcript: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving transcript: {str(e)}")
+
 @router.post("/transcribe_s3/")
 async def transcribe_s3_file(request: S3TranscribeRequest):
     """
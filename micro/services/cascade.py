@@ -0,0 +1,196 @@
+import time
+import json
+import asyncio
+import logging
+import numpy as np
+from typing import Dict, Any, List, Optional
+from utils.db_connector import (
+    get_transcript, count_higher_scores, store_llm_evaluation, record_hackathon_compute,
+    mark_llm_pending, mark_llm_failed, get_llm_job, get_unfinished_llm_submissions
+)
+from utils.document_analysis import DocumentAnalysis
+from services.hosted_llm import HostedLLMClient
+from config import (
+    EVALUATION_MODE, CASCADE_CUTOFF, CASCADE_BAND, CASCADE_TOP_K, CASCADE_MIN_CONFIDENCE, CASCADE_CONCURRENCY,
+    AI_EVALUATOR_URL, AI_EVALUATOR_TIMEOUT_SECONDS, REDIS_URL, LLM_QUEUE
+)
+
+EVALUATION_MODES = ("cheap", "cascade", "full")
+
+def cheap_confidence(parameter_scores: Dict[str, Dict[str, Any]], analysis: DocumentAnalysis) -> float:
+    """
+    How far the TF-IDF scores can be trusted, from 0 to 1: short texts give
+    unstable term statistics, and parameters that disagree strongly suggest the
+    lexical match is missing what the submission is about.
+    """
+    scores = [param_data["score"] for param_data in parameter_scores.values()]
+    if not scores:
+        return 0.0
+    coverage = min(1.0, len(analysis.words) / 150)
+    agreement = 1 - min(1.0, float(np.std(scores)) / 50)
+    return round(coverage * agreement, 3)
+
+async def llm_reasons(hackathon_id: str, overall_score: float, confidence: float, settings: Dict[str, Any]) -> List[str]:
+    """
+    Why a cheaply scored submission should also get the LLM evaluation, given the
+    hackathon's settings: "full" in full mode, otherwise any of "borderline",
+    "top_k" and "low_confidence". Empty when the cheap result stands.
+    """
+    mode = settings.get("evaluation_mode") or EVALUATION_MODE
+    if mode == "full":
+        return ["full"]
+    if mode != "cascade":
+        return []
+
+    reasons = []
+    if abs(overall_score - settings.get("cascade_cutoff", CASCADE_CUTOFF)) <= settings.get("cascade_band", CASCADE_BAND):
+        reasons.append("borderline")
+    top_k = settings.get("cascade_top_k", CASCADE_TOP_K)
+    if top_k > 0 and await count_higher_scores(hackathon_id, overall_score) < top_k:
+        reasons.append("top_k")
+    if confidence < settings.get("cascade_min_confidence", CASCADE_MIN_CONFIDENCE):
+        reasons.append("low_confidence")
+    return reasons
+
+# Calls to ai-evaluator, which hosts FLAN-T5 and BART; generation takes seconds, so the timeout is long
+ai_evaluator_client = HostedLLMClient(timeout=AI_EVALUATOR_TIMEOUT_SECONDS, max_concurrency=CASCADE_CONCURRENCY)
+
+class LLMQueue:
+    """
+    Redis list of submissions waiting for the LLM stage. The worker pops
+    jobs from it and calls POST /api/llm_evaluation/{submission_id}, retrying
+    failed ones. The job itself is stored on the evaluation (llm_status
+    "pending"), so a lost queue entry can be re-queued from MongoDB.
+    """
+
+    def __init__(self, redis_url: str, name: str):
+        self.redis_url = redis_url
+        self.name = name
+        self._client = None
+
+    async def push(self, submission_id: str) -> bool:
+        """Queue a submission's LLM stage; False when Redis is unavailable and the job waits to be re-queued."""
+        if not self.redis_url:
+            logging.warning(f"REDIS_URL is not set; LLM stage for submission {submission_id} stays pending")
+            return False
+        try:
+            if self._client is None:
+                import redis.asyncio as redis
+                self._client = redis.Redis.from_url(self.redis_url)
+            await self._client.rpush(self.name, json.dumps({"submission_id": submission_id, "attempt": 0}))
+            return True
+        except Exception as e:
+            logging.error(f"Error queueing LLM stage for submission {submission_id}: {str(e)}")
+            return False
+
+    async def length(self) -> Optional[int]:
+        if self._client is None:
+            return None
+        try:
+            return await self._client.llen(self.name)
+        except Exception:
+            return None
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+# Shared by every request in this process
+llm_queue = LLMQueue(REDIS_URL, LLM_QUEUE)
+
+async def run_llm_stage(submission_id: str) -> Dict[str, Any]:
+    """
+    Run the queued LLM stage of one submission: ask ai-evaluator for the FLAN-T5
+    evaluation and the BART summary, attach both to the stored evaluation and add
+    the time to the hackathon's compute totals. Failures are recorded on the
+    evaluation (llm_status "failed") and re-raised so the worker can retry.
+
+    Raises:
+        LookupError: The submission has no stored evaluation or LLM job.
+    """
+    job = await get_llm_job(submission_id)
+    if job is None:
+        raise LookupError(f"No LLM stage requested for submission {submission_id}")
+    if job.get("llm_status") == "done":
+        # Delivered twice; the stored result stands
+        return {"submission_id": submission_id, "llm_status": "done"}
+
+    llm_job = job["llm_job"]
+    try:
+        # Read back the stored transcript so queued jobs do not hold every text in memory
+        text_content = await get_transcript(submission_id)
+        if text_content is None:
+            raise ValueError("transcript not found")
+
+        started = time.perf_counter()
+        evaluation, summary = await asyncio.gather(
+            ai_evaluator_client.post_json(f"{AI_EVALUATOR_URL}/api/evaluate", {
+                "problem_statement": llm_job.get("problem_statement", ""),
+                "criteria": llm_job.get("criteria", ""),
+                "submission": text_content,
+                "constrained": True
+            }),
+            ai_evaluator_client.post_json(f"{AI_EVALUATOR_URL}/api/summary/", {
+                "problem_statement": llm_job.get("problem_statement", ""),
+                "student_submission": text_content
+            })
+        )
+        seconds = time.perf_counter() - started
+
+        result = {"evaluation": evaluation.get("evaluation"), "summary": summary.get("summary")}
+        await store_llm_evaluation(submission_id, result, {"llm_reasons": llm_job.get("reasons", []), "llm_seconds": round(seconds, 3)})
+        await record_hackathon_compute(job["hackathon_id"], "llm", seconds)
+        return {"submission_id": submission_id, "llm_status": "done", "llm_seconds": round(seconds, 3)}
+    except Exception as e:
+        await mark_llm_failed(submission_id, str(e))
+        raise
+
+async def requeue_llm_stages(hackathon_id: str, include_failed: bool = True) -> int:
+    """Queue again every pending (and failed) LLM stage of a hackathon, e.g. after Redis lost its queue."""
+    queued = 0
+    for submission_id in await get_unfinished_llm_submissions(hackathon_id, include_failed):
+        queued += await llm_queue.push(submission_id)
+    return queued
+
+async def run_cascade(
+    hackathon_id: str,
+    submission_id: str,
+    analysis: DocumentAnalysis,
+    parameter_scores: Dict[str, Dict[str, Any]],
+    overall_score: float,
+    settings: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Decide whether a stored cheap evaluation also gets the LLM stage, and if so
+    mark it pending on the evaluation and queue it for the worker.
+
+    Returns:
+        Dictionary with the evaluation mode, the cheap result's confidence, the reasons
+        the LLM stage was requested and whether it reached the queue
+    """
+    mode = settings.get("evaluation_mode") or EVALUATION_MODE
+    confidence = cheap_confidence(parameter_scores, analysis)
+    reasons = await llm_reasons(hackathon_id, overall_score, confidence, settings)
+
+    queued = False
+    if reasons:
+        # Persist the job before queueing it, so it is never only in memory or only in Redis
+        await mark_llm_pending(submission_id, {
+            "hackathon_id": hackathon_id,
+            "problem_statement": settings.get("problem_statement", ""),
+            "criteria": ", ".join(parameter_scores.keys()),
+            "reasons": reasons
+        })
+        queued = await llm_queue.push(submission_id)
+    elif mode == "cascade":
+        # Counted so the report shows how many submissions the cascade kept away from the LLM
+        await record_hackathon_compute(hackathon_id, "skipped", 0.0)
+
+    return {
+        "mode": mode,
+        "confidence": confidence,
+        "llm_reasons": reasons,
+        "llm_status": "pending" if reasons else None,
+        "llm_queued": queued
+    }
@@ -3,6 +3,7 @@ import math
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from models.sbert_model import sbert_model
+from utils.document_analysis import DocumentAnalysis
 
 def generate_embedding(text: str):
     """Generate SBERT embedding for a given text."""
@@ -28,19 +29,15 @@ def compute_tfidf_similarity(problem_statement: str, parameter_description: str,
     # Scale similarity (0-1) to (0-100)
     return round(float(similarity * 100), 2)
 
-def get_best_matching_sentence(student_submission: str, parameter_text: str):
+def get_best_matching_sentence(student_submission, parameter_text: str):
     """
     Find the most relevant sentence in the student's submission for a given parameter.
+    Pass a DocumentAnalysis of the submission to embed its sentences only once across parameters.
     """
-    student_sentences = student_submission.split(". ")  # Split submission into sentences
-    student_embeddings = sbert_model.encode(student_sentences, convert_to_numpy=True)
-    parameter_embedding = generate_embedding(parameter_text)
-
-    # Compute similarity scores
-    scores = cosine_similarity([parameter_embedding], student_embeddings)[0]
-    best_sentence_index = scores.argmax()
-    
-    return student_sentences[best_sentence_index], scores[best_sentence_index]
+    analysis = student_submission if isinstance(student_submission, DocumentAnalysis) else DocumentAnalysis(
+        student_submission, encoder=lambda texts: sbert_model.encode(texts, convert_to_numpy=True)
+    )
+    return analysis.best_matching_sentence(generate_embedding(parameter_text))
 
 def evaluate_parameters(problem_statement: str, student_submission: str, parameter_definitions: dict, sbert_weight: float, tfidf_weight: float):
     """
@@ -70,8 +67,9 @@ def evaluate_parameters(problem_statement: str, student_submission: str, paramet
 
     parameter_scores = {}
 
-    # Generate SBERT embedding for student submission (compute only once)
-    student_embedding = generate_embedding(student_submission)
+    # Segment and embed the student submission and its sentences once for every parameter
+    analysis = DocumentAnalysis(student_submission, encoder=lambda texts: sbert_model.encode(texts, convert_to_numpy=True))
+    student_embedding = analysis.embedding
 
     for parameter, description in parameter_definitions.items():  # Loop over dictionary
         # Create parameter-specific embedding with more context
@@ -79,7 +77,7 @@ def evaluate_parameters(problem_statement: str, student_submission: str, paramet
         parameter_embedding = generate_embedding(parameter_text)
 
         # Find the most relevant sentence in the student's submission
-        best_sentence, best_score = get_best_matching_sentence(student_submission, parameter_text)
+        best_sentence, best_score = analysis.best_matching_sentence(parameter_embedding)
 
         # Compute TF-IDF similarity using the best-matching sentence
         tfidf_score = compute_tfidf_similarity(
@@ -96,7 +94,7 @@ def evaluate_parameters(problem_statement: str, student_submission: str, paramet
         final_score = round((sbert_weight * similarity_score) + (tfidf_weight * tfidf_score), 2)
 
         # Apply a penalty if the parameter is missing from the submission
-        if parameter.lower() not in student_submission.lower():
+        if not analysis.contains(parameter):
             final_score -= 10  # Reduce score if the keyword is missing
             final_score = max(final_score, 0)  # Ensure non-negative scores
 
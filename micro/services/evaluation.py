@@ -1,20 +1,61 @@
+import logging
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from models.sbert_model import sbert_model
+from config import AI_EVALUATOR_URL, AI_EVALUATOR_EMBED_TIMEOUT_SECONDS
+from services.hosted_llm import HostedLLMClient
+from utils.embedding_codec import deserialize_embedding
 
-def generate_embedding(text: str):
-    """Generate SBERT embedding for a given text."""
-    return sbert_model.encode(text, convert_to_numpy=True)
+# This service has no SBERT model; ai-evaluator embeds texts (through its embedding cache) over HTTP
+embedding_client = HostedLLMClient(timeout=AI_EVALUATOR_EMBED_TIMEOUT_SECONDS)
 
-def compute_similarity(student_text: str, ideal_embedding):
+# Texts per ai-evaluator /embed request (its limit)
+EMBED_BATCH_SIZE = 256
+
+async def generate_embeddings(texts: list):
+    """
+    Generate SBERT embeddings for several texts in as few ai-evaluator requests as possible.
+
+    Returns:
+        tuple: ((n, dim) float32 embeddings, id of the model that produced them)
+    """
+    embeddings, model_id = [], None
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        response = await embedding_client.post_json(
+            f"{AI_EVALUATOR_URL}/api/embed",
+            {"texts": texts[start:start + EMBED_BATCH_SIZE], "embedding_encoding": "base64", "embedding_dtype": "float32"}
+        )
+        embeddings.extend(deserialize_embedding(embedding) for embedding in response["embeddings"])
+        model_id = response["model"]
+    return np.vstack(embeddings), model_id
+
+async def generate_embedding(text: str):
+    """Generate the SBERT embedding of one text; returns (embedding, model id)."""
+    embeddings, model_id = await generate_embeddings([text])
+    return embeddings[0], model_id
+
+async def generate_index_embeddings(texts: list):
+    """
+    generate_embeddings for the duplicate and search indexes, which must not fail
+    an evaluation when ai-evaluator is unavailable.
+
+    Returns:
+        tuple: ((n, dim) embeddings, model id), or (None, None) after logging the error
+    """
+    try:
+        return await generate_embeddings(texts)
+    except Exception as e:
+        logging.warning(f"Indexing {len(texts)} submissions without embeddings: {str(e)}")
+        return None, None
+
+async def compute_similarity(student_text: str, ideal_embedding):
     """Compute cosine similarity between student and pre-stored ideal solution embeddings."""
-    student_embedding = generate_embedding(student_text)
+    student_embedding, _ = await generate_embedding(student_text)
+    ideal_embedding = np.asarray(ideal_embedding, dtype=np.float32)
 
-    similarity = cosine_similarity([student_embedding], [np.array(ideal_embedding)])[0][0]
+    similarity = float(student_embedding @ ideal_embedding) / max(float(np.linalg.norm(student_embedding) * np.linalg.norm(ideal_embedding)), 1e-12)
 
     return {
-        "similarity_score": round(float(similarity * 100), 2),
-        "student_embedding": student_embedding.tolist()  # Convert NumPy array to list for JSON
+        "similarity_score": round(similarity * 100, 2),
+        "student_embedding": student_embedding  # Serialised by the route in the requested encoding
     }
 
 def parameter_based_evaluation(text: str):
@@ -1,34 +1,35 @@
 import numpy as np
-from typing import Dict, List, Any
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from utils.db_connector import store_evaluation_scores
+from typing import Dict, List, Any, Optional
+from utils.db_connector import store_evaluation_scores, get_hackathon_settings, record_hackathon_compute
+from services.search_index import index_submission
+from services.extractive_summary import summarise_submission
+from services.cascade import run_cascade
+from services.evaluation import generate_index_embeddings
+from utils.document_analysis import DocumentAnalysis
+from utils.near_duplicates import submission_signature
+from config import SUMMARY_MODE
 import logging
+import time
 import re
 
-def compute_similarity(text1: str, text2: str) -> float:
+def compute_similarity(text1: str, text2: str, analysis: Optional[DocumentAnalysis] = None) -> float:
     """
     Compute cosine similarity between two texts using TF-IDF vectorization.
     
     Args:
         text1: First text to compare
         text2: Second text to compare
+        analysis: DocumentAnalysis of text1, reused when comparing it with many texts
         
     Returns:
         Similarity score (0-100)
     """
     if not text1 or not text2:
         return 0.0
-        
-    # Create vectorizer
-    vectorizer = TfidfVectorizer()
     
     try:
-        # Fit and transform the texts
-        tfidf_matrix = vectorizer.fit_transform([text1, text2])
-        
-        # Compute cosine similarity
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        # Same value as fitting a TfidfVectorizer on the two texts
+        similarity = (analysis or DocumentAnalysis(text1)).tfidf_similarity(text2)
         
         # Scale to 0-100
         return round(float(similarity * 100), 2)
@@ -51,15 +52,16 @@ def parameter_based_evaluation(
         Dictionary with scores for each parameter
     """
     results = {}
+    analysis = DocumentAnalysis(student_submission)  # The submission is tokenised once for every parameter
     
     for param_name, param_description in parameter_definitions.items():
         # Calculate similarity between submission and parameter description
-        similarity = compute_similarity(student_submission, param_description)
+        similarity = compute_similarity(student_submission, param_description, analysis)
         results[param_name] = similarity
         
     return results
 
-def generate_summary_and_feedback(text_content, parameter_scores, overall_score):
+def generate_summary_and_feedback(text_content, parameter_scores, overall_score, summary_mode=SUMMARY_MODE, analysis=None):
     """
     Generate a summary and feedback for the submission based on its content and scores.
     
@@ -67,13 +69,15 @@ def generate_summary_and_feedback(text_content, parameter_scores, overall_score)
         text_content: The text content of the submission
         parameter_scores: Dictionary of parameter scores
         overall_score: Overall score for the submission
+        summary_mode: "extractive" (ranked sentences) or "truncate" (first 50 words)
+        analysis: DocumentAnalysis of text_content shared with the scorers, if any
         
     Returns:
         Dictionary containing summary and feedback
     """
-    # Generate a brief summary of the text content
-    words = text_content.split()
-    truncated_text = ' '.join(words[:50]) + "..." if len(words) > 50 else text_content
+    # Generate a brief summary of the text content, favouring sentences about the parameters
+    rubric = [f"{param_name} {param_data.get('description', '')}" for param_name, param_data in parameter_scores.items()]
+    summary = summarise_submission(text_content, rubric, summary_mode, analysis)
     
     # Categorize the overall score
     if overall_score >= 80:
@@ -110,16 +114,18 @@ def generate_summary_and_feedback(text_content, parameter_scores, overall_score)
         feedback += f"Areas for improvement include {', '.join(improvement_params)}. "
     
     return {
-        "summary": truncated_text,
+        "summary": summary,
         "feedback": feedback,
-        "performance_category": performance
+        "performance_category": performance,
+        "summary_mode": summary_mode
     }
 
 async def evaluate_submission_content(
     content_text: str,
     parameters: List[Any],
     submission_id: str,
-    hackathon_id: str
+    hackathon_id: str,
+    summary_mode: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Evaluate the content of a submission against multiple parameters.
@@ -129,12 +135,23 @@ async def evaluate_submission_content(
         parameters: The parameters to evaluate against (list of dicts or Pydantic models)
         submission_id: The ID of the submission
         hackathon_id: The ID of the hackathon
+        summary_mode: Summary mode for this request; defaults to the hackathon's setting, then SUMMARY_MODE
         
     Returns:
         Dictionary containing evaluation results
     """
     try:
-        # Initialize the TF-IDF vectorizer and compute the similarity scores
+        started = time.perf_counter()
+        try:
+            settings = await get_hackathon_settings(hackathon_id)
+        except Exception as e:
+            logging.error(f"Error reading settings for hackathon {hackathon_id}: {str(e)}")
+            settings = {}
+        
+        # Normalise, segment and tokenise the submission once for every scorer, the summary and the indexes
+        analysis = DocumentAnalysis(content_text)
+        
+        # Compute the TF-IDF similarity scores
         parameter_scores = {}
         overall_score = 0
         
@@ -150,9 +167,8 @@ async def evaluate_submission_content(
             
             try:
                 # Compute similarity between submission text and parameter description
-                vectorizer = TfidfVectorizer()
-                tfidf_matrix = vectorizer.fit_transform([content_text, param_desc])
-                similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+                # (equal to fitting a TfidfVectorizer on the pair, without re-tokenising the submission)
+                similarity = analysis.tfidf_similarity(param_desc)
                 
                 # Convert similarity to score (0-100 scale)
                 score = similarity * 100
@@ -180,7 +196,15 @@ async def evaluate_submission_content(
             overall_score = 0
             
         # Generate summary and feedback
-        summary_feedback = generate_summary_and_feedback(content_text, parameter_scores, overall_score)
+        summary_mode = summary_mode or settings.get("summary_mode") or SUMMARY_MODE
+        summary_feedback = generate_summary_and_feedback(content_text, parameter_scores, overall_score, summary_mode, analysis)
+        await record_hackathon_compute(hackathon_id, "cheap", time.perf_counter() - started)
+        
+        # The SBERT embedding lets the duplicate index flag paraphrased copies and serves semantic search
+        embeddings, embedding_model = await generate_index_embeddings([content_text])
+        duplicate_signature = submission_signature(
+            content_text, analysis.tokens, embeddings[0] if embeddings is not None else None, embedding_model
+        )
         
         # Store results in MongoDB
         try:
@@ -190,18 +214,33 @@ async def evaluate_submission_content(
                 text_content=content_text,
                 parameter_scores=parameter_scores,
                 overall_score=round(overall_score, 2),
-                summary_feedback=summary_feedback
+                summary_feedback=summary_feedback,
+                duplicate_signature=duplicate_signature
             )
             logging.info(f"Stored evaluation results: {db_result}")
+            if db_result.get("success"):
+                await index_submission(
+                    hackathon_id, submission_id, content_text, analysis,
+                    embedding=duplicate_signature["embedding"], model_id=duplicate_signature["model"]
+                )
         except Exception as e:
             logging.error(f"Error storing evaluation in MongoDB: {str(e)}")
             db_result = {"success": False, "error": str(e)}
         
+        # The LLM stage, if this submission needs it, runs in the background on the stored result
+        cascade = None
+        if db_result.get("success"):
+            try:
+                cascade = await run_cascade(hackathon_id, submission_id, analysis, parameter_scores, round(overall_score, 2), settings)
+            except Exception as e:
+                logging.error(f"Error scheduling LLM evaluation: {str(e)}")
+        
         return {
             "parameter_scores": parameter_scores,
             "overall_score": round(overall_score, 2),
             "extracted_text": content_text,
             "summary_feedback": summary_feedback,
+            "cascade": cascade,
             "db_result": db_result
         }
     
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from typing import Dict, Any, List
+from utils.db_connector import bulk_store_evaluation_scores
+from services.search_index import index_submission
+from services.evaluation import generate_index_embeddings
+from utils.near_duplicates import submission_signature
+from config import EVALUATION_SINK_BATCH_SIZE, EVALUATION_SINK_FLUSH_SECONDS, EVALUATION_SINK_MAX_PENDING
+
+class EvaluationSink:
+    """
+    Write-behind buffer for evaluation results.
+
+    Evaluations are queued and written with bulk_store_evaluation_scores once
+    `batch_size` are waiting or `flush_seconds` have passed, whichever comes
+    first. At most `max_pending` evaluations may be queued or in flight;
+    producers beyond that wait until a flush frees room. Every queued
+    evaluation gets a future resolved with its own store result.
+    """
+
+    def __init__(self, batch_size: int, flush_seconds: float, max_pending: int):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+        self._buffer = []
+        self._closed = False
+        self._task = None
+        # Created on first use so they belong to the running event loop
+        self._slots = None
+        self._wakeup = None
+        self._flush_lock = None
+
+    def _ensure_started(self):
+        if self._task is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def enqueue(self, evaluation: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue one evaluation, waiting while the sink is full.
+
+        Args:
+            evaluation: Dictionary with the store_evaluation_scores arguments
+
+        Returns:
+            Future resolved with the evaluation's store result after its batch is written
+        """
+        if self._closed:
+            raise RuntimeError("Evaluation sink is closed")
+
+        self._ensure_started()
+        await self._slots.acquire()
+
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((evaluation, future))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return future
+
+    async def submit(self, evaluation: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue one evaluation and wait for its store result."""
+        return await (await self.enqueue(evaluation))
+
+    async def submit_many(self, evaluations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Queue evaluations as room allows and wait for all their store results, in input order."""
+        futures = [await self.enqueue(evaluation) for evaluation in evaluations]
+        return list(await asyncio.gather(*futures))
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything queued so far, batch_size evaluations per bulk write."""
+        if self._flush_lock is None:
+            return
+
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+
+                # One embedding request per batch serves the duplicate index and semantic search
+                texts = [evaluation.get("text_content") or "" for evaluation, _ in batch]
+                embeddings, model_id = await generate_index_embeddings(texts)
+                for position, (evaluation, _) in enumerate(batch):
+                    evaluation["duplicate_signature"] = submission_signature(
+                        texts[position],
+                        embedding=embeddings[position] if embeddings is not None else None,
+                        model_id=model_id
+                    )
+
+                try:
+                    results = await bulk_store_evaluation_scores([evaluation for evaluation, _ in batch])
+                except Exception as e:
+                    logging.error(f"Error flushing evaluation batch: {str(e)}")
+                    results = [{"success": False, "error": str(e), "submission_id": evaluation.get("submission_id")} for evaluation, _ in batch]
+
+                self.batches += 1
+                for (evaluation, future), result in zip(batch, results):
+                    if result.get("success"):
+                        self.written += 1
+                        if not result.get("superseded"):
+                            signature = evaluation["duplicate_signature"]
+                            await index_submission(
+                                evaluation["hackathon_id"], evaluation["submission_id"], evaluation.get("text_content"),
+                                embedding=signature["embedding"], model_id=signature["model"]
+                            )
+                    else:
+                        self.failed += 1
+                    if not future.done():
+                        future.set_result(result)
+                    self._slots.release()
+
+    async def close(self):
+        """Stop the flush loop and write whatever is still queued. Called on shutdown."""
+        self._closed = True
+        if self._task is None:
+            return
+        self._wakeup.set()
+        await self._task
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Batches flushed, evaluations written and failed, and evaluations still queued."""
+        return {
+            "batches": self.batches,
+            "written": self.written,
+            "failed": self.failed,
+            "queued": len(self._buffer)
+        }
+
+# Shared by every request in this process
+evaluation_sink = EvaluationSink(
+    batch_size=EVALUATION_SINK_BATCH_SIZE,
+    flush_seconds=EVALUATION_SINK_FLUSH_SECONDS,
+    max_pending=EVALUATION_SINK_MAX_PENDING
+)
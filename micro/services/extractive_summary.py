@@ -0,0 +1,87 @@
+import numpy as np
+from typing import List
+from utils.near_duplicates import tokenize, text_sketch
+from utils.document_analysis import DocumentAnalysis
+
+# How generate_summary_and_feedback summarises: the first 50 words, or ranked sentences
+SUMMARY_MODES = ("truncate", "extractive")
+
+def _truncate(analysis: DocumentAnalysis, words: int = 50) -> str:
+    tokens = analysis.words
+    return ' '.join(tokens[:words]) + "..." if len(tokens) > words else analysis.text
+
+def textrank(similarity: np.ndarray, damping: float = 0.85, iterations: int = 50, tolerance: float = 1e-6) -> np.ndarray:
+    """
+    PageRank over a weighted sentence graph by power iteration.
+
+    Args:
+        similarity: Symmetric non-negative sentence similarity matrix
+        damping: Probability of following an edge rather than jumping
+
+    Returns:
+        Centrality of every sentence, summing to 1
+    """
+    count = len(similarity)
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0)
+    out_degree = weights.sum(axis=1, keepdims=True)
+    # Sentences sharing no words with any other link to every sentence equally
+    transition = np.where(out_degree > 0, weights / np.where(out_degree > 0, out_degree, 1), 1.0 / count)
+
+    rank = np.full(count, 1.0 / count)
+    for _ in range(iterations):
+        updated = (1 - damping) / count + damping * (transition.T @ rank)
+        if np.abs(updated - rank).sum() < tolerance:
+            return updated
+        rank = updated
+    return rank
+
+def extractive_summary(
+    analysis: DocumentAnalysis,
+    rubric: List[str] = None,
+    max_sentences: int = 3,
+    relevance_weight: float = 0.3,
+    max_input_sentences: int = 300
+) -> str:
+    """
+    Summarise a submission by picking its most central and rubric-relevant sentences.
+
+    Sentences are embedded with the same token sketches used for duplicate
+    detection and search, ranked by TextRank centrality blended with their best
+    similarity to the rubric texts, and the top ones are returned in document order.
+    The cost is quadratic in sentences, so only the first max_input_sentences are ranked.
+
+    Args:
+        analysis: Analysis of the submission text
+        rubric: Parameter names and descriptions the summary should favour
+        max_sentences: Number of sentences in the summary
+        relevance_weight: Share of the ranking given to rubric relevance (0-1)
+
+    Returns:
+        The summary text
+    """
+    sentences = analysis.sentences[:max_input_sentences]
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences) if sentences else _truncate(analysis)
+
+    vectors = analysis.sentence_sketches[:max_input_sentences]
+    centrality = textrank(np.clip(vectors @ vectors.T, 0, None))
+    score = centrality / centrality.max()
+
+    rubric = [item for item in (rubric or []) if item]
+    if rubric and relevance_weight > 0:
+        rubric_vectors = np.stack([text_sketch(tokenize(item)) for item in rubric])
+        relevance = np.clip(vectors @ rubric_vectors.T, 0, None).max(axis=1)
+        score = (1 - relevance_weight) * score + relevance_weight * relevance
+
+    picked = np.sort(np.argsort(-score, kind="stable")[:max_sentences])
+    return " ".join(sentences[i] for i in picked)
+
+def summarise_submission(text: str, rubric: List[str] = None, mode: str = "extractive", analysis: DocumentAnalysis = None) -> str:
+    """Summary of a submission in one of SUMMARY_MODES, reusing the request's analysis of the text if given."""
+    if mode not in SUMMARY_MODES:
+        raise ValueError(f"Summary mode must be one of {', '.join(SUMMARY_MODES)}")
+    analysis = analysis or DocumentAnalysis(text)
+    if mode == "extractive":
+        return extractive_summary(analysis, rubric)
+    return _truncate(analysis)
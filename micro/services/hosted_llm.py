@@ -0,0 +1,215 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, Any
+import httpx
+from config import (
+    HOSTED_LLM_TIMEOUT_SECONDS, HOSTED_LLM_CONNECT_TIMEOUT_SECONDS, HOSTED_LLM_MAX_CONCURRENCY, HOSTED_LLM_MAX_RETRIES,
+    HOSTED_LLM_RETRY_RATIO, HOSTED_LLM_BREAKER_FAILURES, HOSTED_LLM_BREAKER_RESET_SECONDS
+)
+
+# Responses worth retrying: rate limiting, and upstream errors or model cold starts
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class HostedLLMError(Exception):
+    """A hosted inference call failed after its retries."""
+
+class CircuitOpenError(HostedLLMError):
+    """The endpoint's circuit breaker is open, so the call was not attempted."""
+
+class RetryBudget:
+    """
+    Limits retries to `ratio` of the requests made, so retries cannot multiply
+    the load on an upstream that is already failing. Every request earns `ratio`
+    tokens (up to `max_tokens`) and every retry spends one.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def record_request(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_seconds`; then lets a single trial call through (half-open), closing
+    again if it succeeds and re-opening if it fails.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+class HostedLLMClient:
+    """
+    Async client for hosted text-generation endpoints.
+
+    All calls share one pooled httpx.AsyncClient, so connections are reused.
+    Each endpoint has its own concurrency cap and circuit breaker. Failed calls
+    are retried with full-jitter exponential backoff, bounded by both
+    `max_retries` and a retry budget shared by every endpoint.
+    """
+
+    def __init__(
+        self,
+        timeout: float = HOSTED_LLM_TIMEOUT_SECONDS,
+        connect_timeout: float = HOSTED_LLM_CONNECT_TIMEOUT_SECONDS,
+        max_concurrency: int = HOSTED_LLM_MAX_CONCURRENCY,
+        max_retries: int = HOSTED_LLM_MAX_RETRIES,
+        retry_ratio: float = HOSTED_LLM_RETRY_RATIO,
+        breaker_failures: int = HOSTED_LLM_BREAKER_FAILURES,
+        breaker_reset_seconds: float = HOSTED_LLM_BREAKER_RESET_SECONDS,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 8.0
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.breaker_failures = breaker_failures
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.retry_budget = RetryBudget(retry_ratio)
+        self.counts = {"requests": 0, "retries": 0, "failures": 0, "rejected": 0}
+        self._client = None  # Created on first use so it belongs to the running event loop
+        self._slots = {}
+        self._breakers = {}
+
+    def _endpoint(self, url: str):
+        if url not in self._slots:
+            self._slots[url] = asyncio.Semaphore(self.max_concurrency)
+            self._breakers[url] = CircuitBreaker(self.breaker_failures, self.breaker_reset_seconds)
+        return self._slots[url], self._breakers[url]
+
+    def _backoff(self, attempt: int, retry_after: str = None) -> float:
+        """Full-jitter delay before retry number `attempt`, at least the server's Retry-After when given."""
+        delay = random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.max_backoff_seconds))
+        return delay
+
+    async def post_json(self, url: str, payload: Dict[str, Any], headers: Dict[str, str] = None) -> Any:
+        """
+        POST a JSON payload and return the decoded JSON response.
+
+        Raises:
+            CircuitOpenError: The endpoint's breaker is open, or opened while the call waited.
+            HostedLLMError: The call failed after its retries.
+        """
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_concurrency * 4, max_keepalive_connections=self.max_concurrency * 2)
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits)
+
+        slots, breaker = self._endpoint(url)
+        # Fail fast rather than queueing for a slot behind an open breaker
+        if breaker.state == "open":
+            self.counts["rejected"] += 1
+            raise CircuitOpenError(f"Circuit open for {url}")
+
+        trial = False
+        try:
+            async with slots:
+                # The breaker may have opened while this call waited for its slot
+                trial = breaker.state == "half_open"
+                if not breaker.allow():
+                    trial = False
+                    self.counts["rejected"] += 1
+                    raise CircuitOpenError(f"Circuit open for {url}")
+
+                self.counts["requests"] += 1
+                self.retry_budget.record_request()
+                attempt = 0
+                while True:
+                    retry_after = None
+                    try:
+                        response = await self._client.post(url, json=payload, headers=headers)
+                        if response.status_code not in RETRY_STATUS_CODES:
+                            response.raise_for_status()
+                            result = response.json()
+                            breaker.record_success()
+                            return result
+                        retry_after = response.headers.get("Retry-After")
+                        error = f"HTTP {response.status_code}"
+                    except httpx.HTTPStatusError as e:
+                        # Client errors will not succeed on retry
+                        breaker.record_success()
+                        raise HostedLLMError(f"HTTP {e.response.status_code} from {url}") from e
+                    except (httpx.TransportError, ValueError) as e:
+                        error = f"{type(e).__name__}: {str(e)}"
+
+                    if attempt >= self.max_retries or not self.retry_budget.try_spend():
+                        self.counts["failures"] += 1
+                        breaker.record_failure()
+                        raise HostedLLMError(f"{error} from {url} after {attempt + 1} attempts")
+
+                    attempt += 1
+                    self.counts["retries"] += 1
+                    logging.warning(f"Retrying hosted LLM call to {url} ({error}), attempt {attempt + 1}")
+                    await asyncio.sleep(self._backoff(attempt, retry_after))
+
+                    # Other calls may have opened the breaker during the backoff; only its own trial goes on
+                    if not trial and breaker.state != "closed":
+                        self.counts["rejected"] += 1
+                        raise CircuitOpenError(f"Circuit opened for {url} while retrying ({error})")
+        except asyncio.CancelledError:
+            # A cancelled half-open trial must not leave the breaker waiting for it forever
+            if trial:
+                breaker.trial_in_flight = False
+            raise
+
+    async def close(self):
+        """Close pooled connections. Called on shutdown."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counts,
+            "retry_tokens": round(self.retry_budget.tokens, 2),
+            "breakers": {url: breaker.state for url, breaker in self._breakers.items()}
+        }
+
+# Shared by every request in this process
+hosted_llm_client = HostedLLMClient()
@@ -0,0 +1,130 @@
+import time
+import uuid
+import numpy as np
+from config import IDEAL_SOLUTION_CACHE_TTL_SECONDS
+from services.evaluation import generate_embeddings
+from utils.db_connector import add_ideal_solutions, delete_ideal_solution, get_ideal_solutions, get_ideal_solutions_version
+from utils.embedding_codec import embedding_document, embedding_from_document
+from utils.text_processing import text_hash
+
+class IdealSolutionCache:
+    """
+    Per-process cache of each hackathon's reference solutions, held as one
+    L2-normalised float32 matrix so a submission is compared against all of
+    them with a single matrix-vector product.
+
+    Entries are trusted for `ttl_seconds`; after that only the hackathon's
+    version number is read from MongoDB and the references are reloaded if
+    another worker changed them. Changes made through this process invalidate
+    its entry immediately.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+
+    def invalidate(self, hackathon_id: str):
+        self._entries.pop(hackathon_id, None)
+
+    async def get(self, hackathon_id: str):
+        """Cached entry for a hackathon ({"version", "reference_ids", "models", "matrix"}), or None if it has no references."""
+        entry = self._entries.get(hackathon_id)
+        now = time.monotonic()
+
+        if entry is not None and now - entry["checked_at"] < self.ttl_seconds:
+            return entry
+
+        if entry is not None and await get_ideal_solutions_version(hackathon_id) == entry["version"]:
+            entry["checked_at"] = now
+            return entry
+
+        stored = await get_ideal_solutions(hackathon_id)
+        if not stored or not stored.get("references"):
+            self.invalidate(hackathon_id)
+            return None
+
+        vectors = np.vstack([embedding_from_document(reference["embedding"]) for reference in stored["references"]])
+        entry = {
+            "version": stored["version"],
+            "reference_ids": [reference["reference_id"] for reference in stored["references"]],
+            "models": np.array([reference["embedding"]["model"] for reference in stored["references"]]),
+            "matrix": vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12),
+            "checked_at": now
+        }
+        self._entries[hackathon_id] = entry
+        return entry
+
+# Shared by every request in this worker
+ideal_solution_cache = IdealSolutionCache(IDEAL_SOLUTION_CACHE_TTL_SECONDS)
+
+async def register_ideal_solutions(hackathon_id: str, texts: list, replace: bool = False):
+    """
+    Embeds reference solutions in one batch and persists them for a hackathon.
+
+    Returns:
+        dict: The new version and the ids given to the references.
+    """
+    texts = [text for text in texts if text and text.strip()]
+    if not texts:
+        raise ValueError("At least one non-empty ideal solution is required")
+
+    embeddings, model_id = await generate_embeddings(texts)
+    references = [
+        {
+            "reference_id": uuid.uuid4().hex,
+            "text": text,
+            "text_hash": text_hash(text),
+            "embedding": embedding_document(embedding, model_id)
+        }
+        for text, embedding in zip(texts, embeddings)
+    ]
+
+    version = await add_ideal_solutions(hackathon_id, references, replace=replace)
+    ideal_solution_cache.invalidate(hackathon_id)
+
+    return {
+        "version": version,
+        "reference_ids": [reference["reference_id"] for reference in references],
+        "embeddings": embeddings,
+        "model": model_id
+    }
+
+async def remove_ideal_solution(hackathon_id: str, reference_id: str) -> bool:
+    """Deletes one reference solution of a hackathon."""
+    removed = await delete_ideal_solution(hackathon_id, reference_id)
+    ideal_solution_cache.invalidate(hackathon_id)
+    return removed
+
+async def compare_with_ideal_solutions(hackathon_id: str, student_embedding, model_id: str):
+    """
+    Cosine similarity (0-100) of a submission embedding with every reference solution of a hackathon
+    embedded by the same model; references from another model are left out.
+
+    Returns:
+        dict: Best similarity, the reference it came from and per-reference similarities, or None without references.
+
+    Raises:
+        ValueError: Every reference was embedded by a different model and must be registered again.
+    """
+    entry = await ideal_solution_cache.get(hackathon_id)
+    if entry is None:
+        return None
+
+    same_model = np.flatnonzero(entry["models"] == model_id)
+    if len(same_model) == 0:
+        raise ValueError(f"Ideal solutions of hackathon {hackathon_id} were embedded by another model than {model_id}; store them again")
+
+    student_embedding = np.asarray(student_embedding, dtype=np.float32)
+    student_embedding = student_embedding / max(float(np.linalg.norm(student_embedding)), 1e-12)
+    similarities = entry["matrix"][same_model] @ student_embedding
+    reference_ids = [entry["reference_ids"][i] for i in same_model]
+    best = int(similarities.argmax())
+
+    return {
+        "similarity_score": round(float(similarities[best] * 100), 2),
+        "best_reference_id": reference_ids[best],
+        "reference_similarities": {
+            reference_id: round(float(similarity * 100), 2)
+            for reference_id, similarity in zip(reference_ids, similarities)
+        }
+    }
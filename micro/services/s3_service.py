@@ -150,7 +150,8 @@ async def process_file_from_s3(
     submission_id: str, 
     hackathon_id: str, 
     parameters: List[Any],
-    submission_text: Optional[str] = None
+    submission_text: Optional[str] = None,
+    summary_mode: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Process a file from an S3 URL and return extracted text and evaluation results.
@@ -161,6 +162,7 @@ async def process_file_from_s3(
         hackathon_id: ID of the hackathon
         parameters: Parameters to evaluate against
         submission_text: Optional text content for evaluation
+        summary_mode: Optional summary mode overriding the hackathon's setting
         
     Returns:
         Dictionary containing extracted text and evaluation results
@@ -216,7 +218,8 @@ async def process_file_from_s3(
             text_for_evaluation, 
             parameters, 
             submission_id, 
-            hackathon_id
+            hackathon_id,
+            summary_mode
         )
         
         # Return the evaluation results with the appropriate text content
@@ -225,7 +228,8 @@ async def process_file_from_s3(
             "extracted_text": text_for_evaluation,
             "parameter_scores": eval_result.get("parameter_scores", {}),
             "overall_score": eval_result.get("overall_score", 0),
-            "summary_feedback": eval_result.get("summary_feedback", {})
+            "summary_feedback": eval_result.get("summary_feedback", {}),
+            "cascade": eval_result.get("cascade")
         }
         
     except Exception as e:
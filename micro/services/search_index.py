@@ -0,0 +1,458 @@
+import os
+import math
+import fcntl
+import pickle
+import asyncio
+import threading
+from contextlib import contextmanager
+from array import array
+from collections import Counter
+import numpy as np
+from config import SEARCH_INDEX_DIR, SEARCH_INDEX_SAVE_EVERY, SEARCH_MIN_SIMILARITY
+from utils.near_duplicates import tokenize, STOP_WORDS
+from utils.db_connector import db, get_transcript
+from utils.embedding_codec import embedding_from_document
+from services.evaluation import generate_embedding, generate_index_embeddings
+
+# "semantic" ranks by cosine similarity of SBERT embeddings (from ai-evaluator)
+SEARCH_MODES = ("hybrid", "keyword", "semantic")
+
+# Reciprocal rank fusion constant; 60 is the value from the original RRF paper
+RRF_K = 60
+
+class HackathonSearchIndex:
+    """
+    Search index over one hackathon's submissions: a BM25 inverted index for
+    keywords and a matrix of SBERT embeddings for semantic search, combined by
+    reciprocal rank fusion. All embeddings come from one model (`model`); a
+    submission indexed without one is only found by keyword.
+
+    Postings are append-only arrays, so adding a submission never rewrites
+    existing ones. Re-indexing a submission tombstones its old document;
+    tombstoned documents are skipped at query time and dropped by `compact()`.
+    Changes not yet saved are kept in `pending`, so they can be merged into the
+    copy other workers saved.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> (array of document numbers, array of term frequencies)
+        self.doc_ids = []  # document number -> submission_id, None once tombstoned
+        self.doc_lengths = array("i")
+        self.doc_numbers = {}  # submission_id -> live document number
+        self.vectors = np.zeros((0, 0), dtype=np.float16)  # document number -> unit embedding, zeros if none
+        self.model = None
+        self.live_length_total = 0
+        self.pending = {}  # submission_id -> (terms, embedding, model) added, or None removed, since the last save
+        self.lock = threading.Lock()
+
+    @property
+    def size(self):
+        return len(self.doc_numbers)
+
+    @property
+    def changes(self):
+        return len(self.pending)
+
+    def add(self, submission_id: str, text: str, tokens: list = None, embedding=None, model_id: str = None):
+        """Indexes a submission, replacing its previous version if any. Precomputed tokens are reused."""
+        if tokens is None:
+            tokens = tokenize(text)
+        terms = Counter(token for token in tokens if token not in STOP_WORDS)
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+            embedding = (embedding / max(float(np.linalg.norm(embedding)), 1e-12)).astype(np.float16)
+
+        with self.lock:
+            self._insert(submission_id, terms, embedding, model_id)
+            self.pending[submission_id] = (terms, embedding, model_id)
+
+    def _insert(self, submission_id: str, terms: Counter, embedding, model_id: str):
+        self._remove(submission_id)
+
+        number = len(self.doc_ids)
+        self.doc_ids.append(submission_id)
+        self.doc_lengths.append(sum(terms.values()))
+        self.doc_numbers[submission_id] = number
+        self.live_length_total += self.doc_lengths[number]
+
+        for term, frequency in terms.items():
+            documents, frequencies = self.postings.setdefault(term, (array("i"), array("i")))
+            documents.append(number)
+            frequencies.append(frequency)
+
+        # Grow the vector matrix geometrically so appends stay amortised O(1)
+        if number >= len(self.vectors):
+            grown = np.zeros((max(64, 2 * len(self.vectors)), self.vectors.shape[1]), dtype=np.float16)
+            grown[:len(self.vectors)] = self.vectors
+            self.vectors = grown
+        if embedding is not None:
+            if model_id != self.model or len(embedding) != self.vectors.shape[1]:
+                # Embeddings of different models are not comparable: keep only the newest model's
+                self.model = model_id
+                self.vectors = np.zeros((len(self.vectors), len(embedding)), dtype=np.float16)
+            self.vectors[number] = embedding
+
+    def _remove(self, submission_id: str):
+        number = self.doc_numbers.pop(submission_id, None)
+        if number is not None:
+            self.doc_ids[number] = None
+            self.live_length_total -= self.doc_lengths[number]
+
+    def remove(self, submission_id: str):
+        with self.lock:
+            self._remove(submission_id)
+            self.pending[submission_id] = None
+
+    def apply(self, changes: dict):
+        """Replays pending changes of another copy of this index (see `pending`); they become pending here too."""
+        with self.lock:
+            for submission_id, change in changes.items():
+                if change is None:
+                    self._remove(submission_id)
+                else:
+                    self._insert(submission_id, *change)
+                self.pending[submission_id] = change
+
+    def _live_mask(self):
+        return np.array([doc_id is not None for doc_id in self.doc_ids], dtype=bool)
+
+    def keyword_scores(self, query: str):
+        """BM25 score of every document number for the query terms (zero for non-matching documents)."""
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        live = max(self.size, 1)
+        average_length = self.live_length_total / live if self.size else 1.0
+        lengths = np.array(self.doc_lengths, dtype=np.float32)
+
+        for term in set(tokenize(query)) - STOP_WORDS:
+            if term not in self.postings:
+                continue
+            documents, frequencies = self.postings[term]
+            documents = np.array(documents, dtype=np.int64)
+            frequencies = np.array(frequencies, dtype=np.float32)
+            document_frequency = len(documents)
+            idf = math.log(1 + (live - document_frequency + 0.5) / (document_frequency + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[documents] / average_length)
+            scores[documents] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+        return scores
+
+    def semantic_scores(self, query_embedding, model_id: str, min_similarity: float = SEARCH_MIN_SIMILARITY):
+        """
+        Cosine similarity of every document's embedding with the query's; -inf below
+        `min_similarity`, for documents without an embedding, or if the query was
+        embedded by another model.
+        """
+        scores = np.full(len(self.doc_ids), -np.inf, dtype=np.float32)
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        if model_id != self.model or len(query_embedding) != self.vectors.shape[1]:
+            return scores
+        query_embedding = query_embedding / max(float(np.linalg.norm(query_embedding)), 1e-12)
+        similarities = self.vectors[:len(self.doc_ids)].astype(np.float32) @ query_embedding
+        return np.where(similarities >= min_similarity, similarities, scores)
+
+    def search(self, query: str, k: int = 10, mode: str = "hybrid", query_embedding=None, model_id: str = None):
+        """
+        Top submissions for a query. Semantic ranking needs the query's embedding;
+        hybrid search without one ranks by keyword only.
+
+        Returns:
+            list: Dictionaries with submission_id, fused score and the keyword and semantic ranks.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Search mode must be one of {', '.join(SEARCH_MODES)}")
+        if mode == "semantic" and query_embedding is None:
+            raise ValueError("Semantic search needs the query embedding")
+
+        with self.lock:
+            if not self.size:
+                return []
+            live = self._live_mask()
+            # Each ranking only considers its best few candidates, which is all fusion needs
+            depth = min(max(k * 10, 100), self.size)
+            rankings = {}
+
+            if mode in ("hybrid", "keyword"):
+                scores = np.where(live, self.keyword_scores(query), 0)
+                rankings["keyword"] = self._top(scores, depth, positive_only=True)
+            if mode in ("hybrid", "semantic") and query_embedding is not None:
+                scores = np.where(live, self.semantic_scores(query_embedding, model_id), -np.inf)
+                rankings["semantic"] = self._top(scores, depth)
+
+            fused = {}
+            for name, ranking in rankings.items():
+                for rank, number in enumerate(ranking, start=1):
+                    entry = fused.setdefault(number, {"submission_id": self.doc_ids[number], "score": 0.0})
+                    entry["score"] += 1 / (RRF_K + rank)
+                    entry[f"{name}_rank"] = rank
+
+        results = sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:k]
+        for entry in results:
+            entry["score"] = round(entry["score"], 6)
+        return results
+
+    @staticmethod
+    def _top(scores, depth: int, positive_only: bool = False):
+        """Document numbers of the highest scores, best first."""
+        if positive_only:
+            candidates = np.flatnonzero(scores > 0)
+        else:
+            candidates = np.flatnonzero(np.isfinite(scores))
+        if len(candidates) > depth:
+            candidates = candidates[np.argpartition(-scores[candidates], depth - 1)[:depth]]
+        return candidates[np.argsort(-scores[candidates], kind="stable")].tolist()
+
+    def compact(self):
+        """Rebuilds the index without tombstoned documents."""
+        with self.lock:
+            live = [(doc_id, number) for number, doc_id in enumerate(self.doc_ids) if doc_id is not None]
+            if len(live) == len(self.doc_ids):
+                return
+            renumber = {old: new for new, (_, old) in enumerate(live)}
+            postings = {}
+            for term, (documents, frequencies) in self.postings.items():
+                kept = [(renumber[doc], frequency) for doc, frequency in zip(documents, frequencies) if doc in renumber]
+                if kept:
+                    postings[term] = (array("i", [doc for doc, _ in kept]), array("i", [frequency for _, frequency in kept]))
+            self.postings = postings
+            self.vectors = self.vectors[[old for _, old in live]].copy()
+            self.doc_lengths = array("i", [self.doc_lengths[old] for _, old in live])
+            self.doc_ids = [doc_id for doc_id, _ in live]
+            self.doc_numbers = {doc_id: new for new, (doc_id, _) in enumerate(live)}
+
+    def save(self, path: str):
+        """Writes the index to `path` atomically, compacting it first if many documents are tombstoned."""
+        if len(self.doc_ids) > 1.2 * self.size:
+            self.compact()
+        with self.lock:
+            state = {
+                "k1": self.k1,
+                "b": self.b,
+                "postings": self.postings,
+                "doc_ids": self.doc_ids,
+                "doc_lengths": self.doc_lengths,
+                "vectors": self.vectors[:len(self.doc_ids)],
+                "model": self.model
+            }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as handle:
+            pickle.dump(state, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Reads an index written by `save`."""
+        with open(path, "rb") as handle:
+            state = pickle.load(handle)
+        index = cls(state["k1"], state["b"])
+        index.postings = state["postings"]
+        index.doc_ids = state["doc_ids"]
+        index.doc_lengths = state["doc_lengths"]
+        if state.get("model") is not None:
+            index.vectors = state["vectors"]
+            index.model = state["model"]
+        else:
+            # Saved before the index held embeddings: its vectors were lexical sketches
+            index.vectors = np.zeros((len(index.doc_ids), 0), dtype=np.float16)
+        index.doc_numbers = {doc_id: number for number, doc_id in enumerate(index.doc_ids) if doc_id is not None}
+        index.live_length_total = sum(index.doc_lengths[number] for number in index.doc_numbers.values())
+        return index
+
+class SearchIndexRegistry:
+    """
+    Per-hackathon search indexes of this process, loaded from SEARCH_INDEX_DIR on
+    first use and saved back every `save_every` changes and on shutdown.
+
+    Several workers (or replicas sharing SEARCH_INDEX_DIR) may index the same
+    hackathon. A save therefore takes the file's lock, reloads whatever the others
+    saved, replays this worker's pending changes on top and writes the result, so
+    no worker overwrites documents another has indexed.
+    """
+
+    def __init__(self, directory: str, save_every: int):
+        self.directory = directory
+        self.save_every = save_every
+        self._indexes = {}
+        self._loaded_at = {}
+        # Held while indexing, so a save swapping in the merged index cannot miss a change
+        self._lock = threading.RLock()
+
+    def path(self, hackathon_id: str):
+        safe_id = "".join(character if character.isalnum() or character in "-_" else "_" for character in hackathon_id)
+        return os.path.join(self.directory, f"{safe_id}.pkl")
+
+    @contextmanager
+    def _file_lock(self, path: str):
+        """Exclusive lock on the index file, shared with every process using SEARCH_INDEX_DIR."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _load(path: str):
+        try:
+            return HackathonSearchIndex.load(path) if os.path.exists(path) else HackathonSearchIndex()
+        except Exception as e:
+            print(f"Could not load search index from {path}: {str(e)}")
+            return HackathonSearchIndex()
+
+    def get(self, hackathon_id: str):
+        """
+        The hackathon's index, reloaded if another worker saved a newer version since
+        it was loaded; changes this worker has not saved yet are replayed onto it.
+        """
+        path = self.path(hackathon_id)
+        modified = os.path.getmtime(path) if os.path.exists(path) else None
+
+        with self._lock:
+            index = self._indexes.get(hackathon_id)
+            stale = modified is not None and modified > self._loaded_at.get(hackathon_id, 0)
+            if index is None or stale:
+                fresh = self._load(path)
+                if index is not None:
+                    fresh.apply(index.pending)
+                self._indexes[hackathon_id] = index = fresh
+                self._loaded_at[hackathon_id] = modified or 0
+            return index
+
+    def add(self, hackathon_id: str, submission_id: str, text: str, tokens: list = None, embedding=None, model_id: str = None):
+        """
+        Indexes one submission. May load the index from disk, so async callers run it in a thread.
+
+        Returns:
+            bool: Whether the index now has `save_every` unsaved changes and should be saved.
+        """
+        with self._lock:
+            index = self.get(hackathon_id)
+            index.add(submission_id, text, tokens, embedding, model_id)
+            return index.changes >= self.save_every
+
+    def replace(self, hackathon_id: str, index: HackathonSearchIndex):
+        """Installs and saves a freshly built index, which replaces the saved one instead of merging into it."""
+        path = self.path(hackathon_id)
+        with self._file_lock(path):
+            try:
+                index.save(path)
+            except Exception as e:
+                print(f"Could not save search index to {path}: {str(e)}")
+                return
+            index.pending.clear()
+            with self._lock:
+                self._indexes[hackathon_id] = index
+                self._loaded_at[hackathon_id] = os.path.getmtime(path)
+
+    def save(self, hackathon_id: str):
+        """Merges this worker's pending changes into the saved index and installs the result."""
+        index = self._indexes.get(hackathon_id)
+        if index is None:
+            return
+        path = self.path(hackathon_id)
+        try:
+            with self._file_lock(path):
+                with index.lock:
+                    saving = dict(index.pending)
+                merged = self._load(path)
+                merged.apply(saving)
+                merged.save(path)
+                merged.pending.clear()
+
+                with self._lock:
+                    current = self._indexes.get(hackathon_id, index)
+                    # Changes made while the file was being written stay pending
+                    with current.lock:
+                        late = {key: change for key, change in current.pending.items() if saving.get(key, False) is not change}
+                    merged.apply(late)
+                    self._indexes[hackathon_id] = merged
+                    self._loaded_at[hackathon_id] = os.path.getmtime(path)
+        except Exception as e:
+            print(f"Could not save search index to {path}: {str(e)}")
+
+    def save_all(self):
+        """Saves every index with unsaved changes. Called on shutdown."""
+        for hackathon_id, index in list(self._indexes.items()):
+            if index.changes:
+                self.save(hackathon_id)
+
+# Shared by every request in this process
+search_indexes = SearchIndexRegistry(SEARCH_INDEX_DIR, SEARCH_INDEX_SAVE_EVERY)
+
+async def index_submission(hackathon_id: str, submission_id: str, text: str, analysis=None, embedding=None, model_id: str = None):
+    """
+    Adds a freshly evaluated submission to its hackathon's search index; failures only cost search freshness.
+    Adding may load the index file and saving writes it, so both run in a thread, off the event loop.
+    """
+    def add_and_save():
+        tokens = analysis.tokens if analysis is not None else None
+        if search_indexes.add(hackathon_id, submission_id, text or "", tokens, embedding, model_id):
+            search_indexes.save(hackathon_id)
+
+    try:
+        await asyncio.to_thread(add_and_save)
+    except Exception as e:
+        print(f"Error indexing submission {submission_id} for search: {str(e)}")
+
+async def search_submissions(hackathon_id: str, query: str, k: int = 10, mode: str = "hybrid"):
+    """
+    Searches a hackathon's index. The query is embedded by ai-evaluator for the
+    semantic ranking; if that fails, hybrid search falls back to keywords and
+    semantic search raises HostedLLMError. Loading the index and ranking block,
+    so they run in a thread.
+    """
+    query_embedding, model_id = None, None
+    if mode == "semantic":
+        query_embedding, model_id = await generate_embedding(query)
+    elif mode == "hybrid":
+        embeddings, model_id = await generate_index_embeddings([query])
+        query_embedding = embeddings[0] if embeddings is not None else None
+    return await asyncio.to_thread(
+        lambda: search_indexes.get(hackathon_id).search(query, k=k, mode=mode, query_embedding=query_embedding, model_id=model_id)
+    )
+
+async def rebuild_search_index(hackathon_id: str) -> int:
+    """
+    Builds a hackathon's index from its stored evaluations and transcripts. Embeddings
+    are reused from the duplicate index where it has them and requested for the rest.
+    Returns the number indexed.
+    """
+    stored = {}
+    async for doc in db.duplicate_signatures.find({"hackathon_id": hackathon_id, "embedding": {"$exists": True}}, {"embedding": 1}):
+        stored[doc["_id"]] = doc["embedding"]
+
+    texts = {}
+    async for doc in db.evaluations.find({"hackathon_id": hackathon_id}, {"submission_id": 1}):
+        text = await get_transcript(doc["submission_id"])
+        if text is not None:
+            texts[doc["submission_id"]] = text
+
+    # Use the most common stored model, and embed everything stored with another one or none
+    models = Counter(embedding["model"] for embedding in stored.values())
+    model_id = models.most_common(1)[0][0] if models else None
+    embeddings = {
+        submission_id: embedding_from_document(stored[submission_id])
+        for submission_id in texts if submission_id in stored and stored[submission_id]["model"] == model_id
+    }
+    missing = [submission_id for submission_id in texts if submission_id not in embeddings]
+    if missing:
+        generated, generated_model = await generate_index_embeddings([texts[submission_id] for submission_id in missing])
+        if generated is not None and embeddings and generated_model != model_id:
+            # The stored embeddings are from an older model: embed everything with the current one
+            embeddings, missing = {}, list(texts)
+            generated, generated_model = await generate_index_embeddings([texts[submission_id] for submission_id in missing])
+        if generated is not None:
+            embeddings.update(zip(missing, generated))
+            model_id = generated_model
+
+    def build():
+        index = HackathonSearchIndex()
+        for submission_id, text in texts.items():
+            embedding = embeddings.get(submission_id)
+            index.add(submission_id, text, embedding=embedding, model_id=model_id if embedding is not None else None)
+        search_indexes.replace(hackathon_id, index)
+        return index.size
+
+    return await asyncio.to_thread(build)
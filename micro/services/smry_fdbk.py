@@ -53,16 +53,18 @@
 
 
 import os
-import requests
+import asyncio
+import logging
+from services.hosted_llm import hosted_llm_client, HostedLLMError
+from services.extractive_summary import summarise_submission
+from config import HOSTED_LLM_URL
 
 HF_API_KEY = os.getenv("HF_API_KEY")  # Replace with your Hugging Face API key
 # print("Hello")
 # print(HF_API_KEY)
 
-def generate_summary_feedback_llama(problem_statement, student_submission, parameters):
-    """
-    Uses LLaMA 3 to generate both a **summary** and **constructive feedback**.
-    """
+def build_feedback_prompt(problem_statement, student_submission, parameters):
+    """Prompt asking the hosted model for a summary followed by feedback on each criterion."""
     prompt = f"""
     You are an expert in summarization and evaluation. 
     First, generate a concise **summary** of the given student submission.
@@ -77,19 +79,38 @@ def generate_summary_feedback_llama(problem_statement, student_submission, param
         prompt += f"\n- {param}: {desc}"
 
     prompt += "\n\nFirst, provide a brief **summary**. Then, give **feedback** highlighting strengths and areas of improvement."
+    return prompt
 
-    url = "https://api-inference.huggingface.co/models/meta-llama/Llama-3-8B"
+def _local_summary(student_submission, parameters):
+    # This service has no generative model, so the fallback is the extractive summariser
+    return summarise_submission(student_submission, rubric=list(parameters), mode="extractive")
+
+async def generate_summary_feedback_llama(problem_statement, student_submission, parameters, url=HOSTED_LLM_URL):
+    """
+    Uses LLaMA 3 to generate both a **summary** and **constructive feedback**.
+
+    Calls go through the shared hosted LLM client (pooled connections, timeouts,
+    retries, circuit breaker). When the hosted model is unavailable, the summary
+    is extracted locally from the submission instead and the feedback says so.
+
+    Returns:
+        tuple: (summary, feedback, source), where source is "hosted" or "local"
+    """
+    prompt = build_feedback_prompt(problem_statement, student_submission, parameters)
     headers = {"Authorization": f"Bearer {HF_API_KEY}"}
     payload = {"inputs": prompt}
 
-    response = requests.post(url, headers=headers, json=payload)
-    
-    if response.status_code == 200:
-        response_text = response.json()[0]["generated_text"]
-        # Split response into summary and feedback (assuming LLaMA generates both)
-        parts = response_text.split("Feedback:", 1)
-        summary = parts[0].strip() if len(parts) > 1 else "Summary not found."
-        feedback = "Feedback:" + parts[1].strip() if len(parts) > 1 else "Feedback not found."
-        return summary, feedback
-    else:
-        return "Error in generating summary & feedback", "Error in generating summary & feedback"
+    try:
+        result = await hosted_llm_client.post_json(url, payload, headers)
+        response_text = result[0]["generated_text"]
+    except (HostedLLMError, KeyError, IndexError, TypeError) as e:
+        logging.error(f"Hosted summary & feedback unavailable, using the local summariser: {str(e)}")
+        summary = await asyncio.to_thread(_local_summary, student_submission, parameters)
+        feedback = "Feedback not available: the hosted model could not be reached."
+        return summary, feedback, "local"
+
+    # Split response into summary and feedback (assuming LLaMA generates both)
+    parts = response_text.split("Feedback:", 1)
+    summary = parts[0].strip() if len(parts) > 1 else "Summary not found."
+    feedback = "Feedback:" + parts[1].strip() if len(parts) > 1 else "Feedback not found."
+    return summary, feedback, "hosted"
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import random
+import asyncio
+
+# Run against a throwaway database on a local mongod: python test/benchmark_evaluation_sink.py [evaluations]
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017/")
+os.environ.setdefault("MONGODB_DB_NAME", "hackathon_benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_connector import db, ensure_indexes, store_evaluation_scores, get_hackathon_statistics
+from services.evaluation_sink import EvaluationSink
+
+HACKATHON_ID = "benchmark-sink"
+PARAMETERS = ["Creativity", "Technical Implementation", "Presentation", "Impact", "Feasibility"]
+TRANSCRIPT_WORDS = 300
+
+def synthetic_evaluations(count: int, prefix: str):
+    words = ["solution", "pedestrian", "sensor", "model", "community", "energy", "data", "design"]
+    evaluations = []
+    for i in range(count):
+        parameter_scores = {
+            name: {"id": name.lower(), "score": round(random.uniform(0, 100), 2), "description": f"{name} criterion"}
+            for name in PARAMETERS
+        }
+        evaluations.append({
+            "submission_id": f"{prefix}-{i}",
+            "hackathon_id": HACKATHON_ID,
+            "text_content": " ".join(random.choices(words, k=TRANSCRIPT_WORDS)),
+            "parameter_scores": parameter_scores,
+            "overall_score": round(sum(p["score"] for p in parameter_scores.values()) / len(PARAMETERS), 2)
+        })
+    return evaluations
+
+async def reset():
+    await db.evaluations.delete_many({"hackathon_id": HACKATHON_ID})
+    await db.hackathon_stats.delete_one({"_id": HACKATHON_ID})
+
+async def benchmark(count: int):
+    await ensure_indexes()
+    await reset()
+
+    sequential = synthetic_evaluations(count, "sequential")
+    started = time.perf_counter()
+    for evaluation in sequential:
+        await store_evaluation_scores(**evaluation)
+    sequential_ms = (time.perf_counter() - started) * 1000
+    sequential_stats = await get_hackathon_statistics(HACKATHON_ID)
+    await reset()
+
+    sink = EvaluationSink(batch_size=500, flush_seconds=0.05, max_pending=2000)
+    started = time.perf_counter()
+    results = await sink.submit_many(sequential)
+    await sink.close()
+    bulk_ms = (time.perf_counter() - started) * 1000
+    bulk_stats = await get_hackathon_statistics(HACKATHON_ID)
+
+    assert all(result["success"] for result in results), "Some buffered writes failed"
+    assert sequential_stats["submission_count"] == bulk_stats["submission_count"] == count
+    assert abs(sequential_stats["average_score"] - bulk_stats["average_score"]) <= 0.01, "Statistics differ between write paths"
+
+    print(f"\n=== Storing {count} evaluations ===")
+    print(f"one upsert per evaluation: {sequential_ms:9.1f} ms  ({sequential_ms / count:.2f} ms each)")
+    print(f"buffered bulk writes:      {bulk_ms:9.1f} ms  ({bulk_ms / count:.2f} ms each, {sink.stats()['batches']} batches)")
+    print(f"speed-up: {sequential_ms / bulk_ms:.1f}x")
+
+    await reset()
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import datetime
+import bson
+
+# Run against a throwaway database on a local mongod: python test/benchmark_hackathon_statistics.py [submissions]
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017/")
+os.environ.setdefault("MONGODB_DB_NAME", "hackathon_benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_connector import db, ensure_indexes, get_evaluations_by_hackathon_id, aggregate_hackathon_statistics, get_hackathon_statistics, update_hackathon_stats, seed_hackathon_stats
+
+HACKATHON_ID = "benchmark-hackathon"
+PARAMETERS = ["Creativity", "Technical Implementation", "Presentation", "Impact", "Feasibility"]
+TRANSCRIPT_WORDS = 3000  # Roughly a 20-minute video transcript
+ROUNDS = 5
+
+async def seed(submission_count: int):
+    """Insert synthetic evaluations with realistic transcript sizes."""
+    await db.evaluations.delete_many({"hackathon_id": HACKATHON_ID})
+    words = ["solution", "pedestrian", "sensor", "model", "community", "energy", "data", "design"]
+    batch = []
+    for i in range(submission_count):
+        parameter_scores = {
+            name: {"id": name.lower(), "score": round(random.uniform(0, 100), 2), "description": f"{name} criterion"}
+            for name in PARAMETERS
+        }
+        batch.append({
+            "submission_id": f"benchmark-{i}",
+            "hackathon_id": HACKATHON_ID,
+            "text_content": " ".join(random.choices(words, k=TRANSCRIPT_WORDS)),
+            "parameter_scores": parameter_scores,
+            "overall_score": round(sum(p["score"] for p in parameter_scores.values()) / len(PARAMETERS), 2),
+            "created_at": datetime.datetime.now(),
+            "updated_at": datetime.datetime.now()
+        })
+        if len(batch) == 1000:
+            await db.evaluations.insert_many(batch)
+            batch = []
+    if batch:
+        await db.evaluations.insert_many(batch)
+
+async def materialise(submission_count: int):
+    """
+    Seed the hackathon_stats document from the stored evaluations, as the first write
+    to a hackathon does, then time the per-write update by re-storing every evaluation.
+    """
+    await db.hackathon_stats.delete_one({"_id": HACKATHON_ID})
+    started = time.perf_counter()
+    await seed_hackathon_stats(HACKATHON_ID)
+    seed_ms = (time.perf_counter() - started) * 1000
+
+    cursor = db.evaluations.find({"hackathon_id": HACKATHON_ID}, {"text_content": 0})
+    started = time.perf_counter()
+    async for doc in cursor:
+        # A re-score with unchanged scores: the same writes as a new evaluation, and the totals stay exact
+        await update_hackathon_stats(doc, previous=doc)
+    return seed_ms, (time.perf_counter() - started) * 1000 / submission_count
+
+async def load_all_statistics(hackathon_id: str):
+    """The previous implementation: load every document and compute statistics in Python."""
+    evaluations = await get_evaluations_by_hackathon_id(hackathon_id)
+    overall_scores = [doc["overall_score"] for doc in evaluations]
+    parameter_scores = {}
+    for doc in evaluations:
+        for name, data in doc["parameter_scores"].items():
+            parameter_scores.setdefault(name, []).append(data["score"])
+    averages = {name: round(sum(scores) / len(scores), 2) for name, scores in parameter_scores.items()}
+    transferred = sum(len(bson.encode({k: v for k, v in doc.items() if k != "_id"})) for doc in evaluations)
+    return {"average_score": round(sum(overall_scores) / len(overall_scores), 2), "parameter_averages": averages}, transferred
+
+async def benchmark(submission_count: int):
+    await ensure_indexes()
+    print(f"Seeding {submission_count} evaluations with {TRANSCRIPT_WORDS}-word transcripts...")
+    await seed(submission_count)
+    seed_ms, update_ms = await materialise(submission_count)
+
+    timings = {"load_all": [], "aggregation": [], "materialised": []}
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        legacy, legacy_bytes = await load_all_statistics(HACKATHON_ID)
+        timings["load_all"].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        aggregated = await aggregate_hackathon_statistics(HACKATHON_ID)
+        timings["aggregation"].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        materialised = await get_hackathon_statistics(HACKATHON_ID)
+        timings["materialised"].append((time.perf_counter() - started) * 1000)
+
+    assert legacy["average_score"] == aggregated["average_score"], "Aggregation disagrees with the Python computation"
+    assert abs(materialised["average_score"] - aggregated["average_score"]) <= 0.01, "Materialised statistics disagree with the aggregation"
+    aggregated_bytes = len(bson.encode(aggregated))
+
+    print(f"\n=== Hackathon statistics over {submission_count} submissions (best of {ROUNDS}) ===")
+    print(f"load all documents: {min(timings['load_all']):9.1f} ms  {legacy_bytes / 1024 / 1024:9.2f} MB transferred")
+    print(f"aggregation:        {min(timings['aggregation']):9.1f} ms  {aggregated_bytes / 1024:9.2f} KB transferred")
+    print(f"materialised:       {min(timings['materialised']):9.1f} ms  (+{update_ms:.2f} ms per evaluation write, {seed_ms:.1f} ms one-off seed)")
+
+    await db.evaluations.delete_many({"hackathon_id": HACKATHON_ID})
+    await db.hackathon_stats.delete_one({"_id": HACKATHON_ID})
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
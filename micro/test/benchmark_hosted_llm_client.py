@@ -0,0 +1,126 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Runs against a local stand-in for the hosted model: python test/benchmark_hosted_llm_client.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.hosted_llm import HostedLLMClient, HostedLLMError, CircuitOpenError, hosted_llm_client
+from services.smry_fdbk import generate_summary_feedback_llama
+
+class StandIn:
+    """Behaviour of the stand-in server, changed between scenarios."""
+    latency_seconds = 0.05
+    failure_rate = 0.0
+    in_flight = 0
+    max_in_flight = 0
+    requests = 0
+    lock = threading.Lock()
+
+    @classmethod
+    def reset(cls, latency_seconds: float, failure_rate: float):
+        with cls.lock:
+            cls.latency_seconds = latency_seconds
+            cls.failure_rate = failure_rate
+            cls.in_flight = cls.max_in_flight = cls.requests = 0
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers like the hosted inference API after a delay, failing a share of requests with 503."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with StandIn.lock:
+            StandIn.requests += 1
+            StandIn.in_flight += 1
+            StandIn.max_in_flight = max(StandIn.max_in_flight, StandIn.in_flight)
+        try:
+            time.sleep(StandIn.latency_seconds)
+            if random.random() < StandIn.failure_rate:
+                status, body = 503, {"error": "Model is currently loading"}
+            else:
+                status, body = 200, [{"generated_text": "A concise summary. Feedback: clear and feasible."}]
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        finally:
+            with StandIn.lock:
+                StandIn.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+async def scenario(name: str, url: str, calls: int, latency_seconds: float, failure_rate: float, **client_options):
+    StandIn.reset(latency_seconds, failure_rate)
+    client = HostedLLMClient(backoff_seconds=0.05, max_backoff_seconds=0.5, **client_options)
+    outcomes = {"ok": 0, "failed": 0, "rejected": 0}
+
+    async def call():
+        try:
+            await client.post_json(url, {"inputs": "prompt"})
+            outcomes["ok"] += 1
+        except CircuitOpenError:
+            outcomes["rejected"] += 1
+        except HostedLLMError:
+            outcomes["failed"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+    await client.close()
+
+    stats = client.stats()
+    print(f"\n=== {name} ===")
+    print(f"{calls} calls in {elapsed:.2f}s: {outcomes['ok']} ok, {outcomes['failed']} failed, {outcomes['rejected']} rejected by the breaker")
+    print(f"upstream saw {StandIn.requests} requests, at most {StandIn.max_in_flight} at once (cap {client.max_concurrency}); "
+          f"{stats['retries']} retries; breaker {stats['breakers'].get(url)}")
+
+async def fallback_scenario(url: str, calls: int):
+    """The summary & feedback service against a failing upstream: every call should still get a local summary."""
+    StandIn.reset(0.01, 1.0)
+    submission = (
+        "We built a mobile app that routes food waste from restaurants to shelters. "
+        "Restaurants log surplus meals and nearby shelters claim them. "
+        "A scheduler batches pickups so that drivers make fewer trips. "
+        "The pilot ran with twelve restaurants for a month."
+    )
+    parameters = {"Feasibility": "Can it be built and run?", "Impact": "Does it reduce waste?"}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        generate_summary_feedback_llama("Reduce food waste", submission, parameters, url=url) for _ in range(calls)
+    ))
+    elapsed = time.perf_counter() - started
+    sources = [source for _, _, source in results]
+    stats = hosted_llm_client.stats()
+    await hosted_llm_client.close()
+
+    print("\n=== summary & feedback fallback (100% 503) ===")
+    print(f"{calls} calls in {elapsed:.2f}s: {sources.count('hosted')} hosted, {sources.count('local')} local summaries")
+    print(f"upstream saw {StandIn.requests} requests; {stats['rejected']} rejected by the breaker; breaker {stats['breakers'].get(url)}")
+    print(f"local summary: {results[0][0]}")
+
+async def run():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/models/stand-in"
+
+    try:
+        await scenario("healthy upstream", url, 50, 0.05, 0.0, max_concurrency=4)
+        await scenario("flaky upstream (30% 503)", url, 50, 0.05, 0.3, max_concurrency=4)
+        # Retries stop when the budget runs out, then consecutive failures open the breaker
+        await scenario("failing upstream (100% 503)", url, 50, 0.01, 1.0, max_concurrency=4, breaker_failures=5)
+        await scenario("slow upstream (timeouts)", url, 8, 1.0, 0.0, max_concurrency=4, timeout=0.2, max_retries=1)
+        await fallback_scenario(url, 30)
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+import os
+import sys
+import asyncio
+import datetime
+
+# Run against a throwaway database on a local mongod: python test/test_evaluation_pagination.py
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017/")
+os.environ.setdefault("MONGODB_DB_NAME", "hackathon_test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from utils.db_connector import db, ensure_indexes, iter_evaluations_by_hackathon_id, encode_page_cursor, EVALUATION_SORT_KEYS
+
+HACKATHON_ID = "test-pagination"
+PAGE_SIZE = 2
+
+def sample_evaluations():
+    created_at = datetime.datetime(2024, 6, 1)
+    scores = [72.5, 90.0, None, 72.5, 41.0, None, 90.0]
+    evaluations = []
+    for i, score in enumerate(scores):
+        evaluation = {
+            "_id": ObjectId(),
+            "submission_id": f"pagination-{i}",
+            "hackathon_id": HACKATHON_ID,
+            "created_at": created_at + datetime.timedelta(minutes=i % 3)
+        }
+        if score is not None:
+            evaluation["overall_score"] = score
+        elif i % 2:
+            evaluation["overall_score"] = None  # Unscored: one stored as null, one without the field
+        evaluations.append(evaluation)
+    return evaluations
+
+async def page_through(sort_key: str, descending: bool):
+    seen = []
+    cursor = None
+    while True:
+        page = [doc async for doc in iter_evaluations_by_hackathon_id(HACKATHON_ID, sort_key, descending, cursor, PAGE_SIZE)]
+        seen.extend(doc["submission_id"] for doc in page)
+        if len(page) < PAGE_SIZE:
+            return seen
+        cursor = encode_page_cursor(page[-1], sort_key)
+
+def expected_order(evaluations, sort_key: str, descending: bool):
+    # MongoDB sorts null and missing values below every number and date
+    scored = [evaluation for evaluation in evaluations if evaluation.get(sort_key) is not None]
+    unscored = [evaluation for evaluation in evaluations if evaluation.get(sort_key) is None]
+    scored.sort(key=lambda evaluation: (evaluation[sort_key], evaluation["_id"]), reverse=descending)
+    unscored.sort(key=lambda evaluation: evaluation["_id"], reverse=descending)
+    ordered = scored + unscored if descending else unscored + scored
+    return [evaluation["submission_id"] for evaluation in ordered]
+
+async def main():
+    await ensure_indexes()
+    await db.evaluations.delete_many({"hackathon_id": HACKATHON_ID})
+    evaluations = sample_evaluations()
+    await db.evaluations.insert_many([dict(evaluation) for evaluation in evaluations])
+
+    try:
+        for sort_key in EVALUATION_SORT_KEYS:
+            for descending in (True, False):
+                seen = await page_through(sort_key, descending)
+                assert len(seen) == len(set(seen)), f"{sort_key} {'desc' if descending else 'asc'}: a submission was repeated"
+                assert seen == expected_order(evaluations, sort_key, descending), f"{sort_key} {'desc' if descending else 'asc'}: got {seen}"
+                print(f"{sort_key:>13} {'desc' if descending else 'asc ':4}: {len(seen)} evaluations in {PAGE_SIZE}-item pages, none skipped")
+    finally:
+        await db.evaluations.delete_many({"hackathon_id": HACKATHON_ID})
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,20 @@
 import os
 import motor.motor_asyncio
 from dotenv import load_dotenv
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from bson import Binary, ObjectId
+from utils.near_duplicates import submission_signature, estimated_jaccard, cluster_pairs
+from utils.embedding_codec import embedding_document, embedding_from_document
+import asyncio
+import base64
+import logging
 import datetime
+import hashlib
+import json
+import zlib
+import numpy as np
 
 # Load environment variables
 load_dotenv()
@@ -11,22 +23,118 @@ load_dotenv()
 MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "hackathon_platform")
 
+# zlib level used for stored transcripts; text compresses 3-4x at the default level
+TRANSCRIPT_COMPRESSION_LEVEL = int(os.getenv("TRANSCRIPT_COMPRESSION_LEVEL", "6"))
+
+# Number of top submissions kept in each hackathon's materialised leaderboard
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "100"))
+
+# A pair of submissions is flagged when either similarity reaches its threshold
+DUPLICATE_JACCARD_THRESHOLD = float(os.getenv("DUPLICATE_JACCARD_THRESHOLD", "0.5"))
+DUPLICATE_COSINE_THRESHOLD = float(os.getenv("DUPLICATE_COSINE_THRESHOLD", "0.9"))
+DUPLICATE_MAX_CANDIDATES = int(os.getenv("DUPLICATE_MAX_CANDIDATES", "200"))
+
 # Create client
 client = motor.motor_asyncio.AsyncIOMotorClient(MONGODB_URI)
 db = client[MONGODB_DB_NAME]
 
+async def ensure_indexes() -> None:
+    """
+    Create the indexes the evaluation queries rely on. Called once at startup;
+    create_indexes is a no-op for indexes that already exist.
+    
+    The query indexes are created first, so they exist whatever happens to the
+    unique submission_id index. That index is built after removing duplicate
+    evaluations (see remove_duplicate_evaluations), in its own call.
+    
+    Raises:
+        RuntimeError: The unique submission_id index could not be built. Writes
+            rely on it to keep one evaluation per submission, so the service
+            should not start without it.
+    """
+    try:
+        await db.evaluations.create_indexes([
+            # _id breaks ties so keyset pagination over either sort key is exact
+            IndexModel([("hackathon_id", ASCENDING), ("overall_score", DESCENDING), ("_id", DESCENDING)], name="hackathon_score_id"),
+            IndexModel([("hackathon_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="hackathon_created_at_id"),
+            # Only evaluations sent to the LLM stage carry a status, so the index stays small
+            IndexModel([("hackathon_id", ASCENDING), ("llm_status", ASCENDING)], name="hackathon_llm_status",
+                       partialFilterExpression={"llm_status": {"$exists": True}})
+        ])
+        # LSH band keys are a multikey index, so candidate lookup touches only colliding submissions
+        await db.duplicate_signatures.create_indexes([
+            IndexModel([("hackathon_id", ASCENDING), ("bands", ASCENDING)], name="hackathon_bands")
+        ])
+        await db.duplicate_pairs.create_indexes([
+            IndexModel([("hackathon_id", ASCENDING)], name="hackathon"),
+            IndexModel([("submissions", ASCENDING)], name="submissions")
+        ])
+    except Exception as e:
+        logging.error(f"Error creating MongoDB query indexes: {str(e)}")
+    
+    try:
+        removed = await remove_duplicate_evaluations()
+        if removed:
+            logging.warning(f"Removed {removed} older duplicate evaluations before building the unique submission_id index")
+        await db.evaluations.create_indexes([
+            IndexModel([("submission_id", ASCENDING)], unique=True, name="submission_id_unique")
+        ])
+    except Exception as e:
+        logging.error(f"Could not build the unique submission_id index on evaluations: {str(e)}")
+        raise RuntimeError(f"Unique submission_id index on evaluations is missing: {str(e)}") from e
+
+async def remove_duplicate_evaluations() -> int:
+    """
+    Keep only the newest evaluation of every submission (latest updated_at, then
+    created_at, then _id) and delete the others, which earlier versions could
+    store when two writes of a submission raced. Statistics of the affected
+    hackathons are rebuilt. Returns the number of evaluations deleted.
+    """
+    pipeline = [
+        {"$sort": {"submission_id": ASCENDING, "updated_at": DESCENDING, "created_at": DESCENDING, "_id": DESCENDING}},
+        {"$group": {
+            "_id": "$submission_id",
+            "ids": {"$push": "$_id"},
+            "hackathons": {"$addToSet": "$hackathon_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+    stale = []
+    hackathons = set()
+    async for group in db.evaluations.aggregate(pipeline, allowDiskUse=True):
+        stale.extend(group["ids"][1:])
+        hackathons.update(group["hackathons"])
+    
+    for start in range(0, len(stale), 1000):
+        await db.evaluations.delete_many({"_id": {"$in": stale[start:start + 1000]}})
+    for hackathon_id in hackathons:
+        try:
+            await rebuild_hackathon_stats(hackathon_id)
+        except Exception as e:
+            logging.error(f"Error rebuilding statistics of hackathon {hackathon_id} after removing duplicates: {str(e)}")
+    return len(stale)
+
 async def store_evaluation_scores(
     submission_id: str, 
     hackathon_id: str, 
     text_content: str,
     parameter_scores: Dict[str, Dict[str, float]],
     overall_score: float,
-    summary_feedback: Dict[str, str] = None
+    summary_feedback: Dict[str, str] = None,
+    duplicate_signature: Dict[str, Any] = None
 ) -> Dict[str, Any]:
     """
     Store evaluation scores in MongoDB. If an evaluation already exists
     for the submission, it will be updated with the new scores.
     
+    The transcript is stored compressed in the transcripts collection, keyed
+    by its content hash, and the evaluation document only keeps that key.
+    The write is a single atomic upsert keyed on the unique submission_id,
+    so concurrent retries cannot create duplicate evaluation documents. The
+    hackathon's materialised statistics are then adjusted by the difference
+    between the new and replaced scores.
+    
     Args:
         submission_id: ID of the submission
         hackathon_id: ID of the hackathon
@@ -34,58 +142,31 @@ async def store_evaluation_scores(
         parameter_scores: Dictionary of parameter scores
         overall_score: Overall score for the submission
         summary_feedback: Dictionary containing summary and feedback
+        duplicate_signature: The text's submission_signature, if already computed
         
     Returns:
         Dictionary containing operation result
     """
     try:
-        # Check if an evaluation already exists for this submission
-        existing_eval = await db.evaluations.find_one({"submission_id": submission_id})
+        # The transcript lives in its own collection; the evaluation only references it
+        transcript_id = await store_transcript(text_content)
+        evaluation_doc, update, evaluation_id = build_evaluation_update(
+            submission_id, hackathon_id, transcript_id, len(text_content or ""),
+            parameter_scores, overall_score, summary_feedback
+        )
         
-        # Create evaluation document
-        evaluation_doc = {
-            "submission_id": submission_id,
-            "hackathon_id": hackathon_id,
-            "text_content": text_content,
-            "parameter_scores": parameter_scores,
-            "overall_score": overall_score,
-            "updated_at": datetime.datetime.now()
-        }
+        previous = await upsert_evaluation(submission_id, update)
         
-        # Add summary and feedback if provided
-        if summary_feedback:
-            evaluation_doc["summary_feedback"] = summary_feedback
+        # Keep the materialised hackathon statistics in step with the stored scores
+        await update_hackathon_stats(evaluation_doc, previous)
+        await update_duplicate_index(hackathon_id, submission_id, text_content, duplicate_signature)
         
-        if existing_eval:
-            # Update existing evaluation
-            # Keep the original created_at timestamp
-            if "created_at" in existing_eval:
-                evaluation_doc["created_at"] = existing_eval["created_at"]
-            else:
-                evaluation_doc["created_at"] = evaluation_doc["updated_at"]
-                
-            result = await db.evaluations.update_one(
-                {"submission_id": submission_id},
-                {"$set": evaluation_doc}
-            )
-            
-            return {
-                "success": True,
-                "evaluation_id": str(existing_eval["_id"]),
-                "submission_id": submission_id,
-                "updated": True
-            }
-        else:
-            # Store new evaluation
-            evaluation_doc["created_at"] = evaluation_doc["updated_at"]
-            result = await db.evaluations.insert_one(evaluation_doc)
-            
-            return {
-                "success": True,
-                "evaluation_id": str(result.inserted_id),
-                "submission_id": submission_id,
-                "updated": False
-            }
+        return {
+            "success": True,
+            "evaluation_id": str(previous["_id"] if previous else evaluation_id),
+            "submission_id": submission_id,
+            "updated": previous is not None
+        }
     except Exception as e:
         print(f"Error storing evaluation in MongoDB: {str(e)}")
         return {
@@ -94,41 +175,1126 @@ async def store_evaluation_scores(
             "submission_id": submission_id
         }
 
-async def get_evaluation_by_submission_id(submission_id: str) -> Dict[str, Any]:
+def build_evaluation_update(
+    submission_id: str,
+    hackathon_id: str,
+    transcript_id: str,
+    transcript_length: int,
+    parameter_scores: Dict[str, Dict[str, float]],
+    overall_score: float,
+    summary_feedback: Dict[str, str] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any], ObjectId]:
+    """
+    Build the evaluation document and the upsert that stores it.
+    
+    Returns:
+        (evaluation document, update document, _id used if the upsert inserts)
+    """
+    now = datetime.datetime.now()
+    
+    # Create evaluation document
+    evaluation_doc = {
+        "submission_id": submission_id,
+        "hackathon_id": hackathon_id,
+        "transcript_id": transcript_id,
+        "transcript_length": transcript_length,
+        "parameter_scores": parameter_scores,
+        "overall_score": overall_score,
+        "updated_at": now
+    }
+    
+    # Add summary and feedback if provided
+    if summary_feedback:
+        evaluation_doc["summary_feedback"] = summary_feedback
+    
+    evaluation_id = ObjectId()
+    update = {
+        "$set": evaluation_doc,
+        "$setOnInsert": {"_id": evaluation_id, "created_at": now},  # Keep the original created_at timestamp
+        "$inc": {"revision": 1},  # Lets bulk writes check the document is still the one they read
+        "$unset": {"text_content": ""}  # Drop transcripts stored inline by earlier versions
+    }
+    return evaluation_doc, update, evaluation_id
+
+# Fields of a replaced evaluation the statistics deltas need
+PREVIOUS_SCORES_PROJECTION = {"_id": 1, "hackathon_id": 1, "submission_id": 1, "overall_score": 1, "parameter_scores": 1, "revision": 1}
+
+async def upsert_evaluation(submission_id: str, update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply an update to the evaluation for a submission, inserting it if missing,
+    in one round trip. Returns the scores the document held before the update,
+    or None if it was inserted.
+    """
+    try:
+        return await db.evaluations.find_one_and_update(
+            {"submission_id": submission_id},
+            update,
+            projection=PREVIOUS_SCORES_PROJECTION,
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        # Two concurrent upserts both tried to insert; the retry updates the winner's document
+        return await db.evaluations.find_one_and_update(
+            {"submission_id": submission_id},
+            update,
+            projection=PREVIOUS_SCORES_PROJECTION,
+            return_document=ReturnDocument.BEFORE
+        )
+
+async def _bulk_upsert(collection, operations: List[UpdateOne]) -> Tuple[set, Dict[int, str]]:
+    """
+    Run an unordered bulk write, so one failing operation does not stop the rest.
+    
+    Returns:
+        (indices of operations that inserted, {index: error message} for failed operations)
+    """
+    if not operations:
+        return set(), {}
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+        return set(result.upserted_ids.keys()), {}
+    except BulkWriteError as e:
+        upserted = {item["index"] for item in e.details.get("upserted", [])}
+        errors = {error["index"]: error.get("errmsg", "write failed") for error in e.details.get("writeErrors", [])}
+        return upserted, errors
+
+async def bulk_store_evaluation_scores(evaluations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Store many evaluations with a few unordered bulk writes instead of one
+    round trip each. Transcripts, evaluations, hackathon statistics and the
+    duplicate index are written the same way store_evaluation_scores writes them.
+    
+    The replaced scores are read in one query before the evaluations bulk write,
+    and each write only applies to the revision that was read. A submission
+    rewritten by another writer in between fails its write and is redone with
+    the single path's atomic upsert, so statistics deltas never use stale scores.
+    
+    Args:
+        evaluations: Dictionaries with the store_evaluation_scores arguments
+        
+    Returns:
+        One result per input, in input order, shaped like store_evaluation_scores results
+    """
+    results = [None] * len(evaluations)
+    
+    # Within one batch the last evaluation of a submission wins, as it would with sequential writes
+    latest = {}
+    for index, evaluation in enumerate(evaluations):
+        previous_index = latest.get(evaluation["submission_id"])
+        if previous_index is not None:
+            results[previous_index] = {"success": True, "submission_id": evaluation["submission_id"], "superseded": True}
+        latest[evaluation["submission_id"]] = index
+    pending = sorted(latest.values())
+    
+    try:
+        # Store each distinct transcript once
+        transcripts = {}
+        transcript_ids = {}
+        for index in pending:
+            transcript_id, update = transcript_upsert(evaluations[index].get("text_content"))
+            transcripts.setdefault(transcript_id, update)
+            transcript_ids[index] = transcript_id
+        transcript_order = list(transcripts.keys())
+        _, transcript_errors = await _bulk_upsert(db.transcripts, [
+            UpdateOne({"_id": transcript_id}, transcripts[transcript_id], upsert=True) for transcript_id in transcript_order
+        ])
+        failed_transcripts = {transcript_order[i]: message for i, message in transcript_errors.items()}
+        
+        writes = []
+        for index in pending:
+            evaluation = evaluations[index]
+            if transcript_ids[index] in failed_transcripts:
+                results[index] = {"success": False, "error": failed_transcripts[transcript_ids[index]], "submission_id": evaluation["submission_id"]}
+                continue
+            evaluation_doc, update, evaluation_id = build_evaluation_update(
+                evaluation["submission_id"], evaluation["hackathon_id"], transcript_ids[index],
+                len(evaluation.get("text_content") or ""), evaluation["parameter_scores"],
+                evaluation["overall_score"], evaluation.get("summary_feedback")
+            )
+            writes.append((index, evaluation_doc, update, evaluation_id))
+        
+        # Previous scores of the submissions being replaced, for the statistics deltas
+        previous_by_submission = {}
+        async for doc in db.evaluations.find(
+            {"submission_id": {"$in": [evaluation_doc["submission_id"] for _, evaluation_doc, _, _ in writes]}},
+            PREVIOUS_SCORES_PROJECTION
+        ):
+            previous_by_submission[doc["submission_id"]] = doc
+        
+        operations = []
+        for _, evaluation_doc, update, _ in writes:
+            previous = previous_by_submission.get(evaluation_doc["submission_id"])
+            revision = previous.get("revision") if previous else None
+            # Matches only the document that was read (or none, for a new submission); otherwise
+            # the upsert tries to insert and fails on the unique submission_id index
+            operations.append(UpdateOne(
+                {"submission_id": evaluation_doc["submission_id"], "revision": {"$exists": False} if revision is None else revision},
+                update,
+                upsert=True
+            ))
+        upserted, errors = await _bulk_upsert(db.evaluations, operations)
+        
+        # Submissions written by someone else since they were read: redo them atomically
+        raced = [position for position, message in errors.items() if "E11000" in message]
+        redone = await asyncio.gather(*[upsert_evaluation(writes[position][1]["submission_id"], writes[position][2]) for position in raced], return_exceptions=True)
+        for position, outcome in zip(raced, redone):
+            if isinstance(outcome, Exception):
+                errors[position] = str(outcome)
+                continue
+            del errors[position]
+            submission_id = writes[position][1]["submission_id"]
+            if outcome is None:
+                previous_by_submission.pop(submission_id, None)
+                upserted.add(position)
+            else:
+                previous_by_submission[submission_id] = outcome
+                upserted.discard(position)
+        
+        stored = []
+        for position, (index, evaluation_doc, _, evaluation_id) in enumerate(writes):
+            submission_id = evaluation_doc["submission_id"]
+            if position in errors:
+                results[index] = {"success": False, "error": errors[position], "submission_id": submission_id}
+                previous_by_submission.pop(submission_id, None)
+                continue
+            previous = previous_by_submission.get(submission_id)
+            results[index] = {
+                "success": True,
+                "evaluation_id": str(evaluation_id if previous is None else previous["_id"]),
+                "submission_id": submission_id,
+                "updated": previous is not None
+            }
+            stored.append(evaluation_doc)
+        
+        # Keep the materialised hackathon statistics and the duplicate index in step, in a few writes per hackathon
+        await update_hackathon_stats_batch(stored, previous_by_submission)
+        by_submission = {evaluations[index]["submission_id"]: evaluations[index] for index in pending}
+        await update_duplicate_indexes([
+            (
+                evaluation_doc["hackathon_id"],
+                evaluation_doc["submission_id"],
+                by_submission[evaluation_doc["submission_id"]].get("duplicate_signature")
+                or submission_signature(by_submission[evaluation_doc["submission_id"]].get("text_content"))
+            )
+            for evaluation_doc in stored
+        ])
+    except Exception as e:
+        print(f"Error bulk storing evaluations in MongoDB: {str(e)}")
+        for index in pending:
+            if results[index] is None:
+                results[index] = {"success": False, "error": str(e), "submission_id": evaluations[index]["submission_id"]}
+    
+    return results
+
+def transcript_hash(text_content: str) -> str:
+    """Content hash identifying a transcript, so identical texts are stored once."""
+    return hashlib.sha256((text_content or "").encode("utf-8")).hexdigest()
+
+async def store_transcript(text_content: str) -> str:
+    """
+    Store a transcript zlib-compressed in the transcripts collection under its
+    content hash. Storing a text that is already present is a no-op.
+    
+    Args:
+        text_content: Extracted text content
+        
+    Returns:
+        The transcript id (content hash)
+    """
+    transcript_id, update = transcript_upsert(text_content)
+    await db.transcripts.update_one({"_id": transcript_id}, update, upsert=True)
+    return transcript_id
+
+def transcript_upsert(text_content: str) -> Tuple[str, Dict[str, Any]]:
+    """Transcript id and the insert-only update that stores the compressed text."""
+    raw = (text_content or "").encode("utf-8")
+    return transcript_hash(text_content), {"$setOnInsert": {
+        "codec": "zlib",
+        "data": Binary(zlib.compress(raw, TRANSCRIPT_COMPRESSION_LEVEL)),
+        "size": len(raw),
+        "created_at": datetime.datetime.now()
+    }}
+
+async def get_transcript(submission_id: str) -> Optional[str]:
+    """
+    Fetch and decompress the transcript of an evaluated submission. Only called
+    when a client asks for the text; evaluation reads never load it.
+    
+    Args:
+        submission_id: ID of the submission
+        
+    Returns:
+        The transcript text, or None if the submission has no evaluation
+    """
+    evaluation = await db.evaluations.find_one(
+        {"submission_id": submission_id},
+        {"_id": 0, "transcript_id": 1, "text_content": 1}
+    )
+    if evaluation is None:
+        return None
+    
+    if "transcript_id" not in evaluation:
+        # Evaluated before transcripts were moved out
+        return evaluation.get("text_content", "")
+    
+    transcript = await db.transcripts.find_one({"_id": evaluation["transcript_id"]})
+    if transcript is None:
+        return None
+    return zlib.decompress(transcript["data"]).decode("utf-8")
+
+async def migrate_inline_transcripts(batch_size: int = 500) -> int:
+    """
+    Move transcripts stored inline by earlier versions into the transcripts collection.
+    Safe to re-run; returns the number of evaluations migrated.
+    """
+    migrated = 0
+    cursor = db.evaluations.find({"text_content": {"$exists": True}}, {"text_content": 1}).batch_size(batch_size)
+    async for doc in cursor:
+        text_content = doc.get("text_content") or ""
+        transcript_id = await store_transcript(text_content)
+        await db.evaluations.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {"transcript_id": transcript_id, "transcript_length": len(text_content)}, "$unset": {"text_content": ""}}
+        )
+        migrated += 1
+    return migrated
+
+async def get_evaluation_by_submission_id(submission_id: str, projection: Dict[str, int] = None) -> Dict[str, Any]:
     """
     Retrieve evaluation results for a specific submission
     
     Args:
         submission_id: ID of the submission
+        projection: Optional MongoDB projection limiting the returned fields
         
     Returns:
         Dictionary containing evaluation results or None if not found
     """
-    evaluation = await db.evaluations.find_one({"submission_id": submission_id})
+    evaluation = await db.evaluations.find_one({"submission_id": submission_id}, projection)
     
     if evaluation:
         # Convert ObjectId to string for JSON serialization
-        evaluation["_id"] = str(evaluation["_id"])
+        if "_id" in evaluation:
+            evaluation["_id"] = str(evaluation["_id"])
         return evaluation
     
     return None
     
-async def get_evaluations_by_hackathon_id(hackathon_id: str) -> List[Dict[str, Any]]:
+async def get_evaluations_by_hackathon_id(hackathon_id: str, projection: Dict[str, int] = None) -> List[Dict[str, Any]]:
     """
     Retrieve all evaluation results for a specific hackathon
     
     Args:
         hackathon_id: ID of the hackathon
+        projection: Optional MongoDB projection limiting the returned fields
         
     Returns:
         List of evaluation documents
     """
-    cursor = db.evaluations.find({"hackathon_id": hackathon_id})
+    cursor = db.evaluations.find({"hackathon_id": hackathon_id}, projection)
     evaluations = []
     
     async for doc in cursor:
         # Convert ObjectId to string for JSON serialization
-        doc["_id"] = str(doc["_id"])
+        if "_id" in doc:
+            doc["_id"] = str(doc["_id"])
         evaluations.append(doc)
     
-    return evaluations 
\ No newline at end of file
+    return evaluations
+
+async def add_ideal_solutions(hackathon_id: str, references: List[Dict[str, Any]], replace: bool = False) -> int:
+    """
+    Store reference solutions for a hackathon. Each reference carries its text
+    and an embedding_codec.embedding_document, so it is embedded only once.
+    Every change bumps the hackathon's version, which invalidates cached copies.
+    
+    Args:
+        hackathon_id: ID of the hackathon
+        references: Dictionaries with reference_id, text and embedding
+        replace: Replace the existing references instead of adding to them
+        
+    Returns:
+        The new version number
+    """
+    now = datetime.datetime.now()
+    update = {"$inc": {"version": 1}, "$set": {"updated_at": now}}
+    if replace:
+        update["$set"]["references"] = references
+    else:
+        update["$push"] = {"references": {"$each": references}}
+    
+    stored = await db.ideal_solutions.find_one_and_update(
+        {"_id": hackathon_id},
+        update,
+        projection={"version": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return stored["version"]
+
+async def delete_ideal_solution(hackathon_id: str, reference_id: str) -> bool:
+    """Remove one reference solution; returns False if it did not exist."""
+    result = await db.ideal_solutions.update_one(
+        {"_id": hackathon_id, "references.reference_id": reference_id},
+        {"$pull": {"references": {"reference_id": reference_id}}, "$inc": {"version": 1}, "$set": {"updated_at": datetime.datetime.now()}}
+    )
+    return result.modified_count > 0
+
+async def get_ideal_solutions(hackathon_id: str, include_embeddings: bool = True) -> Optional[Dict[str, Any]]:
+    """A hackathon's reference solutions and version, or None if it has none."""
+    projection = None if include_embeddings else {"references.embedding": 0}
+    return await db.ideal_solutions.find_one({"_id": hackathon_id}, projection)
+
+async def get_ideal_solutions_version(hackathon_id: str) -> Optional[int]:
+    """Current version of a hackathon's reference solutions, answered from the _id index."""
+    stored = await db.ideal_solutions.find_one({"_id": hackathon_id}, {"version": 1})
+    return stored["version"] if stored else None
+
+async def get_hackathon_settings(hackathon_id: str) -> Dict[str, Any]:
+    """A hackathon's evaluation settings (for example summary_mode); empty if none were saved."""
+    stored = await db.hackathon_settings.find_one({"_id": hackathon_id}, {"_id": 0, "updated_at": 0})
+    return stored or {}
+
+async def update_hackathon_settings(hackathon_id: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge settings into a hackathon's saved settings and return the result."""
+    stored = await db.hackathon_settings.find_one_and_update(
+        {"_id": hackathon_id},
+        {"$set": {**settings, "updated_at": datetime.datetime.now()}},
+        projection={"_id": 0, "updated_at": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return stored
+
+async def count_higher_scores(hackathon_id: str, overall_score: float) -> int:
+    """Number of a hackathon's evaluations scoring above overall_score, answered from the score index."""
+    return await db.evaluations.count_documents({"hackathon_id": hackathon_id, "overall_score": {"$gt": overall_score}})
+
+async def mark_llm_pending(submission_id: str, llm_job: Dict[str, Any]) -> bool:
+    """
+    Record that a stored evaluation is waiting for the LLM stage, with what the
+    stage needs to run (hackathon, problem statement, criteria and reasons).
+    The job lives on the evaluation, so it survives restarts and can be re-queued.
+    """
+    result = await db.evaluations.update_one(
+        {"submission_id": submission_id},
+        {
+            "$set": {"llm_status": "pending", "llm_job": llm_job, "llm_requested_at": datetime.datetime.now()},
+            "$unset": {"llm_error": ""}
+        }
+    )
+    return result.matched_count > 0
+
+async def get_llm_job(submission_id: str) -> Optional[Dict[str, Any]]:
+    """The LLM stage status and job of a stored evaluation, or None if it has none."""
+    return await db.evaluations.find_one(
+        {"submission_id": submission_id, "llm_job": {"$exists": True}},
+        {"_id": 0, "hackathon_id": 1, "llm_status": 1, "llm_job": 1, "llm_attempts": 1}
+    )
+
+async def store_llm_evaluation(submission_id: str, llm_evaluation: Dict[str, Any], cascade: Dict[str, Any]) -> bool:
+    """Attach the LLM stage's result and the reasons it ran to a stored evaluation; False if the evaluation is gone."""
+    result = await db.evaluations.update_one(
+        {"submission_id": submission_id},
+        {
+            "$set": {"llm_evaluation": llm_evaluation, "cascade": cascade, "llm_status": "done", "updated_at": datetime.datetime.now()},
+            "$inc": {"llm_attempts": 1},
+            "$unset": {"llm_error": ""}
+        }
+    )
+    return result.matched_count > 0
+
+async def mark_llm_failed(submission_id: str, error: str) -> None:
+    """Record a failed LLM stage attempt; the job stays on the evaluation so it can be retried."""
+    await db.evaluations.update_one(
+        {"submission_id": submission_id},
+        {"$set": {"llm_status": "failed", "llm_error": error, "updated_at": datetime.datetime.now()}, "$inc": {"llm_attempts": 1}}
+    )
+
+async def get_unfinished_llm_submissions(hackathon_id: str, include_failed: bool = True) -> List[str]:
+    """Submission IDs of a hackathon whose LLM stage is pending (or failed), oldest request first."""
+    statuses = ["pending", "failed"] if include_failed else ["pending"]
+    cursor = db.evaluations.find(
+        {"hackathon_id": hackathon_id, "llm_status": {"$in": statuses}},
+        {"_id": 0, "submission_id": 1}
+    ).sort("llm_requested_at", ASCENDING)
+    return [doc["submission_id"] async for doc in cursor]
+
+async def count_llm_statuses(hackathon_id: str) -> Dict[str, int]:
+    """Number of a hackathon's evaluations in each LLM stage status (pending, done, failed)."""
+    pipeline = [
+        {"$match": {"hackathon_id": hackathon_id, "llm_status": {"$exists": True}}},
+        {"$group": {"_id": "$llm_status", "count": {"$sum": 1}}}
+    ]
+    return {doc["_id"]: doc["count"] async for doc in db.evaluations.aggregate(pipeline)}
+
+async def record_hackathon_compute(hackathon_id: str, stage: str, seconds: float, count: int = 1) -> None:
+    """Add time spent in an evaluation stage (cheap, llm or skipped) to the hackathon's compute totals."""
+    try:
+        await db.hackathon_compute.update_one(
+            {"_id": hackathon_id},
+            {"$inc": {f"{stage}.seconds": seconds, f"{stage}.count": count}, "$set": {"updated_at": datetime.datetime.now()}},
+            upsert=True
+        )
+    except Exception as e:
+        print(f"Error recording compute for hackathon {hackathon_id}: {str(e)}")
+
+async def get_hackathon_compute(hackathon_id: str) -> Dict[str, Any]:
+    """Per-stage evaluation counts and seconds spent on a hackathon."""
+    stored = await db.hackathon_compute.find_one({"_id": hackathon_id}, {"_id": 0, "updated_at": 0})
+    return stored or {}
+
+# Sort keys the evaluations listing can page over; each is backed by a (hackathon_id, key, _id) index
+EVALUATION_SORT_KEYS = ("overall_score", "created_at")
+
+def encode_page_cursor(doc: Dict[str, Any], sort_key: str) -> str:
+    """Opaque cursor pointing just past `doc` in (sort_key, _id) order."""
+    value = doc.get(sort_key)
+    if isinstance(value, datetime.datetime):
+        value = {"$date": value.isoformat()}
+    token = json.dumps({"v": value, "id": str(doc["_id"])}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(token.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_page_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """Reverse of encode_page_cursor. Raises ValueError for malformed cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        token = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = token["v"]
+        if isinstance(value, dict):
+            value = datetime.datetime.fromisoformat(value["$date"])
+        return value, ObjectId(token["id"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def page_after_filter(sort_key: str, value: Any, last_id: ObjectId, descending: bool) -> Dict[str, Any]:
+    """
+    Filter for the documents after (value, last_id) in (sort_key, _id) order.
+    MongoDB sorts null and missing values below every other value, and range
+    operators never match them, so they are placed explicitly: after all other
+    values when descending, before them when ascending.
+    """
+    beyond = "$lt" if descending else "$gt"
+    if value is None:
+        following = [{sort_key: None, "_id": {beyond: last_id}}]
+        if not descending:
+            following.append({sort_key: {"$ne": None}})
+        return {"$or": following}
+    
+    following = [
+        {sort_key: {beyond: value}},
+        {sort_key: value, "_id": {beyond: last_id}}
+    ]
+    if descending:
+        following.append({sort_key: None})
+    return {"$or": following}
+
+async def iter_evaluations_by_hackathon_id(
+    hackathon_id: str,
+    sort_key: str = "overall_score",
+    descending: bool = True,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    projection: Dict[str, int] = None,
+    batch_size: int = 500
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a hackathon's evaluations in (sort_key, _id) order using keyset pagination,
+    so each page is an index range scan that starts where the previous one stopped.
+    Documents are yielded as the cursor returns them and never held in a list.
+    Evaluations without a value for sort_key (e.g. not scored yet) come last when
+    descending and first when ascending.
+    
+    Args:
+        hackathon_id: ID of the hackathon
+        sort_key: One of EVALUATION_SORT_KEYS
+        descending: Sort direction
+        after: Cursor returned with the last document of the previous page
+        limit: Maximum number of documents, or None for all remaining
+        projection: Optional MongoDB projection; sort_key and _id are always fetched
+        batch_size: Documents per cursor batch
+        
+    Yields:
+        Evaluation documents; "_id" is left as an ObjectId for encode_page_cursor
+    """
+    if sort_key not in EVALUATION_SORT_KEYS:
+        raise ValueError(f"Sort key must be one of {', '.join(EVALUATION_SORT_KEYS)}")
+    
+    query = {"hackathon_id": hackathon_id}
+    if after:
+        value, last_id = decode_page_cursor(after)
+        query.update(page_after_filter(sort_key, value, last_id, descending))
+    
+    if projection is not None:
+        projection = {**projection, sort_key: 1, "_id": 1}
+    
+    direction = DESCENDING if descending else ASCENDING
+    cursor = db.evaluations.find(query, projection).sort([(sort_key, direction), ("_id", direction)]).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    
+    async for doc in cursor:
+        yield doc
+
+# Overall score ranges reported in hackathon statistics, as (name, lower bound) pairs
+SCORE_BUCKETS = [
+    ("poor", 0),
+    ("below_average", 40),
+    ("average", 60),
+    ("good", 75),
+    ("excellent", 90)
+]
+
+async def aggregate_hackathon_statistics(hackathon_id: str) -> Dict[str, Any]:
+    """
+    Compute a hackathon's evaluation statistics with a single server-side
+    aggregation. Only scores leave the database; transcripts are never read
+    into the service.
+    
+    Args:
+        hackathon_id: ID of the hackathon
+        
+    Returns:
+        Dictionary with submission_count, average_score, parameter_averages and
+        score_distribution (submission count per SCORE_BUCKETS range)
+    """
+    pipeline = [
+        {"$match": {"hackathon_id": hackathon_id}},
+        {"$project": {
+            "_id": 0,
+            "overall_score": 1,
+            "parameters": {"$objectToArray": {"$ifNull": ["$parameter_scores", {}]}}
+        }},
+        {"$facet": {
+            "overall": [
+                {"$group": {"_id": None, "submission_count": {"$sum": 1}, "average_score": {"$avg": "$overall_score"}}}
+            ],
+            "parameters": [
+                {"$unwind": "$parameters"},
+                {"$group": {
+                    "_id": "$parameters.k",
+                    # Parameter scores are stored as "score" by the evaluation service and "final_score" by the SBERT scorer
+                    "average": {"$avg": {"$ifNull": ["$parameters.v.score", "$parameters.v.final_score"]}}
+                }}
+            ],
+            "distribution": [
+                {"$bucket": {
+                    "groupBy": "$overall_score",
+                    "boundaries": [lower for _, lower in SCORE_BUCKETS] + [100.01],
+                    "default": "out_of_range",
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ]
+        }}
+    ]
+    
+    result = await db.evaluations.aggregate(pipeline).to_list(length=1)
+    facets = result[0] if result else {"overall": [], "parameters": [], "distribution": []}
+    
+    overall = facets["overall"][0] if facets["overall"] else {"submission_count": 0, "average_score": None}
+    bucket_names = {lower: name for name, lower in SCORE_BUCKETS}
+    distribution = {name: 0 for name, _ in SCORE_BUCKETS}
+    for bucket in facets["distribution"]:
+        if bucket["_id"] in bucket_names:
+            distribution[bucket_names[bucket["_id"]]] = bucket["count"]
+    
+    return {
+        "submission_count": overall["submission_count"],
+        "average_score": round(overall["average_score"] or 0, 2),
+        "parameter_averages": {
+            param["_id"]: round(param["average"], 2)
+            for param in facets["parameters"]
+            if param["average"] is not None
+        },
+        "score_distribution": distribution
+    } 
+
+def _field_key(name: str) -> str:
+    """Parameter names become field names in hackathon_stats; escape the characters MongoDB reserves."""
+    return name.replace("\uff0e", "\uff0e\uff0e").replace(".", "\uff0e").replace("$", "\uff04")
+
+def _parameter_name(key: str) -> str:
+    """Reverse of _field_key."""
+    return key.replace("\uff04", "$").replace("\uff0e\uff0e", "\x00").replace("\uff0e", ".").replace("\x00", "\uff0e")
+
+def _parameter_score(param_data: Dict[str, Any]) -> float:
+    """Parameter scores are stored as "score" by the evaluation service and "final_score" by the SBERT scorer."""
+    return param_data.get("score", param_data.get("final_score"))
+
+def score_bucket(score: float) -> str:
+    """Name of the SCORE_BUCKETS range an overall score falls in, matching the $bucket boundaries."""
+    if score is None or score < SCORE_BUCKETS[0][1] or score >= 100.01:
+        return "out_of_range"
+    return [name for name, lower in SCORE_BUCKETS if score >= lower][-1]
+
+def _stats_increments(evaluation: Dict[str, Any], sign: int) -> Dict[str, float]:
+    """$inc fields that add (sign=1) or remove (sign=-1) one evaluation's scores."""
+    overall = evaluation.get("overall_score") or 0
+    increments = {
+        "count": sign,
+        "overall.sum": sign * overall,
+        "overall.sum_squares": sign * overall * overall,
+        f"histogram.{score_bucket(evaluation.get('overall_score'))}": sign
+    }
+    for param_name, param_data in (evaluation.get("parameter_scores") or {}).items():
+        value = _parameter_score(param_data)
+        if value is None:
+            continue
+        key = _field_key(param_name)
+        increments[f"parameters.{key}.count"] = sign
+        increments[f"parameters.{key}.sum"] = sign * value
+        increments[f"parameters.{key}.sum_squares"] = sign * value * value
+    return increments
+
+async def update_hackathon_stats(evaluation: Dict[str, Any], previous: Dict[str, Any] = None) -> None:
+    """
+    Apply one stored evaluation to its hackathon's materialised statistics document:
+    running count, sums and sums of squares overall and per parameter, the score
+    histogram, and a top-LEADERBOARD_SIZE leaderboard. When an existing evaluation
+    was replaced, its previous scores are subtracted first.
+    
+    Args:
+        evaluation: The evaluation document just written
+        previous: The scores it replaced, or None for a new evaluation
+    """
+    hackathon_id = evaluation["hackathon_id"]
+    submission_id = evaluation["submission_id"]
+    
+    try:
+        increments = _stats_increments(evaluation, 1)
+        if previous is not None and previous.get("hackathon_id") != hackathon_id:
+            # The submission moved between hackathons; take it out of the old one entirely
+            await remove_from_hackathon_stats(previous)
+        elif previous is not None:
+            for field, delta in _stats_increments(previous, -1).items():
+                increments[field] = increments.get(field, 0) + delta
+        
+        async def apply():
+            return await db.hackathon_stats.find_one_and_update(
+                {"_id": hackathon_id},
+                {
+                    "$inc": {**increments, "generation": 1},
+                    "$set": {"updated_at": evaluation["updated_at"]},
+                    "$pull": {"leaderboard": {"submission_id": submission_id}}
+                },
+                projection={"count": 1, "leaderboard": {"$elemMatch": {"submission_id": submission_id}}},
+                return_document=ReturnDocument.BEFORE
+            )
+        
+        before = await apply()
+        if before is None:
+            # No statistics document yet: the hackathon may already have evaluations, so it is
+            # seeded from all of them, this one included. If another writer seeded it first,
+            # this evaluation is applied to theirs instead.
+            if await seed_hackathon_stats(hackathon_id) is not None:
+                return
+            before = await apply()
+            if before is None:
+                return
+        
+        await db.hackathon_stats.update_one(
+            {"_id": hackathon_id},
+            {"$push": {"leaderboard": {
+                "$each": [{"submission_id": submission_id, "overall_score": evaluation["overall_score"]}],
+                "$sort": {"overall_score": -1},
+                "$slice": LEADERBOARD_SIZE
+            }}}
+        )
+        
+        # A leaderboard entry whose score dropped may now rank below submissions the
+        # bounded leaderboard no longer holds; refill it from the score index
+        was_ranked = before.get("leaderboard")
+        if was_ranked and evaluation["overall_score"] < before["leaderboard"][0]["overall_score"] and before.get("count", 0) > LEADERBOARD_SIZE:
+            await rebuild_leaderboard(hackathon_id)
+    except Exception as e:
+        print(f"Error updating hackathon statistics for {hackathon_id}: {str(e)}")
+
+async def update_hackathon_stats_batch(evaluations: List[Dict[str, Any]], previous_by_submission: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Apply many stored evaluations to their hackathons' statistics with one
+    $inc and one leaderboard $push per hackathon. The batch counterpart of
+    update_hackathon_stats.
+    
+    Args:
+        evaluations: Evaluation documents just written
+        previous_by_submission: Scores they replaced, keyed by submission_id
+    """
+    by_hackathon = {}
+    for evaluation in evaluations:
+        by_hackathon.setdefault(evaluation["hackathon_id"], []).append(evaluation)
+    
+    for hackathon_id, group in by_hackathon.items():
+        try:
+            increments = {}
+            score_dropped = False
+            for evaluation in group:
+                deltas = list(_stats_increments(evaluation, 1).items())
+                previous = previous_by_submission.get(evaluation["submission_id"])
+                if previous is not None and previous.get("hackathon_id") != hackathon_id:
+                    await remove_from_hackathon_stats(previous)
+                elif previous is not None:
+                    deltas += list(_stats_increments(previous, -1).items())
+                    score_dropped = score_dropped or evaluation["overall_score"] < (previous.get("overall_score") or 0)
+                for field, delta in deltas:
+                    increments[field] = increments.get(field, 0) + delta
+            
+            update = {
+                "$inc": {**increments, "generation": 1},
+                "$set": {"updated_at": max(evaluation["updated_at"] for evaluation in group)},
+                "$pull": {"leaderboard": {"submission_id": {"$in": [evaluation["submission_id"] for evaluation in group]}}}
+            }
+            before = await db.hackathon_stats.find_one_and_update({"_id": hackathon_id}, update, projection={"count": 1}, return_document=ReturnDocument.BEFORE)
+            if before is None:
+                # Seeded from every stored evaluation, as in update_hackathon_stats
+                if await seed_hackathon_stats(hackathon_id) is not None:
+                    continue
+                before = await db.hackathon_stats.find_one_and_update({"_id": hackathon_id}, update, projection={"count": 1}, return_document=ReturnDocument.BEFORE)
+                if before is None:
+                    continue
+            
+            await db.hackathon_stats.update_one(
+                {"_id": hackathon_id},
+                {"$push": {"leaderboard": {
+                    "$each": [{"submission_id": evaluation["submission_id"], "overall_score": evaluation["overall_score"]} for evaluation in group],
+                    "$sort": {"overall_score": -1},
+                    "$slice": LEADERBOARD_SIZE
+                }}}
+            )
+            
+            # Same refill rule as update_hackathon_stats, applied once per batch
+            if score_dropped and before.get("count", 0) + increments.get("count", 0) > LEADERBOARD_SIZE:
+                await rebuild_leaderboard(hackathon_id)
+        except Exception as e:
+            print(f"Error updating hackathon statistics for {hackathon_id}: {str(e)}")
+
+async def _hackathon_totals(hackathon_id: str) -> Dict[str, Any]:
+    """A hackathon's statistics fields computed from its stored evaluations. Only scores are read."""
+    totals = {}
+    cursor = db.evaluations.find({"hackathon_id": hackathon_id}, {"_id": 0, "overall_score": 1, "parameter_scores": 1})
+    async for evaluation in cursor:
+        for field, delta in _stats_increments(evaluation, 1).items():
+            totals[field] = totals.get(field, 0) + delta
+    
+    # Same layout the $inc updates build; parameter keys are escaped, so every "." is a nesting level
+    stats = {}
+    for field, value in totals.items():
+        *parents, leaf = field.split(".")
+        node = stats
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = value
+    stats.setdefault("count", 0)
+    return stats
+
+async def seed_hackathon_stats(hackathon_id: str) -> Optional[int]:
+    """
+    Create a hackathon's statistics document from its stored evaluations, for
+    hackathons evaluated before statistics were materialised. The totals are
+    only written through $setOnInsert, so a document another writer created in
+    the meantime is left as it is.
+    
+    Returns:
+        The number of evaluations counted, or None if the document already existed
+    """
+    stats = await _hackathon_totals(hackathon_id)
+    try:
+        result = await db.hackathon_stats.update_one(
+            {"_id": hackathon_id},
+            {"$setOnInsert": {**stats, "generation": 0, "leaderboard": [], "updated_at": datetime.datetime.now()}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return None
+    if result.upserted_id is None:
+        return None
+    await rebuild_leaderboard(hackathon_id)
+    return stats["count"]
+
+async def rebuild_hackathon_stats(hackathon_id: str, attempts: int = 5) -> int:
+    """
+    Recompute a hackathon's materialised statistics document from its stored
+    evaluations to repair drift. Every statistics update increments the
+    document's generation; the recomputed totals only replace the document if
+    its generation has not changed since they were read, so an update made
+    meanwhile is never overwritten; the rebuild is retried instead.
+    
+    Returns:
+        The number of evaluations counted
+        
+    Raises:
+        RuntimeError: The statistics changed during every attempt
+    """
+    for _ in range(attempts):
+        current = await db.hackathon_stats.find_one({"_id": hackathon_id}, {"generation": 1})
+        if current is None:
+            seeded = await seed_hackathon_stats(hackathon_id)
+            if seeded is not None:
+                return seeded
+            continue
+        
+        generation = current.get("generation")
+        stats = await _hackathon_totals(hackathon_id)
+        result = await db.hackathon_stats.replace_one(
+            # Documents written before generations were tracked match on the missing field
+            {"_id": hackathon_id, "generation": generation},
+            {**stats, "generation": (generation or 0) + 1, "leaderboard": [], "updated_at": datetime.datetime.now()}
+        )
+        if result.matched_count:
+            await rebuild_leaderboard(hackathon_id)
+            return stats["count"]
+    
+    raise RuntimeError(f"Statistics of hackathon {hackathon_id} changed during every rebuild attempt")
+
+async def remove_from_hackathon_stats(evaluation: Dict[str, Any]) -> None:
+    """Subtract an evaluation's scores from its hackathon's statistics and leaderboard."""
+    await db.hackathon_stats.update_one(
+        {"_id": evaluation["hackathon_id"]},
+        {
+            "$inc": {**_stats_increments(evaluation, -1), "generation": 1},
+            "$pull": {"leaderboard": {"submission_id": evaluation["submission_id"]}}
+        }
+    )
+    await rebuild_leaderboard(evaluation["hackathon_id"])
+
+async def rebuild_leaderboard(hackathon_id: str) -> None:
+    """Recompute a hackathon's leaderboard from the (hackathon_id, overall_score) index."""
+    cursor = db.evaluations.find(
+        {"hackathon_id": hackathon_id},
+        {"_id": 0, "submission_id": 1, "overall_score": 1}
+    ).sort("overall_score", DESCENDING).limit(LEADERBOARD_SIZE)
+    leaderboard = await cursor.to_list(length=LEADERBOARD_SIZE)
+    await db.hackathon_stats.update_one({"_id": hackathon_id}, {"$set": {"leaderboard": leaderboard}})
+
+async def get_hackathon_statistics(hackathon_id: str) -> Dict[str, Any]:
+    """
+    Read a hackathon's statistics from its materialised document in one
+    primary-key lookup. Hackathons with no document yet (nothing written since
+    statistics were materialised) fall back to the aggregation; the first write
+    seeds the document from all their evaluations.
+    
+    Args:
+        hackathon_id: ID of the hackathon
+        
+    Returns:
+        Same fields as aggregate_hackathon_statistics, plus standard deviations
+    """
+    stats = await db.hackathon_stats.find_one({"_id": hackathon_id}, {"leaderboard": 0})
+    
+    if not stats or stats.get("count", 0) <= 0:
+        return await aggregate_hackathon_statistics(hackathon_id)
+    
+    count = stats["count"]
+    
+    def mean_and_std(totals: Dict[str, float], n: int):
+        mean = totals.get("sum", 0) / n
+        variance = max(totals.get("sum_squares", 0) / n - mean * mean, 0)
+        return round(mean, 2), round(variance ** 0.5, 2)
+    
+    average_score, score_std_dev = mean_and_std(stats.get("overall", {}), count)
+    parameter_averages = {}
+    parameter_std_devs = {}
+    for key, totals in stats.get("parameters", {}).items():
+        if totals.get("count", 0) > 0:
+            name = _parameter_name(key)
+            parameter_averages[name], parameter_std_devs[name] = mean_and_std(totals, totals["count"])
+    
+    histogram = stats.get("histogram", {})
+    
+    return {
+        "submission_count": count,
+        "average_score": average_score,
+        "score_std_dev": score_std_dev,
+        "parameter_averages": parameter_averages,
+        "parameter_std_devs": parameter_std_devs,
+        "score_distribution": {name: histogram.get(name, 0) for name, _ in SCORE_BUCKETS}
+    }
+
+async def get_hackathon_leaderboard(hackathon_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Read the top submissions of a hackathon from its materialised leaderboard.
+    
+    Args:
+        hackathon_id: ID of the hackathon
+        limit: Number of entries to return (at most LEADERBOARD_SIZE)
+        
+    Returns:
+        List of {"submission_id", "overall_score"} entries, best first
+    """
+    limit = max(1, min(limit, LEADERBOARD_SIZE))
+    stats = await db.hackathon_stats.find_one({"_id": hackathon_id}, {"_id": 0, "leaderboard": {"$slice": limit}})
+    
+    if stats and stats.get("leaderboard"):
+        return stats["leaderboard"]
+    
+    # Not materialised yet: read the top of the score index instead
+    cursor = db.evaluations.find(
+        {"hackathon_id": hackathon_id},
+        {"_id": 0, "submission_id": 1, "overall_score": 1}
+    ).sort("overall_score", DESCENDING).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def update_duplicate_index(hackathon_id: str, submission_id: str, text_content: str, signature: Dict[str, Any] = None) -> None:
+    """
+    Add one submission to its hackathon's near-duplicate index; see update_duplicate_indexes.
+    
+    Args:
+        hackathon_id: ID of the hackathon
+        submission_id: ID of the submission
+        text_content: Extracted text content
+        signature: The text's submission_signature, if already computed
+    """
+    await update_duplicate_indexes([(hackathon_id, submission_id, signature or submission_signature(text_content))])
+
+def _stored_signature(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """A duplicate_signatures document in the form submission_signature returns."""
+    embedding = doc.get("embedding")
+    return {
+        "minhash": np.frombuffer(doc["minhash"], dtype=np.uint32),
+        "embedding": embedding_from_document(embedding) if embedding else None,
+        "model": embedding["model"] if embedding else None,
+        "bands": doc["bands"]
+    }
+
+def _embedding_cosine(signature: Dict[str, Any], other: Dict[str, Any]) -> Optional[float]:
+    """Cosine similarity of two signatures' embeddings, or None unless both have one from the same model."""
+    if signature["embedding"] is None or other["embedding"] is None or signature["model"] != other["model"]:
+        return None
+    return float(signature["embedding"] @ other["embedding"])
+
+async def update_duplicate_indexes(entries: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+    """
+    Add submissions to their hackathons' near-duplicate indexes and record the
+    pairs they form. Candidates are the submissions sharing a MinHash band
+    (textual copying) or a random-hyperplane band of the SBERT embedding
+    (paraphrased copying), found through the band index; only those are
+    compared, so indexing never scans a hackathon. Submissions indexed without
+    an embedding are only matched on copied text.
+    
+    The whole batch takes one pair cleanup, one candidate query per hackathon,
+    and one bulk write each for signatures and pairs. Submissions in the same
+    batch are compared with each other too.
+    
+    Args:
+        entries: (hackathon_id, submission_id, submission_signature) tuples
+    """
+    if not entries:
+        return
+    try:
+        now = datetime.datetime.now()
+        submission_ids = [submission_id for _, submission_id, _ in entries]
+        
+        # Re-evaluated submissions form their pairs afresh
+        await db.duplicate_pairs.delete_many({"submissions": {"$in": submission_ids}})
+        empty = [submission_id for _, submission_id, signature in entries if signature["token_count"] == 0]
+        if empty:
+            await db.duplicate_signatures.delete_many({"_id": {"$in": empty}})
+        
+        by_hackathon = {}
+        for hackathon_id, submission_id, signature in entries:
+            if signature["token_count"]:
+                by_hackathon.setdefault(hackathon_id, {})[submission_id] = signature
+        
+        pairs = {}
+        signature_writes = []
+        for hackathon_id, group in by_hackathon.items():
+            bands = sorted({band for signature in group.values() for band in signature["bands"]})
+            pool = {}
+            async for candidate in db.duplicate_signatures.find(
+                {"hackathon_id": hackathon_id, "bands": {"$in": bands}, "_id": {"$nin": submission_ids}},
+                {"minhash": 1, "embedding": 1, "bands": 1}
+            ).limit(DUPLICATE_MAX_CANDIDATES * len(group)):
+                pool[candidate["_id"]] = _stored_signature(candidate)
+            pool.update(group)
+            pool_bands = {candidate_id: set(candidate["bands"]) for candidate_id, candidate in pool.items()}
+            
+            for submission_id, signature in group.items():
+                own_bands = set(signature["bands"])
+                compared = 0
+                for candidate_id, candidate in pool.items():
+                    if candidate_id == submission_id or not own_bands & pool_bands[candidate_id]:
+                        continue
+                    compared += 1
+                    if compared > DUPLICATE_MAX_CANDIDATES:
+                        break
+                    first, second = sorted([submission_id, candidate_id])
+                    if f"{first}|{second}" in pairs:
+                        continue
+                    jaccard = estimated_jaccard(signature["minhash"], candidate["minhash"])
+                    cosine = _embedding_cosine(signature, candidate)
+                    if jaccard >= DUPLICATE_JACCARD_THRESHOLD or (cosine is not None and cosine >= DUPLICATE_COSINE_THRESHOLD):
+                        pairs[f"{first}|{second}"] = UpdateOne(
+                            {"_id": f"{first}|{second}"},
+                            {"$set": {
+                                "hackathon_id": hackathon_id,
+                                "submissions": [first, second],
+                                "jaccard": round(jaccard, 4),
+                                "cosine": round(cosine, 4) if cosine is not None else None,
+                                "detected_at": now
+                            }},
+                            upsert=True
+                        )
+                
+                fields = {
+                    "hackathon_id": hackathon_id,
+                    "minhash": Binary(signature["minhash"].tobytes()),
+                    "bands": signature["bands"],
+                    "updated_at": now
+                }
+                if signature["embedding"] is not None:
+                    fields["embedding"] = embedding_document(signature["embedding"], signature["model"])
+                    update = {"$set": fields, "$unset": {"sketch": ""}}
+                else:
+                    update = {"$set": fields, "$unset": {"embedding": "", "sketch": ""}}
+                signature_writes.append(UpdateOne({"_id": submission_id}, update, upsert=True))
+        
+        if signature_writes:
+            await db.duplicate_signatures.bulk_write(signature_writes, ordered=False)
+        if pairs:
+            await db.duplicate_pairs.bulk_write(list(pairs.values()), ordered=False)
+    except Exception as e:
+        print(f"Error updating duplicate index for {len(entries)} submissions: {str(e)}")
+
+async def get_duplicate_clusters(hackathon_id: str, min_jaccard: float = None, min_cosine: float = None) -> List[Dict[str, Any]]:
+    """
+    Group a hackathon's flagged pairs into clusters of suspected duplicates.
+    
+    Args:
+        hackathon_id: ID of the hackathon
+        min_jaccard: Optional stricter textual-overlap threshold
+        min_cosine: Optional stricter embedding-similarity threshold
+        
+    Returns:
+        Clusters, most similar first, each with its submissions and pairwise similarities
+    """
+    query = {"hackathon_id": hackathon_id}
+    if min_jaccard is not None or min_cosine is not None:
+        query["$or"] = [
+            {"jaccard": {"$gte": min_jaccard if min_jaccard is not None else DUPLICATE_JACCARD_THRESHOLD}},
+            {"cosine": {"$gte": min_cosine if min_cosine is not None else DUPLICATE_COSINE_THRESHOLD}}
+        ]
+    pairs = await db.duplicate_pairs.find(query, {"_id": 0, "submissions": 1, "jaccard": 1, "cosine": 1}).to_list(length=None)
+    return cluster_pairs(pairs)
+
+async def rebuild_duplicate_index(hackathon_id: str) -> int:
+    """
+    Index every stored evaluation of a hackathon, e.g. those written before the
+    duplicate index existed. Embeddings already in the index are kept; the
+    rest are only matched on copied text until they are re-evaluated.
+    Returns the number of submissions indexed.
+    """
+    indexed = 0
+    async for doc in db.evaluations.find({"hackathon_id": hackathon_id}, {"submission_id": 1}):
+        text_content = await get_transcript(doc["submission_id"])
+        if text_content is not None:
+            stored = await db.duplicate_signatures.find_one({"_id": doc["submission_id"]}, {"embedding": 1})
+            embedding = stored.get("embedding") if stored else None
+            signature = submission_signature(
+                text_content,
+                embedding=embedding_from_document(embedding) if embedding else None,
+                model_id=embedding["model"] if embedding else None
+            )
+            await update_duplicate_index(hackathon_id, doc["submission_id"], text_content, signature)
+            indexed += 1
+    return indexed
@@ -0,0 +1,70 @@
+import base64
+import numpy as np
+
+EMBEDDING_ENCODINGS = ("list", "base64")
+EMBEDDING_DTYPES = ("float16", "float32")
+
+def pack_embedding(vector, dtype: str = "float16") -> bytes:
+    """Packs a vector as little-endian float16 or float32 bytes (768 or 1536 bytes for 384 dimensions)."""
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"Embedding dtype must be one of {', '.join(EMBEDDING_DTYPES)}")
+    return np.asarray(vector, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()
+
+def unpack_embedding(data: bytes, dtype: str = "float16", dim: int = None):
+    """Reverse of pack_embedding; returns a float32 vector."""
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"Embedding dtype must be one of {', '.join(EMBEDDING_DTYPES)}")
+    vector = np.frombuffer(data, dtype=np.dtype(dtype).newbyteorder("<")).astype(np.float32)
+    if dim is not None and len(vector) != dim:
+        raise ValueError(f"Embedding has {len(vector)} dimensions, expected {dim}")
+    return vector
+
+def serialize_embedding(vector, encoding: str = "list", dtype: str = "float32", model_id: str = None):
+    """
+    Converts an embedding for a JSON response.
+
+    "list" keeps the original float list. "base64" returns the packed bytes as
+    base64 with the dtype, dimension and model id needed to decode them, about
+    a quarter of the size at float32 and an eighth at float16.
+    """
+    if encoding not in EMBEDDING_ENCODINGS:
+        raise ValueError(f"Embedding encoding must be one of {', '.join(EMBEDDING_ENCODINGS)}")
+
+    vector = np.asarray(vector, dtype=np.float32)
+    if encoding == "list":
+        return vector.tolist()
+
+    return {
+        "encoding": "base64",
+        "dtype": dtype,
+        "dim": int(vector.shape[-1]),
+        "model": model_id,
+        "data": base64.b64encode(pack_embedding(vector, dtype)).decode("ascii")
+    }
+
+def deserialize_embedding(value):
+    """Accepts a float list or a serialize_embedding base64 object and returns a float32 vector."""
+    if isinstance(value, dict):
+        return unpack_embedding(base64.b64decode(value["data"]), value.get("dtype", "float32"), value.get("dim"))
+    return np.asarray(value, dtype=np.float32)
+
+def embedding_document(vector, model_id: str, dtype: str = "float16"):
+    """
+    MongoDB representation of an embedding: packed binary plus the model id,
+    dtype and dimension needed to read it back.
+    """
+    from bson import Binary
+
+    vector = np.asarray(vector, dtype=np.float32)
+    return {
+        "model": model_id,
+        "dtype": dtype,
+        "dim": int(vector.shape[-1]),
+        "data": Binary(pack_embedding(vector, dtype))
+    }
+
+def embedding_from_document(document, model_id: str = None):
+    """Reads an embedding_document back; refuses vectors produced by a different model."""
+    if model_id is not None and document.get("model") != model_id:
+        raise ValueError(f"Stored embedding was produced by {document.get('model')}, not {model_id}")
+    return unpack_embedding(bytes(document["data"]), document["dtype"], document["dim"])
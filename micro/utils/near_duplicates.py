@@ -0,0 +1,161 @@
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+import numpy as np
+
+# MinHash signature length and its LSH banding: 32 bands of 4 rows make pairs above ~0.42 Jaccard likely candidates
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 32
+SHINGLE_WORDS = 5
+
+# Text sketch dimension (sentence vectors for extractive summaries)
+SKETCH_DIM = 256
+
+# Random-hyperplane LSH of SBERT embeddings: 64 sign bits split into 8 bands of 8
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 8
+
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with we our".split()
+)
+
+_rng = np.random.default_rng(20240601)
+_MINHASH_A = _rng.integers(1, 2**63, size=MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_MINHASH_B = _rng.integers(0, 2**63, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+def tokenize(text: str):
+    """Lower-cased word tokens."""
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+def shingles(tokens: list, size: int = SHINGLE_WORDS):
+    """Distinct overlapping word n-grams, hashed to 32 bits (stable across processes)."""
+    if len(tokens) < size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))} if tokens else set()
+    return {zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8")) for i in range(len(tokens) - size + 1)}
+
+def minhash(shingle_hashes: set):
+    """
+    MinHash signature of a shingle set using multiply-shift hashing on uint64,
+    so all permutations are computed in one vectorised pass.
+    """
+    if not shingle_hashes:
+        return np.full(MINHASH_PERMUTATIONS, np.iinfo(np.uint32).max, dtype=np.uint32)
+    values = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))
+    with np.errstate(over="ignore"):
+        hashed = (values[:, None] * _MINHASH_A[None, :] + _MINHASH_B[None, :]) >> np.uint64(32)
+    return hashed.min(axis=0).astype(np.uint32)
+
+def minhash_bands(signature):
+    """LSH band keys of a MinHash signature; texts sharing any key are candidate duplicates."""
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    return [f"m{band}:{signature[band * rows:(band + 1) * rows].tobytes().hex()}" for band in range(MINHASH_BANDS)]
+
+def estimated_jaccard(signature_a, signature_b) -> float:
+    """Share of equal MinHash values, an unbiased estimate of shingle-set Jaccard similarity."""
+    return float(np.mean(np.asarray(signature_a) == np.asarray(signature_b)))
+
+@lru_cache(maxsize=50000)
+def _token_vector(token: str):
+    """Fixed random direction for a token, derived from its hash."""
+    return np.random.default_rng(zlib.crc32(token.encode("utf-8"))).standard_normal(SKETCH_DIM).astype(np.float32)
+
+def text_sketch(tokens: list):
+    """
+    Unit-length bag-of-words vector: each content word contributes a fixed random
+    direction weighted by 1 + log(count). Cosine similarity between sketches
+    tracks word-distribution similarity, so reordered or lightly reworded copies
+    still score high without a fitted vocabulary.
+    """
+    counts = Counter(token for token in tokens if token not in STOP_WORDS and len(token) > 1)
+    vector = np.zeros(SKETCH_DIM, dtype=np.float32)
+    for token, count in counts.items():
+        vector += (1 + np.log(count)) * _token_vector(token)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+@lru_cache(maxsize=8)
+def _hyperplanes(dim: int):
+    """Fixed random hyperplanes for embeddings of a given dimension."""
+    return np.random.default_rng(20240601 + dim).standard_normal((dim, SIMHASH_BITS)).astype(np.float32)
+
+def simhash_bands(vector):
+    """Random-hyperplane LSH band keys of an embedding; nearby vectors share a band with high probability."""
+    vector = np.asarray(vector, dtype=np.float32)
+    bits = (vector @ _hyperplanes(len(vector))) > 0
+    rows = SIMHASH_BITS // SIMHASH_BANDS
+    return [f"s{band}:{np.packbits(bits[band * rows:(band + 1) * rows]).tobytes().hex()}" for band in range(SIMHASH_BANDS)]
+
+def submission_signature(text: str, tokens: list = None, embedding=None, model_id: str = None):
+    """
+    Everything the duplicate index stores for one submission. Tokens already
+    computed for the text (see DocumentAnalysis) are reused when given.
+
+    Args:
+        embedding: SBERT embedding of the text, for paraphrase detection; without
+            one the submission is only matched on copied text
+        model_id: Id of the model that produced the embedding
+
+    Returns:
+        dict: MinHash signature, unit-length embedding and its model (or None),
+        and the LSH band keys of both.
+    """
+    if tokens is None:
+        tokens = tokenize(text)
+    signature = minhash(shingles(tokens))
+    bands = minhash_bands(signature)
+    if embedding is not None:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        embedding = embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+        bands += simhash_bands(embedding)
+    return {
+        "minhash": signature,
+        "embedding": embedding,
+        "model": model_id if embedding is not None else None,
+        "bands": bands,
+        "token_count": len(tokens)
+    }
+
+def cluster_pairs(pairs: list):
+    """
+    Connected components of flagged pairs (union-find).
+
+    Args:
+        pairs (list): Dictionaries with "submissions" ([a, b]), "jaccard" and "cosine"
+            (None when the pair's embeddings were not compared).
+
+    Returns:
+        list: Clusters with their submissions, pairs and strongest similarity, most similar first.
+    """
+    parent = {}
+
+    def find(item):
+        parent.setdefault(item, item)
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for pair in pairs:
+        first, second = pair["submissions"]
+        parent[find(first)] = find(second)
+
+    def strength(pair):
+        return max(pair["jaccard"], pair["cosine"] or 0.0)
+
+    clusters = {}
+    for pair in pairs:
+        clusters.setdefault(find(pair["submissions"][0]), []).append(pair)
+
+    result = []
+    for members in clusters.values():
+        submissions = sorted({submission for pair in members for submission in pair["submissions"]})
+        result.append({
+            "submissions": submissions,
+            "size": len(submissions),
+            "max_jaccard": max(pair["jaccard"] for pair in members),
+            "max_cosine": max((pair["cosine"] for pair in members if pair["cosine"] is not None), default=None),
+            "pairs": sorted(members, key=strength, reverse=True)
+        })
+
+    return sorted(result, key=lambda cluster: max(cluster["max_jaccard"], cluster["max_cosine"] or 0.0), reverse=True)
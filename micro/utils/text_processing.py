@@ -0,0 +1,16 @@
+import re
+import hashlib
+import unicodedata
+
+def normalise_text(text: str):
+    """Unicode-normalises text and collapses whitespace so cosmetic edits do not change it."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+def text_hash(text: str):
+    """SHA-1 hex digest of the normalised text."""
+    return hashlib.sha1(normalise_text(text).encode("utf-8")).hexdigest()
+
+def split_sentences(text: str):
+    """Splits text into non-empty sentences on terminal punctuation and line breaks."""
+    sentences = re.split(r"(?<=[.!?])\s+|\n+", text)
+    return [sentence.strip() for sentence in sentences if sentence.strip()]
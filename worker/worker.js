@@ -13,8 +13,9 @@ require('dotenv').config();
 const redisUrl = process.env.REDIS_URL || 'redis://localhost:6379';
 const client = createClient({ url: redisUrl });
 
-// Queue name
+// Queue names
 const SUBMISSION_QUEUE = 'submission:queue';
+const LLM_QUEUE = process.env.LLM_QUEUE || 'llm_evaluation:queue';
 
 // Redis connection state
 let isRedisConnected = false;
@@ -194,6 +195,55 @@ async function processSubmission(submission) {
   }
 }
 
+// LLM stage configuration (cascade evaluations queued by the FastAPI service)
+const LLM_ENDPOINT = `${FASTAPI_URL}/api/llm_evaluation/`;
+const LLM_MAX_ATTEMPTS = parseInt(process.env.LLM_MAX_ATTEMPTS || '3', 10);
+
+/**
+ * Run the LLM stage of one queued cascade evaluation, re-queueing it on failure
+ * until LLM_MAX_ATTEMPTS. The FastAPI service records every attempt on the
+ * evaluation, so jobs that run out of attempts stay visible as "failed".
+ *
+ * @param {Object} job - { submission_id, attempt } from the LLM queue
+ */
+async function processLlmJob(job) {
+  try {
+    await axios.post(`${LLM_ENDPOINT}${encodeURIComponent(job.submission_id)}`);
+    console.log(`LLM stage done for submission ${job.submission_id}`);
+  } catch (error) {
+    const status = error.response ? error.response.status : null;
+    const attempt = (job.attempt || 0) + 1;
+    // 404 means the evaluation or its job is gone; retrying will not help
+    if (status !== 404 && attempt < LLM_MAX_ATTEMPTS) {
+      console.error(`LLM stage failed for submission ${job.submission_id} (attempt ${attempt}), re-queueing:`, error.message);
+      await client.rPush(LLM_QUEUE, JSON.stringify({ ...job, attempt }));
+    } else {
+      console.error(`LLM stage failed for submission ${job.submission_id}, giving up after ${attempt} attempts:`, error.message);
+    }
+  }
+}
+
+/**
+ * Polls the LLM queue separately so slow LLM stages never hold up new submissions
+ */
+async function llmLoop() {
+  try {
+    if (isRedisConnected) {
+      const job = await client.lPop(LLM_QUEUE);
+      if (job) {
+        await processLlmJob(JSON.parse(job));
+        // More jobs may be waiting; check again straight away
+        setTimeout(llmLoop, 0);
+        return;
+      }
+    }
+  } catch (error) {
+    console.error('Error in LLM loop:', error.message);
+  }
+
+  setTimeout(llmLoop, POLLING_INTERVAL);
+}
+
 /**
  * The main worker loop that polls the queue for new submissions
  */
@@ -247,6 +297,7 @@ async function workerLoop() {
 // Start the worker
 console.log('Starting submission processing worker...');
 workerLoop();
+llmLoop();
 
 // Handle graceful shutdown
 process.on('SIGINT', async () => {